@@ -1,987 +1,1520 @@
-# -*- coding: utf-8 -*-
-"""
-Created on Mon Sep 29 11:06:10 2025
-
-@author: jahop
-"""
-
-import streamlit as st
-import pandas as pd
-import numpy as np
-import plotly.express as px
-import plotly.graph_objects as go
-
-from datetime import datetime  # <-- AGREGAR ESTA LÍNEA
-
-# Configuración de la página
-st.set_page_config(
-    page_title="Simulador de Funciones - Política Fiscal IMSS",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-# Título principal
-st.title("🏛️ Simulador de Funciones - Subdivisión de Política Fiscal")
-st.markdown("**Herramienta interactiva para demostrar las capacidades requeridas en la vacante**")
-
-# Sidebar con información de la vacante
-with st.sidebar:
-    # AGREGADO: Nombre y fecha
-    st.header("👤 Información del Candidato")
-    st.markdown("**Nombre:** Javier Horacio Pérez Ricárdez")
-    st.markdown(f"**Fecha:** {datetime.now().strftime('%d/%m/%Y %H:%M')}")
-    
-    st.divider()
-    
-    st.header("📋 Información de la Vacante")
-    st.markdown("""
-    **Puesto:** Subjefe de División de Política Fiscal  
-    **Nivel:** N31  
-    **Salario:** $53,000 MXN brutos mensuales  
-    **Área:** Coordinación de Planeación y Evaluación
-    """)
-    
-    st.divider()
-    st.markdown("### 🎯 Funciones Disponibles")
-    st.markdown("Selecciona una función para explorar en los botones:")
-
-# Lista de funciones del puesto
-funciones = {
-    "Presupuesto": "Integrar información para el anteproyecto de presupuesto",
-    "Análisis Reformas": "Evaluar impacto recaudatorio de reformas",
-    "Estudios Investigación": "Elaborar estudios de seguridad social y mercado laboral",
-    "Reportes Avances": "Generar reportes de acciones y logros",
-    "Metas Desempeño": "Definir metas para unidades administrativas",
-    "Detección Anomalías": "Identificar esquemas de comportamiento atípicos"
-}
-
-# Usar session_state para mantener la función seleccionada
-if 'selected_funcion' not in st.session_state:
-    st.session_state.selected_funcion = None
-
-# Crear botones para cada función
-cols = st.columns(3)
-for i, (funcion, descripcion) in enumerate(funciones.items()):
-    with cols[i % 3]:
-        if st.button(f"**{funcion}**", use_container_width=True, key=f"btn_{funcion}"):
-            st.session_state.selected_funcion = funcion
-            st.rerun()
-
-# Si no se ha seleccionado ninguna función, mostrar pantalla de inicio
-if not st.session_state.selected_funcion:
-    st.markdown("---")
-    st.subheader("🚀 Bienvenido/a al Simulador de Funciones")
-    st.markdown("""
-    Esta herramienta demuestra las capacidades técnicas y analíticas requeridas para el puesto de 
-    **Subjefe de División de Política Fiscal** en el IMSS.
-    
-    ### 📊 Características:
-    - Análisis de datos con Python y Pandas
-    - Visualizaciones interactivas con Plotly
-    - Simulación de escenarios presupuestales
-    - Detección de anomalías en datos
-    - Reportes ejecutivos automatizados
-    
-    ### 👆 **Selecciona una función en los botones superiores para comenzar**
-    """)
-    
-    # Mostrar datos de ejemplo
-    st.markdown("### 📈 Vista Previa de Datos de Ejemplo")
-    
-    # Generar datos sintéticos de afiliación
-    meses = ['Ene', 'Feb', 'Mar', 'Abr', 'May', 'Jun', 'Jul', 'Ago', 'Sep', 'Oct', 'Nov', 'Dic']
-    afiliados = np.random.randint(18000000, 22000000, size=12)
-    recaudacion = np.random.randint(45000, 65000, size=12) * 1000
-    
-    df_ejemplo = pd.DataFrame({
-        'Mes': meses,
-        'Afiliados': afiliados,
-        'Recaudación (MXN)': recaudacion
-    })
-    
-    st.dataframe(df_ejemplo, use_container_width=True)
-    
-    # Gráfico de ejemplo
-    fig = px.line(df_ejemplo, x='Mes', y='Afiliados', 
-                  title='Tendencia de Afiliados Mensual (Ejemplo)',
-                  markers=True)
-    st.plotly_chart(fig, use_container_width=True)
-
-# FUNCIÓN 1: PRESUPUESTO
-elif st.session_state.selected_funcion == "Presupuesto":
-    st.header("💰 Integración de Información para Presupuesto")
-    
-    st.markdown("""
-    **Objetivo:** Elaborar diferentes escenarios del anteproyecto de presupuesto de ingresos y egresos
-    """)
-    
-    # Simulación de escenarios presupuestales
-    col1, col2 = st.columns([2, 1])
-    
-    with col2:
-        st.subheader("⚙️ Parámetros del Escenario")
-        crecimiento = st.slider("Crecimiento esperado (%)", -5.0, 15.0, 3.5, 0.5, key="presupuesto_crecimiento")
-        inflacion = st.slider("Inflación esperada (%)", 2.0, 8.0, 4.0, 0.1, key="presupuesto_inflacion")
-        año_base = st.number_input("Presupuesto base (millones MXN)", 50000, 200000, 120000, key="presupuesto_base")
-        
-        if st.button("Generar Escenarios Presupuestales", key="btn_generar_presupuesto"):
-            st.success("✅ Escenarios generados exitosamente")
-    
-    with col1:
-        # Generar datos para escenarios presupuestales
-        años = [2024, 2025, 2026, 2027]
-        escenario_conservador = [año_base, 
-                               año_base * (1 + (crecimiento-1)/100),
-                               año_base * (1 + (crecimiento-1)/100)**2,
-                               año_base * (1 + (crecimiento-1)/100)**3]
-        
-        escenario_moderado = [año_base,
-                            año_base * (1 + crecimiento/100),
-                            año_base * (1 + crecimiento/100)**2,
-                            año_base * (1 + crecimiento/100)**3]
-        
-        escenario_optimista = [año_base,
-                             año_base * (1 + (crecimiento+2)/100),
-                             año_base * (1 + (crecimiento+2)/100)**2,
-                             año_base * (1 + (crecimiento+2)/100)**3]
-        
-        df_presupuesto = pd.DataFrame({
-            'Año': años,
-            'Conservador': [f"${x/1000:,.1f}M" for x in escenario_conservador],
-            'Moderado': [f"${x/1000:,.1f}M" for x in escenario_moderado],
-            'Optimista': [f"${x/1000:,.1f}M" for x in escenario_optimista]
-        })
-        
-        st.subheader("📊 Escenarios Presupuestales Proyectados")
-        st.dataframe(df_presupuesto, use_container_width=True)
-        
-        # Gráfico de escenarios
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(x=años, y=escenario_conservador, 
-                               mode='lines+markers', name='Conservador',
-                               line=dict(dash='dash')))
-        fig.add_trace(go.Scatter(x=años, y=escenario_moderado, 
-                               mode='lines+markers', name='Moderado'))
-        fig.add_trace(go.Scatter(x=años, y=escenario_optimista, 
-                               mode='lines+markers', name='Optimista',
-                               line=dict(dash='dot')))
-        
-        fig.update_layout(title='Proyección de Escenarios Presupuestales',
-                         xaxis_title='Año',
-                         yaxis_title='Presupuesto (Millones MXN)')
-        st.plotly_chart(fig, use_container_width=True)
-
-# FUNCIÓN 2: ANÁLISIS DE REFORMAS
-
-# FUNCIÓN 2: ANÁLISIS DE REFORMAS
-elif st.session_state.selected_funcion == "Análisis Reformas":
-    st.header("📊 Evaluación de Impacto Recaudatorio de Reformas")
-    
-    st.markdown("""
-    **Objetivo:** Analizar el impacto recaudatorio de reformas propuestas a la Ley del Seguro Social
-    """)
-    
-    # Simulación de impacto de reformas
-    reformas = [
-        "Incremento cuota patronal 1%",
-        "Reducción cuota trabajador 0.5%", 
-        "Nuevo esquema para PyMEs",
-        "Ampliación base de cotización",
-        "Incorporación sector informal"
-    ]
-    
-    # Datos base que pueden cambiar con la sensibilidad
-    impacto_base = [15.5, -8.2, 3.7, 12.8, 22.3]
-    confianza = [85, 78, 65, 82, 60]
-    
-    col1, col2 = st.columns([3, 2])
-    
-    with col2:
-        st.subheader("📋 Configuración del Análisis")
-        
-        # Selector de reforma específica
-        reforma_seleccionada = st.selectbox("Selecciona una reforma para análisis detallado:", reformas, key="reforma_select")
-        
-        if reforma_seleccionada:
-            idx = reformas.index(reforma_seleccionada)
-            
-            # Análisis de sensibilidad
-            st.subheader("🔍 Análisis de Sensibilidad")
-            sensibilidad = st.slider("Variación en supuestos clave (%)", -20, 20, 0, key="sensibilidad_slider")
-            
-            # Calcular impacto ajustado
-            impacto_ajustado = impacto_base[idx] * (1 + sensibilidad/100)
-            
-            # Mostrar métricas
-            col_metric1, col_metric2 = st.columns(2)
-            with col_metric1:
-                st.metric("Impacto Base", f"{impacto_base[idx]}%")
-                st.metric("Impacto Ajustado", f"{impacto_ajustado:.1f}%", 
-                         delta=f"{impacto_ajustado - impacto_base[idx]:+.1f}%")
-            with col_metric2:
-                st.metric("Nivel de Confianza", f"{confianza[idx]}%")
-                
-                # Calcular confianza ajustada (inversamente proporcional a la variación)
-                confianza_ajustada = max(0, min(100, confianza[idx] - abs(sensibilidad)))
-                st.metric("Confianza Ajustada", f"{confianza_ajustada:.0f}%")
-    
-    with col1:
-        st.subheader("📈 Impacto de Reformas Propuestas")
-        
-        # Crear DataFrame actualizado con los impactos ajustados
-        if reforma_seleccionada:
-            idx = reformas.index(reforma_seleccionada)
-            impacto_actualizado = impacto_base.copy()
-            impacto_actualizado[idx] = impacto_base[idx] * (1 + sensibilidad/100)
-        else:
-            impacto_actualizado = impacto_base
-        
-        df_reformas = pd.DataFrame({
-            'Reforma': reformas,
-            'Impacto Esperado (%)': impacto_actualizado,
-            'Nivel de Confianza (%)': confianza,
-            'Tamaño Visual': [abs(x) + 10 for x in impacto_actualizado]  # CORREGIDO: Valores positivos para tamaño
-        })
-        
-        # Gráfico de barras interactivo
-        fig = px.bar(df_reformas, x='Reforma', y='Impacto Esperado (%)',
-                    color='Impacto Esperado (%)',
-                    title='Impacto Recaudatorio Esperado por Reforma',
-                    color_continuous_scale='RdYlGn',
-                    hover_data=['Nivel de Confianza (%)'])
-        
-        # Destacar la reforma seleccionada
-        if reforma_seleccionada:
-            idx_seleccionado = reformas.index(reforma_seleccionada)
-            fig.add_annotation(
-                x=idx_seleccionado,
-                y=impacto_actualizado[idx_seleccionado],
-                text="🔍 Seleccionada",
-                showarrow=True,
-                arrowhead=2,
-                arrowsize=1,
-                arrowwidth=2,
-                arrowcolor="red",
-                bgcolor="white",
-                bordercolor="red",
-                borderwidth=1
-            )
-        
-        fig.update_layout(
-            xaxis_tickangle=-45,
-            showlegend=False
-        )
-        st.plotly_chart(fig, use_container_width=True)
-        
-        # Gráfico adicional: Comparación de confianza vs impacto
-        st.subheader("📊 Relación Impacto-Confianza")
-        
-        # CORREGIDO: Usar valores absolutos para el tamaño y añadir colores por tipo de impacto
-        df_reformas['Tipo Impacto'] = ['Positivo' if x > 0 else 'Negativo' for x in df_reformas['Impacto Esperado (%)']]
-        
-        fig2 = px.scatter(df_reformas, 
-                         x='Impacto Esperado (%)', 
-                         y='Nivel de Confianza (%)',
-                         size='Tamaño Visual',  # CORREGIDO: Usar valores positivos
-                         text='Reforma',
-                         title='Relación entre Impacto Esperado y Nivel de Confianza',
-                         size_max=25,
-                         color='Tipo Impacto',  # Color por tipo de impacto
-                         color_discrete_map={'Positivo': 'green', 'Negativo': 'red'},
-                         hover_data=['Impacto Esperado (%)', 'Nivel de Confianza (%)'])
-        
-        # Destacar punto seleccionado
-        if reforma_seleccionada:
-            fig2.add_annotation(
-                x=impacto_actualizado[idx],
-                y=confianza[idx],
-                text="● Seleccionada",
-                showarrow=True,
-                arrowhead=2,
-                font=dict(color="blue", size=12, weight="bold")
-            )
-        
-        fig2.update_traces(
-            textposition='top center',
-            marker=dict(sizemode='diameter', sizeref=2.0)
-        )
-        fig2.update_layout(
-            xaxis_title="Impacto Esperado (%)",
-            yaxis_title="Nivel de Confianza (%)",
-            showlegend=True
-        )
-        st.plotly_chart(fig2, use_container_width=True)
-    
-    # Análisis de escenarios
-    st.subheader("🎯 Simulación de Escenarios")
-    
-    if reforma_seleccionada:
-        idx = reformas.index(reforma_seleccionada)
-        
-        col_scenario1, col_scenario2, col_scenario3 = st.columns(3)
-        
-        with col_scenario1:
-            st.markdown("**🔻 Escenario Conservador**")
-            impacto_conservador = impacto_base[idx] * 0.7
-            recaudacion_base = 100000  # Base de 100,000 millones
-            recaudacion_conservador = recaudacion_base * (impacto_conservador / 100)
-            st.metric("Impacto Estimado", f"{impacto_conservador:.1f}%")
-            st.metric("Recaudación Anual", f"${recaudacion_conservador:,.0f} M")
-        
-        with col_scenario2:
-            st.markdown("**📊 Escenario Base**")
-            impacto_base_val = impacto_base[idx]
-            recaudacion_base_val = recaudacion_base * (impacto_base_val / 100)
-            st.metric("Impacto Estimado", f"{impacto_base_val:.1f}%")
-            st.metric("Recaudación Anual", f"${recaudacion_base_val:,.0f} M")
-        
-        with col_scenario3:
-            st.markdown("**🔺 Escenario Optimista**")
-            impacto_optimista = impacto_base[idx] * 1.3
-            recaudacion_optimista = recaudacion_base * (impacto_optimista / 100)
-            st.metric("Impacto Estimado", f"{impacto_optimista:.1f}%")
-            st.metric("Recaudación Anual", f"${recaudacion_optimista:,.0f} M")
-        
-        # Gráfico de comparación de escenarios
-        st.subheader("📈 Comparativa de Escenarios")
-        
-        escenarios = ['Conservador', 'Base', 'Optimista']
-        impactos_escenarios = [impacto_conservador, impacto_base_val, impacto_optimista]
-        recaudaciones = [recaudacion_conservador, recaudacion_base_val, recaudacion_optimista]
-        
-        fig_escenarios = go.Figure()
-        
-        fig_escenarios.add_trace(go.Bar(
-            name='Impacto (%)',
-            x=escenarios,
-            y=impactos_escenarios,
-            yaxis='y',
-            offsetgroup=1,
-            marker_color=['#FF6B6B', '#4ECDC4', '#45B7D1']
-        ))
-        
-        fig_escenarios.add_trace(go.Scatter(
-            name='Recaudación (M$)',
-            x=escenarios,
-            y=recaudaciones,
-            yaxis='y2',
-            mode='lines+markers',
-            line=dict(color='#FFE66D', width=3),
-            marker=dict(size=8)
-        ))
-        
-        fig_escenarios.update_layout(
-            title=f'Comparación de Escenarios - {reforma_seleccionada}',
-            xaxis=dict(title='Escenarios'),
-            yaxis=dict(title='Impacto (%)', side='left'),
-            yaxis2=dict(title='Recaudación Anual (Millones MXN)', side='right', overlaying='y'),
-            showlegend=True
-        )
-        
-        st.plotly_chart(fig_escenarios, use_container_width=True)
-    
-    # Timeline de implementación
-    if reforma_seleccionada:
-        st.subheader("📅 Cronograma de Implementación Estimado")
-        
-        fases = ['Análisis', 'Discusión', 'Aprobación', 'Implementación', 'Evaluación']
-        meses = [3, 6, 9, 12, 18]
-        
-        df_timeline = pd.DataFrame({
-            'Fase': fases,
-            'Meses': meses,
-            'Progreso': [25, 50, 75, 90, 100]
-        })
-        
-        fig_timeline = px.line(df_timeline, x='Meses', y='Progreso', 
-                              markers=True, 
-                              title=f'Cronograma para: {reforma_seleccionada}',
-                              line_shape='linear')
-        
-        # Añadir anotaciones para cada fase
-        for i, fase in enumerate(fases):
-            fig_timeline.add_annotation(
-                x=meses[i],
-                y=df_timeline['Progreso'][i],
-                text=fase,
-                showarrow=True,
-                arrowhead=2,
-                yshift=10,
-                bgcolor='lightblue'
-            )
-        
-        fig_timeline.update_layout(
-            xaxis_title="Meses desde inicio",
-            yaxis_title="% de Progreso",
-            yaxis_range=[0, 100],
-            xaxis_range=[0, 20]
-        )
-        st.plotly_chart(fig_timeline, use_container_width=True)
-
-
-
-
-
-# FUNCIÓN 3: ESTUDIOS E INVESTIGACIÓN  
-elif st.session_state.selected_funcion == "Estudios Investigación":
-    st.header("🔬 Estudios e Investigación en Seguridad Social")
-    
-    st.markdown("""
-    **Objetivo:** Elaborar estudios en materia de seguridad social, salud, economía y mercado laboral
-    """)
-    
-    # Datos sintéticos de mercado laboral
-    sectores = ['Manufactura', 'Servicios', 'Comercio', 'Construcción', 'Agricultura', 'Salud', 'Educación']
-    afiliados_por_sector = np.random.randint(500000, 3500000, size=len(sectores))
-    crecimiento_sector = np.random.uniform(-2.0, 8.0, size=len(sectores))
-    informalidad = np.random.uniform(15.0, 65.0, size=len(sectores))
-    
-    df_sectores = pd.DataFrame({
-        'Sector': sectores,
-        'Afiliados': afiliados_por_sector,
-        'Crecimiento Anual (%)': crecimiento_sector,
-        'Tasa Informalidad (%)': informalidad
-    })
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("🏭 Afiliados por Sector Económico")
-        
-        # Gráfico de torta
-        fig = px.pie(df_sectores, values='Afiliados', names='Sector',
-                    title='Distribución de Afiliados por Sector Económico')
-        st.plotly_chart(fig, use_container_width=True)
-    
-    with col2:
-        st.subheader("📊 Crecimiento vs Informalidad")
-        
-        # Gráfico de dispersión
-        fig = px.scatter(df_sectores, x='Crecimiento Anual (%)', y='Tasa Informalidad (%)',
-                        size='Afiliados', text='Sector',
-                        title='Relación entre Crecimiento e Informalidad por Sector',
-                        size_max=60)
-        fig.update_traces(textposition='top center')
-        st.plotly_chart(fig, use_container_width=True)
-    
-    # Análisis correlacional
-    st.subheader("📊 Análisis de Correlaciones")
-    
-    correlacion = np.corrcoef(df_sectores['Crecimiento Anual (%)'], 
-                             df_sectores['Tasa Informalidad (%)'])[0,1]
-    
-    # CORREGIDO: st.metric sin parámetro key
-    st.metric("Correlación Crecimiento-Informalidad", f"{correlacion:.3f}")
-    
-    if correlacion < -0.3:
-        st.info("🔍 **Hallazgo:** Existe correlación negativa significativa entre crecimiento e informalidad")
-    elif correlacion > 0.3:
-        st.info("🔍 **Hallazgo:** Existe correlación positiva significativa entre crecimiento e informalidad")
-    else:
-        st.info("🔍 **Hallazgo:** No existe correlación significativa entre las variables")
-
-# FUNCIÓN 4: REPORTES DE AVANCES
-elif st.session_state.selected_funcion == "Reportes Avances":
-    st.header("📋 Generación de Reportes de Avances y Logros")
-    
-    st.markdown("""
-    **Objetivo:** Elaborar propuestas de reportes que muestren acciones, avances y logros en afiliación y recaudación
-    """)
-    
-    # Datos sintéticos para reportes
-    estados = ['CDMX', 'Jalisco', 'Nuevo León', 'Puebla', 'Veracruz', 'Chiapas', 'Baja California']
-    meta_afiliacion = np.random.randint(80000, 300000, size=len(estados))
-    avance_afiliacion = [int(x * np.random.uniform(0.6, 1.2)) for x in meta_afiliacion]
-    meta_recaudacion = np.random.randint(2000, 8000, size=len(estados)) * 1000
-    avance_recaudacion = [int(x * np.random.uniform(0.7, 1.3)) for x in meta_recaudacion]
-    
-    df_reportes = pd.DataFrame({
-        'Estado': estados,
-        'Meta Afiliación': meta_afiliacion,
-        'Avance Afiliación': avance_afiliacion,
-        '% Avance Afiliación': [f"{(a/m)*100:.1f}%" for a, m in zip(avance_afiliacion, meta_afiliacion)],
-        'Meta Recaudación (MXN)': [f"${m:,.0f}" for m in meta_recaudacion],
-        'Avance Recaudación (MXN)': [f"${a:,.0f}" for a in avance_recaudacion],
-        '% Avance Recaudación': [f"{(a/m)*100:.1f}%" for a, m in zip(avance_recaudacion, meta_recaudacion)]
-    })
-    
-    st.subheader("📈 Dashboard de Avances por Estado")
-    st.dataframe(df_reportes, use_container_width=True)
-    
-    # Selector de estado para detalle
-    estado_seleccionado = st.selectbox("Selecciona un estado para reporte detallado:", estados, key="estado_select")
-    
-    if estado_seleccionado:
-        idx = estados.index(estado_seleccionado)
-        
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            # CORREGIDO: st.metric sin parámetro key
-            st.metric("Meta Afiliación", f"{meta_afiliacion[idx]:,}")
-            st.metric("Avance Afiliación", f"{avance_afiliacion[idx]:,}")
-        
-        with col2:
-            porcentaje_afiliacion = (avance_afiliacion[idx] / meta_afiliacion[idx]) * 100
-            st.metric("% Avance Afiliación", f"{porcentaje_afiliacion:.1f}%")
-        
-        with col3:
-            st.metric("Meta Recaudación", f"${meta_recaudacion[idx]:,}")
-            st.metric("Avance Recaudación", f"${avance_recaudacion[idx]:,}")
-        
-        with col4:
-            porcentaje_recaudacion = (avance_recaudacion[idx] / meta_recaudacion[idx]) * 100
-            st.metric("% Avance Recaudación", f"{porcentaje_recaudacion:.1f}%")
-        
-        # Gráfico de progreso
-        fig = go.Figure()
-        
-        fig.add_trace(go.Indicator(
-            mode = "gauge+number+delta",
-            value = porcentaje_afiliacion,
-            domain = {'x': [0, 0.5], 'y': [0, 1]},
-            title = {'text': "Avance Afiliación"},
-            delta = {'reference': 100},
-            gauge = {
-                'axis': {'range': [None, 100]},
-                'bar': {'color': "darkblue"},
-                'steps': [
-                    {'range': [0, 70], 'color': "lightgray"},
-                    {'range': [70, 90], 'color': "gray"}],
-                'threshold': {
-                    'line': {'color': "red", 'width': 4},
-                    'thickness': 0.75,
-                    'value': 90}}))
-        
-        fig.add_trace(go.Indicator(
-            mode = "gauge+number+delta",
-            value = porcentaje_recaudacion,
-            domain = {'x': [0.5, 1], 'y': [0, 1]},
-            title = {'text': "Avance Recaudación"},
-            delta = {'reference': 100},
-            gauge = {
-                'axis': {'range': [None, 100]},
-                'bar': {'color': "darkgreen"},
-                'steps': [
-                    {'range': [0, 70], 'color': "lightgray"},
-                    {'range': [70, 90], 'color': "gray"}],
-                'threshold': {
-                    'line': {'color': "red", 'width': 4},
-                    'thickness': 0.75,
-                    'value': 90}}))
-        
-        fig.update_layout(title=f'Avance de Metas - {estado_seleccionado}')
-        st.plotly_chart(fig, use_container_width=True)
-
-# FUNCIÓN 5: METAS DE DESEMPEÑO
-elif st.session_state.selected_funcion == "Metas Desempeño":
-    st.header("🎯 Definición de Metas de Resultados y Desempeño")
-    
-    st.markdown("""
-    **Objetivo:** Colaborar en la definición de metas para unidades administrativas de Órganos Desconcentrados
-    """)
-    
-    # Simulador de establecimiento de metas
-    col1, col2 = st.columns([2, 1])
-    
-    with col2:
-        st.subheader("📐 Configuración de Metas")
-        
-        tipo_meta = st.radio("Tipo de Meta:", ["Afiliación", "Recaudación", "Eficiencia Operativa"], key="tipo_meta_radio")
-        
-        if tipo_meta == "Afiliación":
-            meta_base = st.number_input("Meta base de afiliación:", 1000, 1000000, 50000, key="meta_afiliacion_input")
-            crecimiento_meta = st.slider("Crecimiento esperado (%)", 0, 50, 15, key="crecimiento_afiliacion_slider")
-            meta_final = meta_base * (1 + crecimiento_meta/100)
-            
-        elif tipo_meta == "Recaudación":
-            meta_base = st.number_input("Meta base de recaudación (MXN):", 1000000, 100000000, 5000000, key="meta_recaudacion_input")
-            crecimiento_meta = st.slider("Crecimiento esperado (%)", 0, 50, 12, key="crecimiento_recaudacion_slider")
-            meta_final = meta_base * (1 + crecimiento_meta/100)
-            
-        else:  # Eficiencia Operativa
-            meta_base = st.number_input("Tiempo promedio actual (días):", 1, 30, 10, key="meta_eficiencia_input")
-            mejora_meta = st.slider("Reducción esperada (%)", 0, 50, 20, key="mejora_eficiencia_slider")
-            meta_final = meta_base * (1 - mejora_meta/100)
-        
-        # CORREGIDO: st.metric sin parámetro key
-        st.metric("Meta Propuesta", f"{meta_final:,.0f}" if tipo_meta != "Eficiencia Operativa" else f"{meta_final:.1f} días")
-        
-        if st.button("💾 Guardar Configuración de Meta", key="btn_guardar_meta"):
-            st.success("✅ Configuración de meta guardada exitosamente")
-    
-    with col1:
-        st.subheader("📊 Simulación de Cumplimiento de Metas")
-        
-        # Generar datos de simulación
-        trimestres = ['Q1', 'Q2', 'Q3', 'Q4']
-        cumplimiento = np.random.uniform(0.7, 1.3, size=4) * 100
-        
-        df_simulacion = pd.DataFrame({
-            'Trimestre': trimestres,
-            'Cumplimiento (%)': cumplimiento
-        })
-        
-        fig = px.bar(df_simulacion, x='Trimestre', y='Cumplimiento (%)',
-                    title='Simulación de Cumplimiento Trimestral',
-                    color='Cumplimiento (%)',
-                    color_continuous_scale='RdYlGn')
-        fig.add_hline(y=100, line_dash="dash", line_color="red", 
-                     annotation_text="Meta 100%", annotation_position="bottom right")
-        st.plotly_chart(fig, use_container_width=True)
-        
-        # Análisis de riesgo
-        riesgo_bajo_meta = len([x for x in cumplimiento if x < 90])
-        # CORREGIDO: st.metric sin parámetro key
-        st.metric("Trimestres con riesgo de incumplimiento", riesgo_bajo_meta)
-
-# FUNCIÓN 6: DETECCIÓN DE ANOMALÍAS
-
-# FUNCIÓN 6: DETECCIÓN DE ANOMALÍAS
-elif st.session_state.selected_funcion == "Detección Anomalías":
-    st.header("🔍 Detección de Esquemas de Comportamiento Atípicos")
-    
-    st.markdown("""
-    **Objetivo:** Identificar esquemas de comportamiento atípicos que impacten al Instituto en materia de afiliación y recaudación
-    """)
-    
-    # Configuración inicial en session_state
-    if 'datos_anomalias' not in st.session_state:
-        st.session_state.datos_anomalias = None
-    if 'metodo_seleccionado' not in st.session_state:
-        st.session_state.metodo_seleccionado = "IQR (Recomendado)"
-    if 'sensibilidad_actual' not in st.session_state:
-        st.session_state.sensibilidad_actual = 3
-    
-    # Sidebar para configuración
-    with st.sidebar:
-        st.header("⚙️ Configuración de Detección")
-        
-        # Selector de método de detección
-        metodo = st.selectbox(
-            "Método de detección:",
-            ["IQR (Recomendado)", "Desviación Estándar", "Percentiles"],
-            key="metodo_deteccion_select"
-        )
-        
-        # Ajustar sensibilidad según el método
-        if metodo == "Desviación Estándar":
-            sensibilidad = st.slider(
-                "Número de desviaciones estándar:",
-                min_value=1.0,
-                max_value=5.0,
-                value=3.0,
-                step=0.5,
-                key="sensibilidad_std"
-            )
-        elif metodo == "Percentiles":
-            col_perc1, col_perc2 = st.columns(2)
-            with col_perc1:
-                percentil_inf = st.slider("Percentil inferior:", 1, 25, 5, key="percentil_inf")
-            with col_perc2:
-                percentil_sup = st.slider("Percentil superior:", 75, 99, 95, key="percentil_sup")
-        else:  # IQR
-            sensibilidad = st.slider(
-                "Multiplicador IQR:",
-                min_value=1.0,
-                max_value=3.0,
-                value=1.5,
-                step=0.1,
-                key="sensibilidad_iqr"
-            )
-        
-        # Selector de tipo de datos
-        tipo_datos = st.selectbox(
-            "Tipo de datos a analizar:",
-            ["Afiliaciones Diarias", "Recaudación Diaria", "Tasa de Crecimiento", "Eficiencia Operativa"],
-            key="tipo_datos_select"
-        )
-        
-        # Rango de días a analizar
-        num_dias = st.slider(
-            "Número de días a analizar:",
-            min_value=7,
-            max_value=90,
-            value=30,
-            key="num_dias_slider"
-        )
-        
-        # Botón para generar nuevos datos
-        if st.button("🔄 Generar Nuevos Datos Aleatorios", key="btn_nuevos_datos"):
-            st.session_state.datos_anomalias = None
-            st.rerun()
-    
-    # Generar o recuperar datos
-    if st.session_state.datos_anomalias is None:
-        # Generar datos sintéticos con anomalías
-        np.random.seed(np.random.randint(1, 1000))  # Semilla aleatoria cada vez
-        dias = list(range(1, num_dias + 1))
-        
-        # Datos base según el tipo seleccionado
-        if tipo_datos == "Afiliaciones Diarias":
-            base_value = 5000
-            std_dev = 500
-            anomalia_alta = 15000
-            anomalia_baja = 800
-        elif tipo_datos == "Recaudación Diaria":
-            base_value = 1000000
-            std_dev = 100000
-            anomalia_alta = 3000000
-            anomalia_baja = 200000
-        elif tipo_datos == "Tasa de Crecimiento":
-            base_value = 2.0
-            std_dev = 0.5
-            anomalia_alta = 8.0
-            anomalia_baja = -3.0
-        else:  # Eficiencia Operativa
-            base_value = 85.0
-            std_dev = 5.0
-            anomalia_alta = 98.0
-            anomalia_baja = 45.0
-        
-        # Generar datos normales
-        datos = np.random.normal(base_value, std_dev, num_dias)
-        
-        # Insertar anomalías aleatorias
-        num_anomalias = np.random.randint(2, 5)  # Entre 2 y 4 anomalías
-        posiciones_anomalias = np.random.choice(range(num_dias), num_anomalias, replace=False)
-        
-        for i, pos in enumerate(posiciones_anomalias):
-            if i % 2 == 0:
-                datos[pos] = anomalia_alta * np.random.uniform(0.8, 1.2)  # Anomalía alta
-            else:
-                datos[pos] = anomalia_baja * np.random.uniform(0.8, 1.2)  # Anomalía baja
-        
-        st.session_state.datos_anomalias = {
-            'dias': dias,
-            'datos': datos,
-            'tipo_datos': tipo_datos,
-            'base_value': base_value
-        }
-    
-    # Recuperar datos
-    datos_actuales = st.session_state.datos_anomalias
-    dias = datos_actuales['dias']
-    datos = datos_actuales['datos']
-    tipo_datos = datos_actuales['tipo_datos']
-    base_value = datos_actuales['base_value']
-    
-    df_deteccion = pd.DataFrame({
-        'Día': dias,
-        'Valor': datos
-    })
-    
-    # Calcular límites según el método seleccionado
-    if metodo == "Desviación Estándar":
-        media = np.mean(datos)
-        std = np.std(datos)
-        limite_superior = media + sensibilidad * std
-        limite_inferior = media - sensibilidad * std
-    elif metodo == "Percentiles":
-        limite_inferior = np.percentile(datos, percentil_inf)
-        limite_superior = np.percentile(datos, percentil_sup)
-    else:  # IQR
-        Q1 = np.percentile(datos, 25)
-        Q3 = np.percentile(datos, 75)
-        IQR = Q3 - Q1
-        limite_superior = Q3 + sensibilidad * IQR
-        limite_inferior = Q1 - sensibilidad * IQR
-    
-    # Identificar anomalías
-    anomalias = df_deteccion[
-        (df_deteccion['Valor'] > limite_superior) | 
-        (df_deteccion['Valor'] < limite_inferior)
-    ]
-    
-    # Layout principal
-    col_estadisticas, col_visualizacion = st.columns([1, 2])
-    
-    with col_estadisticas:
-        st.subheader("📊 Estadísticas de Detección")
-        
-        # Métricas clave
-        st.metric("Total de Días Analizados", len(df_deteccion))
-        st.metric("Anomalías Detectadas", len(anomalias))
-        
-        tasa_anomalias = (len(anomalias) / len(df_deteccion)) * 100
-        st.metric("Tasa de Anomalías", f"{tasa_anomalias:.1f}%")
-        
-        st.metric("Límite Superior", f"{limite_superior:,.1f}")
-        st.metric("Límite Inferior", f"{limite_inferior:,.1f}")
-        
-        # Análisis de impacto
-        if not anomalias.empty:
-            impacto_total = anomalias['Valor'].sum() - (base_value * len(anomalias))
-            st.metric(
-                "Impacto Total", 
-                f"{impacto_total:,.0f}",
-                delta=f"{impacto_total:+,.0f}"
-            )
-        
-        # Recomendación automática
-        st.subheader("💡 Recomendación")
-        if len(anomalias) > 4:
-            st.error("🚨 **Investigación Urgente**: Múltiples anomalías detectadas")
-        elif len(anomalias) > 1:
-            st.warning("⚠️ **Monitoreo Reforzado**: Anomalías significativas presentes")
-        elif len(anomalias) == 1:
-            st.info("🔍 **Investigación Puntual**: Anomalía aislada detectada")
-        else:
-            st.success("✅ **Comportamiento Normal**: Sin anomalías detectadas")
-    
-    with col_visualizacion:
-        st.subheader(f"📈 Análisis de {tipo_datos}")
-        
-        # Gráfico principal
-        fig = go.Figure()
-        
-        # Datos normales
-        datos_normales = df_deteccion[~df_deteccion.index.isin(anomalias.index)]
-        fig.add_trace(go.Scatter(
-            x=datos_normales['Día'], 
-            y=datos_normales['Valor'],
-            mode='lines+markers', 
-            name='Comportamiento Normal',
-            line=dict(color='blue', width=2),
-            marker=dict(size=6)
-        ))
-        
-        # Anomalías
-        if not anomalias.empty:
-            fig.add_trace(go.Scatter(
-                x=anomalias['Día'], 
-                y=anomalias['Valor'],
-                mode='markers', 
-                name='Comportamiento Atípico',
-                marker=dict(color='red', size=12, symbol='x', line=dict(width=2))
-            ))
-        
-        # Límites
-        fig.add_hline(
-            y=limite_superior, 
-            line_dash="dash", 
-            line_color="orange",
-            annotation_text=f"Lím. Sup: {limite_superior:,.0f}", 
-            annotation_position="bottom right"
-        )
-        fig.add_hline(
-            y=limite_inferior, 
-            line_dash="dash", 
-            line_color="orange",
-            annotation_text=f"Lím. Inf: {limite_inferior:,.0f}", 
-            annotation_position="top right"
-        )
-        
-        # Línea de promedio
-        fig.add_hline(
-            y=base_value,
-            line_dash="dot",
-            line_color="green",
-            annotation_text=f"Promedio: {base_value:,.0f}",
-            annotation_position="top left"
-        )
-        
-        fig.update_layout(
-            title=f'Detección de Anomalías - {tipo_datos}',
-            xaxis_title='Día',
-            yaxis_title=tipo_datos,
-            hovermode='closest',
-            height=500
-        )
-        st.plotly_chart(fig, use_container_width=True)
-    
-    # Gráficos adicionales
-    col_hist, col_box = st.columns(2)
-    
-    with col_hist:
-        st.subheader("📊 Distribución de Datos")
-        fig_hist = px.histogram(
-            df_deteccion, 
-            x='Valor',
-            nbins=20,
-            title='Distribución de Frecuencia',
-            color_discrete_sequence=['lightblue']
-        )
-        
-        # Añadir líneas de límites
-        fig_hist.add_vline(x=limite_superior, line_dash="dash", line_color="red")
-        fig_hist.add_vline(x=limite_inferior, line_dash="dash", line_color="red")
-        fig_hist.add_vline(x=base_value, line_dash="dot", line_color="green")
-        
-        st.plotly_chart(fig_hist, use_container_width=True)
-    
-    with col_box:
-        st.subheader("📦 Diagrama de Caja")
-        fig_box = px.box(
-            df_deteccion,
-            y='Valor',
-            title='Diagrama de Caja - Detección de Outliers',
-            points='all'
-        )
-        
-        # Resaltar anomalías
-        if not anomalias.empty:
-            fig_box.add_trace(go.Scatter(
-                x=[0] * len(anomalias),
-                y=anomalias['Valor'],
-                mode='markers',
-                marker=dict(color='red', size=8, symbol='x'),
-                name='Anomalías Detectadas'
-            ))
-        
-        st.plotly_chart(fig_box, use_container_width=True)
-    
-    # Reporte detallado de anomalías
-    if not anomalias.empty:
-        st.subheader("📋 Reporte Detallado de Anomalías")
-        
-        # Preparar datos del reporte
-        reporte_anomalias = anomalias.copy()
-        reporte_anomalias['Desviación'] = reporte_anomalias['Valor'] - base_value
-        reporte_anomalias['Desviación %'] = ((reporte_anomalias['Valor'] - base_value) / base_value * 100).round(1)
-        reporte_anomalias['Tipo'] = ['Alta' if x > limite_superior else 'Baja' for x in reporte_anomalias['Valor']]
-        reporte_anomalias['Severidad'] = reporte_anomalias['Desviación %'].abs().apply(
-            lambda x: 'Alta' if x > 100 else 'Media' if x > 50 else 'Baja'
-        )
-        
-        # Mostrar tabla
-        st.dataframe(
-            reporte_anomalias[['Día', 'Valor', 'Tipo', 'Severidad', 'Desviación', 'Desviación %']],
-            use_container_width=True
-        )
-        
-        # Análisis de patrones
-        st.subheader("🔍 Análisis de Patrones")
-        
-        if len(anomalias) >= 3:
-            # Calcular frecuencia de anomalías
-            dias_entre_anomalias = np.diff(anomalias['Día'])
-            frecuencia_promedio = np.mean(dias_entre_anomalias)
-            
-            col_pat1, col_pat2, col_pat3 = st.columns(3)
-            with col_pat1:
-                st.metric("Frecuencia Promedio", f"{frecuencia_promedio:.1f} días")
-            with col_pat2:
-                tipos_anomalias = reporte_anomalias['Tipo'].value_counts()
-                mayor_tipo = tipos_anomalias.idxmax()
-                st.metric("Tipo Predominante", mayor_tipo)
-            with col_pat3:
-                severidad_pred = reporte_anomalias['Severidad'].value_counts().idxmax()
-                st.metric("Severidad Predominante", severidad_pred)
-    else:
-        st.success("🎉 No se detectaron anomalías en el período analizado. El comportamiento se encuentra dentro de los parámetros normales.")
-
-
-
-# Botón para volver al inicio
-st.markdown("---")
-if st.button("🏠 Volver al Inicio", key="btn_volver_inicio"):
-    st.session_state.selected_funcion = None
-    st.rerun()
-
-# Footer
-st.markdown("---")
-st.markdown(
-    "**Desarrollado como demostración de capacidades técnicas para el proceso de selección - "
-    "Subjefe de División de Política Fiscal**"
-)
\ No newline at end of file
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Sep 29 11:06:10 2025
+
+@author: jahop
+"""
+
+import os
+import tempfile
+import uuid
+from functools import wraps
+
+import streamlit as st
+import pandas as pd
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+
+from datetime import datetime  # <-- AGREGAR ESTA LÍNEA
+
+import motor
+
+# Configuración de la página
+st.set_page_config(
+    page_title="Simulador de Funciones - Política Fiscal IMSS",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# Título principal
+st.title("🏛️ Simulador de Funciones - Subdivisión de Política Fiscal")
+st.markdown("**Herramienta interactiva para demostrar las capacidades requeridas en la vacante**")
+
+# Sidebar con información de la vacante
+with st.sidebar:
+    # AGREGADO: Nombre y fecha
+    st.header("👤 Información del Candidato")
+    st.markdown("**Nombre:** Javier Horacio Pérez Ricárdez")
+    st.markdown(f"**Fecha:** {datetime.now().strftime('%d/%m/%Y %H:%M')}")
+    
+    st.divider()
+    
+    st.header("📋 Información de la Vacante")
+    st.markdown("""
+    **Puesto:** Subjefe de División de Política Fiscal  
+    **Nivel:** N31  
+    **Salario:** $53,000 MXN brutos mensuales  
+    **Área:** Coordinación de Planeación y Evaluación
+    """)
+    
+    st.divider()
+    st.markdown("### 🎯 Funciones Disponibles")
+    st.markdown("Selecciona una función para explorar en los botones:")
+    
+    st.divider()
+    archivo_datos = st.file_uploader(
+        "📂 Datos reales (CSV, Parquet o Arrow)",
+        type=["csv", "parquet", "arrow", "feather"],
+        help="Columnas: fecha, estado, sector, afiliados, recaudacion "
+             "(opcionales: informales, meta_afiliacion, meta_recaudacion)",
+        key="archivo_datos_reales"
+    )
+    modo_depuracion = st.toggle(
+        "🛠️ Panel de rendimiento",
+        help="Muestra p50/p95 por sección y etapa y mide el tamaño de cada gráfica enviada",
+        key="modo_depuracion"
+    )
+
+# Simulaciones Monte Carlo cacheadas por parámetros (semilla fija para reproducibilidad)
+SEMILLA_MONTECARLO = 2024
+
+
+@st.cache_data(max_entries=32, show_spinner="Simulando trayectorias Monte Carlo...")
+def bandas_presupuesto(presupuesto_base, crecimiento, desv_crecimiento, inflacion, desv_inflacion,
+                       horizonte, real, num_trayectorias):
+    return motor.simular_presupuesto(
+        presupuesto_base,
+        motor.Distribucion("normal", (crecimiento, desv_crecimiento)),
+        motor.Distribucion("normal", (inflacion, desv_inflacion)),
+        horizonte=horizonte,
+        real=real,
+        num_trayectorias=num_trayectorias,
+        semilla=SEMILLA_MONTECARLO
+    )
+
+
+@st.cache_data(max_entries=32, show_spinner="Simulando trayectorias Monte Carlo...")
+def bandas_reforma(impacto_base, sensibilidad, desv_sensibilidad, num_trayectorias):
+    return motor.simular_reforma(
+        impacto_base,
+        motor.Distribucion("normal", (sensibilidad, desv_sensibilidad)),
+        num_trayectorias=num_trayectorias,
+        semilla=SEMILLA_MONTECARLO
+    )
+
+
+# Microsimulación de reformas sobre una muestra expandida a la población nacional
+MUESTRA_MICROSIMULACION = 2000000
+
+
+@st.cache_data(max_entries=4, show_spinner="Microsimulando reformas...")
+def microsimulacion_reformas(num_registros):
+    return motor.simular_reformas(motor.Poblacion(num_registros))
+
+
+@st.cache_data(max_entries=4, show_spinner="Estimando elasticidades...")
+def elasticidades_reformas(num_registros):
+    return motor.elasticidades(num_registros)
+
+
+@st.cache_data(max_entries=4, show_spinner="Midiendo interacciones entre reformas...")
+def interacciones_reformas(num_registros):
+    return motor.tabla_interacciones(motor.Poblacion(num_registros), motor.REFORMAS, motor.CONFIANZA)
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def frente_reformas(num_registros):
+    """Frente de Pareto impacto-confianza de todas las combinaciones de niveles."""
+    tabla = interacciones_reformas(num_registros)
+    niveles, impacto, confianza = motor.enumerar_combinaciones(tabla)
+    frente = motor.frente_pareto(impacto, confianza)
+    return pd.DataFrame({
+        'Impacto (%)': impacto[frente],
+        'Confianza (%)': confianza[frente],
+        'Combinación': [
+            " + ".join(f"{r} ({nivel:.0%})" for r, nivel in zip(tabla.reformas, fila) if nivel > 0) or "Sin reformas"
+            for fila in niveles[frente]
+        ]
+    })
+
+
+# Datos de referencia de solo lectura compartidos por todas las sesiones del proceso:
+# cada sesión guarda solo la semilla y los parámetros, nunca su propia copia
+MEMORIA_DATOS_MB = float(os.environ.get("DATOS_COMPARTIDOS_MB", 512))
+SEMILLA_INICIAL = 2024
+
+
+@st.cache_resource
+def almacen_datos():
+    return motor.AlmacenCompartido(int(MEMORIA_DATOS_MB * 2**20))
+
+
+def datos_seccion(seccion, semilla, **parametros):
+    """Datos sintéticos de la sección, compartidos por (sección, semilla, parámetros)."""
+    clave = (seccion, semilla, tuple(sorted(parametros.items())))
+    with motor.etapa("datos"):
+        return almacen_datos().obtener(clave, lambda: motor.generar_datos(seccion, semilla, **parametros))
+
+
+def semilla_seccion(seccion):
+    """Semilla vigente de la sección; solo cambia cuando el usuario regenera."""
+    return st.session_state.semillas.setdefault(seccion, SEMILLA_INICIAL)
+
+
+def boton_regenerar(seccion):
+    """Botón que cambia la semilla; se dibuja antes de leer los datos de la sección."""
+    if st.button("🔄 Regenerar datos", key=f"btn_regenerar_{seccion}"):
+        st.session_state.semillas[seccion] = motor.nueva_semilla()
+
+
+# Archivos reales compartidos por la huella de su contenido
+def cargar_datos_reales(huella, archivo):
+    clave = ("archivo", huella)
+
+    def construir():
+        with st.spinner("Procesando archivo de datos..."):
+            return motor.cargar_series(archivo, huella=huella)
+    return almacen_datos().obtener(clave, construir)
+
+
+# Figuras compartidas entre reejecuciones, cacheadas por la huella de sus datos y parámetros
+@st.cache_resource
+def cache_figuras():
+    return motor.CacheFiguras(max_entradas=128)
+
+
+# Cubo sector × estado × mes: de solo lectura, se comparte sin copiarlo
+@st.cache_resource(max_entries=8, show_spinner="Construyendo cubo regional...")
+def construir_cubo(clave, _series):
+    if _series is not None:
+        return _series.cubo()
+    return motor.Cubo.desde_registros(datos_seccion("Estudios Investigación", clave))
+
+
+def cubo_regional():
+    """Cubo del archivo cargado o del panel sintético de Estudios Investigación."""
+    if datos_reales is not None:
+        return construir_cubo(datos_reales.huella, datos_reales)
+    return construir_cubo(semilla_seccion("Estudios Investigación"), None)
+
+
+# Correlaciones bootstrap cacheadas por la huella del conjunto de datos
+@st.cache_data(max_entries=16, show_spinner="Calculando intervalos bootstrap...")
+def correlaciones_estudio(huella, _datos, num_remuestreos, nivel):
+    return motor.correlaciones_bootstrap(_datos, num_remuestreos=num_remuestreos, nivel=nivel)
+
+
+# Registro de metas compartido por todas las sesiones (pool de conexiones SQLite)
+RUTA_REGISTRO_METAS = os.environ.get("METAS_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "metas.sqlite"))
+
+
+@st.cache_resource
+def registro_metas():
+    return motor.RegistroMetas(RUTA_REGISTRO_METAS)
+
+
+def figura(nombre, constructor, *datos, **parametros):
+    with motor.etapa(f"figura {nombre}"):
+        return cache_figuras().figura(nombre, constructor, *datos, **parametros)
+
+
+def grafica(fig, **kwargs):
+    """``st.plotly_chart`` medido; en modo depuración registra también el tamaño de la figura."""
+    if st.session_state.get('modo_depuracion'):
+        motor.INSTRUMENTACION.registrar_bytes("plotly_chart", len(fig.to_json()))
+    with motor.etapa("plotly_chart"):
+        st.plotly_chart(fig, **kwargs)
+
+
+# Tiempos por sección, etapa y sesión en el registro de instrumentación del proceso
+ID_SESION = st.session_state.setdefault('id_sesion', uuid.uuid4().hex[:8])
+
+
+def instrumentar(nombre):
+    """Mide cada ejecución del fragmento como la sección ``nombre`` de esta sesión."""
+    def decorador(funcion):
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with motor.INSTRUMENTACION.seccion(nombre, ID_SESION):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+
+datos_reales = None
+if archivo_datos is not None:
+    # La huella se calcula una sola vez por archivo subido
+    huellas = st.session_state.setdefault('huellas_archivos', {})
+    if archivo_datos.file_id not in huellas:
+        huellas[archivo_datos.file_id] = motor.hash_contenido(archivo_datos)
+    datos_reales = cargar_datos_reales(huellas[archivo_datos.file_id], archivo_datos)
+    with st.sidebar:
+        st.caption(f"✅ {datos_reales.filas_leidas:,} filas cargadas de {archivo_datos.name}")
+        if datos_reales.filas_sin_fecha:
+            st.warning(f"⚠️ {datos_reales.filas_sin_fecha:,} filas sin fecha quedaron fuera del análisis")
+
+
+# Lista de funciones del puesto
+funciones = {
+    "Presupuesto": "Integrar información para el anteproyecto de presupuesto",
+    "Análisis Reformas": "Evaluar impacto recaudatorio de reformas",
+    "Estudios Investigación": "Elaborar estudios de seguridad social y mercado laboral",
+    "Reportes Avances": "Generar reportes de acciones y logros",
+    "Metas Desempeño": "Definir metas para unidades administrativas",
+    "Detección Anomalías": "Identificar esquemas de comportamiento atípicos"
+}
+
+# Usar session_state para mantener la función seleccionada
+if 'selected_funcion' not in st.session_state:
+    st.session_state.selected_funcion = None
+if 'semillas' not in st.session_state:
+    st.session_state.semillas = {}
+
+# Crear botones para cada función
+cols = st.columns(3)
+for i, (funcion, descripcion) in enumerate(funciones.items()):
+    with cols[i % 3]:
+        if st.button(f"**{funcion}**", use_container_width=True, key=f"btn_{funcion}"):
+            st.session_state.selected_funcion = funcion
+            st.rerun()
+
+# Cada sección es un fragmento: sus widgets solo vuelven a ejecutar la propia sección,
+# no el encabezado, la barra lateral ni la rejilla de botones
+
+# PANTALLA DE INICIO
+@st.fragment
+@instrumentar("Inicio")
+def pantalla_inicio():
+    st.markdown("---")
+    st.subheader("🚀 Bienvenido/a al Simulador de Funciones")
+    st.markdown("""
+    Esta herramienta demuestra las capacidades técnicas y analíticas requeridas para el puesto de 
+    **Subjefe de División de Política Fiscal** en el IMSS.
+    
+    ### 📊 Características:
+    - Análisis de datos con Python y Pandas
+    - Visualizaciones interactivas con Plotly
+    - Simulación de escenarios presupuestales
+    - Detección de anomalías en datos
+    - Reportes ejecutivos automatizados
+    
+    ### 👆 **Selecciona una función en los botones superiores para comenzar**
+    """)
+    
+    # Mostrar datos de ejemplo
+    st.markdown("### 📈 Vista Previa de Datos de Ejemplo")
+    
+    # Generar datos sintéticos de afiliación
+    boton_regenerar("Inicio")
+    df_ejemplo = datos_seccion("Inicio", semilla_seccion("Inicio"))
+    
+    st.dataframe(df_ejemplo, use_container_width=True)
+    
+    # Gráfico de ejemplo
+    fig = px.line(df_ejemplo, x='Mes', y='Afiliados', 
+                  title='Tendencia de Afiliados Mensual (Ejemplo)',
+                  markers=True)
+    grafica(fig, use_container_width=True)
+
+# FUNCIÓN 1: PRESUPUESTO
+@st.fragment
+@instrumentar("Presupuesto")
+def seccion_presupuesto():
+    st.header("💰 Integración de Información para Presupuesto")
+    
+    st.markdown("""
+    **Objetivo:** Elaborar diferentes escenarios del anteproyecto de presupuesto de ingresos y egresos
+    """)
+    
+    # Simulación de escenarios presupuestales
+    col1, col2 = st.columns([2, 1])
+    
+    with col2:
+        st.subheader("⚙️ Parámetros del Escenario")
+        crecimiento = st.slider("Crecimiento esperado (%)", -5.0, 15.0, 3.5, 0.5, key="presupuesto_crecimiento")
+        inflacion = st.slider("Inflación esperada (%)", 2.0, 8.0, 4.0, 0.1, key="presupuesto_inflacion")
+        año_base = st.number_input("Presupuesto base (millones MXN)", 50000, 200000, 120000, key="presupuesto_base")
+        horizonte = st.slider("Horizonte de proyección (años)", 4, 30, 4, key="presupuesto_horizonte")
+        en_terminos_reales = st.toggle("Expresar en términos reales", key="presupuesto_real",
+                                       help="Deflacta los montos a pesos del año base con la inflación esperada")
+        
+        if st.button("Generar Escenarios Presupuestales", key="btn_generar_presupuesto"):
+            st.success("✅ Escenarios generados exitosamente")
+        
+        st.subheader("🎲 Incertidumbre")
+        modo_montecarlo = st.toggle("Modo Monte Carlo", key="presupuesto_montecarlo")
+        if modo_montecarlo:
+            num_trayectorias = st.select_slider("Trayectorias simuladas", [10000, 100000, 1000000],
+                                                value=100000, key="presupuesto_trayectorias")
+            desv_crecimiento = st.slider("Desviación del crecimiento (pp)", 0.1, 5.0, 1.5, 0.1,
+                                         key="presupuesto_desv_crecimiento")
+            desv_inflacion = st.slider("Desviación de la inflación (pp)", 0.1, 3.0, 0.8, 0.1,
+                                       key="presupuesto_desv_inflacion")
+    
+    with col1:
+        # Generar datos para escenarios presupuestales
+        df_proyeccion = motor.proyectar_escenarios(año_base, crecimiento, inflacion,
+                                                   horizonte, real=en_terminos_reales)
+        años = df_proyeccion['Año']
+        
+        # El formato de moneda se aplica solo al mostrar la tabla
+        df_presupuesto = df_proyeccion.copy()
+        for escenario in motor.ESCENARIOS:
+            df_presupuesto[escenario] = [f"${x/1000:,.1f}M" for x in df_proyeccion[escenario]]
+        
+        st.subheader("📊 Escenarios Presupuestales Proyectados")
+        st.dataframe(df_presupuesto, use_container_width=True)
+        
+        # Gráfico de escenarios
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=años, y=df_proyeccion['Conservador'], 
+                               mode='lines+markers', name='Conservador',
+                               line=dict(dash='dash')))
+        fig.add_trace(go.Scatter(x=años, y=df_proyeccion['Moderado'], 
+                               mode='lines+markers', name='Moderado'))
+        fig.add_trace(go.Scatter(x=años, y=df_proyeccion['Optimista'], 
+                               mode='lines+markers', name='Optimista',
+                               line=dict(dash='dot')))
+        
+        # Abanico P5-P95 con la mediana de las trayectorias simuladas
+        if modo_montecarlo:
+            df_bandas = bandas_presupuesto(año_base, crecimiento, desv_crecimiento, inflacion,
+                                           desv_inflacion, horizonte, en_terminos_reales, num_trayectorias)
+            fig.add_trace(go.Scatter(x=df_bandas['Año'], y=df_bandas['P95'],
+                                   mode='lines', line=dict(width=0),
+                                   showlegend=False, hoverinfo='skip'))
+            fig.add_trace(go.Scatter(x=df_bandas['Año'], y=df_bandas['P5'],
+                                   mode='lines', line=dict(width=0),
+                                   fill='tonexty', fillcolor='rgba(116, 190, 224, 0.3)',
+                                   name='Banda P5-P95'))
+            fig.add_trace(go.Scatter(x=df_bandas['Año'], y=df_bandas['P50'],
+                                   mode='lines', name='Mediana Monte Carlo',
+                                   line=dict(color='#74BEE0', width=3)))
+        
+        fig.update_layout(title='Proyección de Escenarios Presupuestales',
+                         xaxis_title='Año',
+                         yaxis_title='Presupuesto (Millones MXN)' + (' reales' if en_terminos_reales else ''))
+        grafica(fig, use_container_width=True)
+    
+    # Rejilla completa de escenarios: crecimiento × inflación en una sola operación
+    with st.expander("🧮 Rejilla de Escenarios (crecimiento × inflación)"):
+        crecimientos_rejilla = np.arange(-5.0, 15.5, 0.5)
+        inflaciones_rejilla = np.arange(2.0, 8.1, 0.1)
+        parametros_rejilla, matriz_rejilla = motor.rejilla_escenarios(
+            año_base, crecimientos_rejilla, inflaciones_rejilla, horizonte, real=True)
+        
+        presupuesto_final = matriz_rejilla[:, horizonte - 1].reshape(
+            len(crecimientos_rejilla), len(inflaciones_rejilla))
+        
+        fig_rejilla = go.Figure(go.Heatmap(
+            x=inflaciones_rejilla,
+            y=crecimientos_rejilla,
+            z=presupuesto_final,
+            colorscale='RdYlGn',
+            colorbar=dict(title='Millones MXN')
+        ))
+        año_final = df_proyeccion['Año'].iloc[-1]
+        fig_rejilla.update_layout(
+            title=f'Presupuesto real en {año_final} ({len(parametros_rejilla):,} escenarios)',
+            xaxis_title='Inflación esperada (%)',
+            yaxis_title='Crecimiento nominal (%)'
+        )
+        grafica(fig_rejilla, use_container_width=True)
+
+# FUNCIÓN 2: ANÁLISIS DE REFORMAS
+@st.fragment
+@instrumentar("Análisis Reformas")
+def seccion_reformas():
+    st.header("📊 Evaluación de Impacto Recaudatorio de Reformas")
+    
+    st.markdown("""
+    **Objetivo:** Analizar el impacto recaudatorio de reformas propuestas a la Ley del Seguro Social
+    """)
+    
+    # Simulación de impacto de reformas
+    reformas = motor.REFORMAS
+    
+    # Impacto base de cada reforma según la microsimulación (puede cambiar con la sensibilidad)
+    df_microsimulacion = microsimulacion_reformas(MUESTRA_MICROSIMULACION)
+    impacto_base = df_microsimulacion.set_index('Reforma')['Impacto (%)'].reindex(reformas).tolist()
+    confianza = motor.CONFIANZA
+    
+    col1, col2 = st.columns([3, 2])
+    
+    with col2:
+        st.subheader("📋 Configuración del Análisis")
+        
+        # Selector de reforma específica
+        reforma_seleccionada = st.selectbox("Selecciona una reforma para análisis detallado:", reformas, key="reforma_select")
+        
+        if reforma_seleccionada:
+            idx = reformas.index(reforma_seleccionada)
+            
+            # Análisis de sensibilidad
+            st.subheader("🔍 Análisis de Sensibilidad")
+            sensibilidad = st.slider("Variación en supuestos clave (%)", -20, 20, 0, key="sensibilidad_slider")
+            
+            # Calcular impacto ajustado
+            impacto_ajustado = motor.ajustar_impacto(impacto_base[idx], sensibilidad)
+            
+            # Mostrar métricas
+            col_metric1, col_metric2 = st.columns(2)
+            with col_metric1:
+                st.metric("Impacto Base", f"{impacto_base[idx]:.1f}%")
+                st.metric("Impacto Ajustado", f"{impacto_ajustado:.1f}%", 
+                         delta=f"{impacto_ajustado - impacto_base[idx]:+.1f}%")
+            with col_metric2:
+                st.metric("Nivel de Confianza", f"{confianza[idx]}%")
+                
+                # Calcular confianza ajustada (inversamente proporcional a la variación)
+                confianza_ajustada = motor.ajustar_confianza(confianza[idx], sensibilidad)
+                st.metric("Confianza Ajustada", f"{confianza_ajustada:.0f}%")
+            
+            modo_montecarlo = st.toggle("🎲 Modo Monte Carlo", key="reformas_montecarlo")
+            if modo_montecarlo:
+                desv_sensibilidad = st.slider("Desviación de los supuestos (%)", 1, 40, 15,
+                                              key="reformas_desv_sensibilidad")
+    
+    with col1:
+        st.subheader("📈 Impacto de Reformas Propuestas")
+        
+        # Crear DataFrame actualizado con los impactos ajustados
+        if reforma_seleccionada:
+            idx = reformas.index(reforma_seleccionada)
+            impacto_actualizado = motor.impactos_actualizados(impacto_base, idx, sensibilidad)
+        else:
+            impacto_actualizado = impacto_base
+        
+        df_reformas = pd.DataFrame({
+            'Reforma': reformas,
+            'Impacto Esperado (%)': impacto_actualizado,
+            'Nivel de Confianza (%)': confianza,
+            'Tamaño Visual': [abs(x) + 10 for x in impacto_actualizado]  # CORREGIDO: Valores positivos para tamaño
+        })
+        
+        # Gráfico de barras interactivo
+        fig = px.bar(df_reformas, x='Reforma', y='Impacto Esperado (%)',
+                    color='Impacto Esperado (%)',
+                    title='Impacto Recaudatorio Esperado por Reforma',
+                    color_continuous_scale='RdYlGn',
+                    hover_data=['Nivel de Confianza (%)'])
+        
+        # Destacar la reforma seleccionada
+        if reforma_seleccionada:
+            idx_seleccionado = reformas.index(reforma_seleccionada)
+            fig.add_annotation(
+                x=idx_seleccionado,
+                y=impacto_actualizado[idx_seleccionado],
+                text="🔍 Seleccionada",
+                showarrow=True,
+                arrowhead=2,
+                arrowsize=1,
+                arrowwidth=2,
+                arrowcolor="red",
+                bgcolor="white",
+                bordercolor="red",
+                borderwidth=1
+            )
+        
+        fig.update_layout(
+            xaxis_tickangle=-45,
+            showlegend=False
+        )
+        grafica(fig, use_container_width=True)
+        
+        # Gráfico adicional: Comparación de confianza vs impacto
+        st.subheader("📊 Relación Impacto-Confianza")
+        
+        # CORREGIDO: Usar valores absolutos para el tamaño y añadir colores por tipo de impacto
+        df_reformas['Tipo Impacto'] = ['Positivo' if x > 0 else 'Negativo' for x in df_reformas['Impacto Esperado (%)']]
+        
+        fig2 = px.scatter(df_reformas, 
+                         x='Impacto Esperado (%)', 
+                         y='Nivel de Confianza (%)',
+                         size='Tamaño Visual',  # CORREGIDO: Usar valores positivos
+                         text='Reforma',
+                         title='Relación entre Impacto Esperado y Nivel de Confianza',
+                         size_max=25,
+                         color='Tipo Impacto',  # Color por tipo de impacto
+                         color_discrete_map={'Positivo': 'green', 'Negativo': 'red'},
+                         hover_data=['Impacto Esperado (%)', 'Nivel de Confianza (%)'])
+        
+        # Destacar punto seleccionado
+        if reforma_seleccionada:
+            fig2.add_annotation(
+                x=impacto_actualizado[idx],
+                y=confianza[idx],
+                text="● Seleccionada",
+                showarrow=True,
+                arrowhead=2,
+                font=dict(color="blue", size=12, weight="bold")
+            )
+        
+        fig2.update_traces(
+            textposition='top center',
+            marker=dict(sizemode='diameter', sizeref=2.0)
+        )
+        # Frente de Pareto de las combinaciones de reformas
+        df_frente = frente_reformas(MUESTRA_MICROSIMULACION)
+        fig2.add_trace(go.Scatter(
+            x=df_frente['Impacto (%)'],
+            y=df_frente['Confianza (%)'],
+            mode='lines+markers',
+            name='Frente de Pareto (combinaciones)',
+            line=dict(color='gray', dash='dot', shape='hv'),
+            marker=dict(size=6, color='gray'),
+            text=df_frente['Combinación'],
+            hovertemplate='%{text}<br>Impacto: %{x:.1f}%<br>Confianza: %{y:.1f}%<extra></extra>'
+        ))
+        
+        fig2.update_layout(
+            xaxis_title="Impacto Esperado (%)",
+            yaxis_title="Nivel de Confianza (%)",
+            showlegend=True
+        )
+        grafica(fig2, use_container_width=True)
+        
+        # Combinación de mayor confianza que alcanza una meta recaudatoria
+        st.subheader("🧩 Combinación Óptima de Reformas")
+        meta_combinacion = st.slider("Meta de impacto recaudatorio (%)", 0.0,
+                                     float(np.floor(df_frente['Impacto (%)'].max())), 10.0, 0.5,
+                                     key="meta_combinacion")
+        combinacion = motor.mejor_combinacion(interacciones_reformas(MUESTRA_MICROSIMULACION), meta_combinacion)
+        if combinacion is None:
+            st.warning("Ninguna combinación alcanza la meta")
+        else:
+            col_comb1, col_comb2 = st.columns(2)
+            col_comb1.metric("Impacto Combinado", f"{combinacion.impacto:.1f}%")
+            col_comb2.metric("Confianza Combinada", f"{combinacion.confianza:.1f}%")
+            st.dataframe(
+                pd.DataFrame({'Reforma': list(combinacion.niveles),
+                              'Nivel de Aplicación': [nivel * 100 for nivel in combinacion.niveles.values()]}),
+                use_container_width=True,
+                hide_index=True,
+                column_config={'Nivel de Aplicación': st.column_config.ProgressColumn(format="%.0f%%", min_value=0, max_value=100)}
+            )
+        
+        with st.expander("🧑‍🤝‍🧑 Microsimulación sobre Población de Cotizantes"):
+            st.caption(f"Muestra de {MUESTRA_MICROSIMULACION:,} registros expandida a "
+                       f"{motor.microsimulacion.NUM_REGISTROS_NACIONAL:,} trabajadores ocupados")
+            st.dataframe(
+                df_microsimulacion,
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    'Recaudación Base (M$)': st.column_config.NumberColumn(format="$%.0f"),
+                    'Recaudación Reforma (M$)': st.column_config.NumberColumn(format="$%.0f"),
+                    'Delta (M$)': st.column_config.NumberColumn(format="$%.0f"),
+                    'Impacto (%)': st.column_config.NumberColumn(format="%.1f%%"),
+                }
+            )
+    
+    # Análisis de escenarios
+    st.subheader("🎯 Simulación de Escenarios")
+    
+    if reforma_seleccionada:
+        idx = reformas.index(reforma_seleccionada)
+        
+        # Flujo de recaudación por fases: arranque gradual de todas las reformas y escenarios
+        col_horizonte, col_curva, col_tasa = st.columns(3)
+        horizonte_flujo = col_horizonte.slider("Horizonte (años)", 1, 10, 5, key="cronograma_horizonte")
+        curva_flujo = col_curva.selectbox("Curva de arranque", list(motor.CURVAS), key="cronograma_curva")
+        tasa_descuento = col_tasa.slider("Tasa de descuento anual (%)", 0.0, 20.0, 10.0, 0.5,
+                                         key="cronograma_tasa") / 100
+        flujos = motor.flujos_reformas(impacto_base, horizonte_flujo * 12, curva_flujo)
+        acumulado_flujo = flujos.acumulado()[-1, idx]
+        vpn_flujo = flujos.vpn(tasa_descuento)[idx]
+        
+        # Base de 100,000 millones
+        resultados_escenarios = motor.escenarios_reforma(impacto_base[idx])
+        encabezados = {
+            'Conservador': "**🔻 Escenario Conservador**",
+            'Base': "**📊 Escenario Base**",
+            'Optimista': "**🔺 Escenario Optimista**"
+        }
+        
+        for idx_escenario, (col_scenario, (escenario, resultado)) in enumerate(zip(st.columns(3), resultados_escenarios.items())):
+            with col_scenario:
+                st.markdown(encabezados[escenario])
+                st.metric("Impacto Estimado", f"{resultado['impacto']:.1f}%")
+                st.metric("Recaudación Anual (efecto pleno)", f"${resultado['recaudacion']:,.0f} M")
+                st.metric(f"Recaudación Acumulada {horizonte_flujo} años", f"${acumulado_flujo[idx_escenario]:,.0f} M")
+                st.metric("Valor Presente Neto", f"${vpn_flujo[idx_escenario]:,.0f} M")
+        
+        # Gráfico de comparación de escenarios
+        st.subheader("📈 Comparativa de Escenarios")
+        
+        escenarios = list(resultados_escenarios)
+        impactos_escenarios = [r['impacto'] for r in resultados_escenarios.values()]
+        recaudaciones = [r['recaudacion'] for r in resultados_escenarios.values()]
+        
+        # Bandas Monte Carlo sobre la sensibilidad de los supuestos
+        df_bandas = None
+        if modo_montecarlo:
+            df_bandas = bandas_reforma(impacto_base[idx], sensibilidad, desv_sensibilidad, 100000)
+        
+        fig_escenarios = figura("escenarios", motor.figura_escenarios, escenarios, impactos_escenarios,
+                                recaudaciones, reforma_seleccionada, df_bandas)
+        
+        grafica(fig_escenarios, use_container_width=True)
+        
+        if modo_montecarlo:
+            st.dataframe(df_bandas, use_container_width=True, hide_index=True)
+    
+    # Timeline de implementación
+    if reforma_seleccionada:
+        st.subheader("📅 Cronograma de Implementación Estimado")
+        
+        hitos = motor.hitos_fases(motor.INICIO_RECAUDACION[idx], motor.DURACION_RAMPA[idx])
+        
+        col_avance, col_acumulado = st.columns(2)
+        with col_avance:
+            fig_timeline = figura("cronograma", motor.figura_cronograma, flujos.meses, flujos.avance[:, idx, :],
+                                  flujos.escenarios, motor.FASES, hitos, reforma_seleccionada)
+            grafica(fig_timeline, use_container_width=True)
+        with col_acumulado:
+            fig_acumulado = figura("acumulado", motor.figura_acumulado, flujos.meses,
+                                   flujos.acumulado()[:, idx, :], flujos.escenarios, reforma_seleccionada)
+            grafica(fig_acumulado, use_container_width=True)
+        
+        st.markdown(f"**Recaudación acumulada y VPN a {horizonte_flujo} años de todas las reformas**")
+        st.dataframe(
+            flujos.resumen(tasa_descuento),
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                'Recaudación Acumulada (M$)': st.column_config.NumberColumn(format="$%.0f"),
+                'VPN (M$)': st.column_config.NumberColumn(format="$%.0f"),
+            }
+        )
+    
+    # Barrido de sensibilidad de todas las reformas a la vez
+    st.subheader("🌪️ Sensibilidad de Todas las Reformas")
+    df_elasticidades = elasticidades_reformas(MUESTRA_MICROSIMULACION)
+    
+    col_barrido, col_tornado = st.columns(2)
+    with col_barrido:
+        supuesto_barrido = st.selectbox("Supuesto a variar:", ["Todos a la vez"] + list(df_elasticidades.columns),
+                                        key="supuesto_barrido")
+        rango_barrido = st.slider("Rango de variación (±%)", 5, 50, 20, key="rango_barrido")
+        
+        perturbaciones = np.linspace(-rango_barrido, rango_barrido, 81)
+        if supuesto_barrido == "Todos a la vez":
+            rejilla = np.repeat(perturbaciones[:, None], len(df_elasticidades.columns), axis=1)
+            impactos_barrido = motor.barrido(impacto_base, df_elasticidades.to_numpy(), rejilla)
+        else:
+            k = df_elasticidades.columns.get_loc(supuesto_barrido)
+            impactos_barrido = motor.barrido(impacto_base, df_elasticidades.to_numpy(), perturbaciones)[:, k, :]
+        
+        df_barrido = pd.DataFrame({
+            'Variación (%)': np.tile(perturbaciones, len(reformas)),
+            'Impacto (%)': impactos_barrido.ravel(),
+            'Reforma': np.repeat(reformas, len(perturbaciones))
+        })
+        fig_barrido = px.line(df_barrido, x='Variación (%)', y='Impacto (%)', color='Reforma',
+                              title=f'Barrido de Sensibilidad - {supuesto_barrido}')
+        grafica(fig_barrido, use_container_width=True)
+    
+    with col_tornado:
+        df_tornado = motor.tornado(np.array(impacto_base), df_elasticidades, rango_barrido)
+        reforma_tornado = reforma_seleccionada or reformas[0]
+        fig_tornado = figura("tornado", motor.figura_tornado, df_tornado, reforma_tornado)
+        grafica(fig_tornado, use_container_width=True)
+    
+    st.markdown("**Elasticidad del impacto respecto de cada supuesto**")
+    st.dataframe(
+        df_elasticidades.reset_index(),
+        use_container_width=True,
+        hide_index=True,
+        column_config={c: st.column_config.NumberColumn(format="%.3f") for c in df_elasticidades.columns}
+    )
+
+
+
+
+
+# FUNCIÓN 3: ESTUDIOS E INVESTIGACIÓN  
+@st.fragment
+@instrumentar("Estudios Investigación")
+def seccion_estudios():
+    st.header("🔬 Estudios e Investigación en Seguridad Social")
+    
+    st.markdown("""
+    **Objetivo:** Elaborar estudios en materia de seguridad social, salud, economía y mercado laboral
+    """)
+    
+    # Datos de mercado laboral: cubo sector × estado × mes del archivo cargado o sintético
+    if datos_reales is None:
+        boton_regenerar("Estudios Investigación")
+    cubo = cubo_regional()
+    meses_cubo = list(cubo.etiquetas['mes'].astype(str))
+    
+    col_estado, col_mes = st.columns(2)
+    estado_estudio = col_estado.selectbox("Estado:", ["Nacional"] + list(cubo.etiquetas['estado']),
+                                          key="estado_estudios")
+    mes_estudio = col_mes.selectbox("Mes:", meses_cubo[::-1], key="mes_estudios")
+    filtro_estado = {} if estado_estudio == "Nacional" else {'estado': estado_estudio}
+    df_sectores = cubo.sectores(filtro_estado.get('estado'), mes_estudio)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("🏭 Afiliados por Sector Económico")
+        
+        # Gráfico de torta
+        fig = px.pie(df_sectores, values='Afiliados', names='Sector',
+                    title='Distribución de Afiliados por Sector Económico')
+        grafica(fig, use_container_width=True)
+    
+    with col2:
+        st.subheader("📊 Crecimiento vs Informalidad")
+        
+        # Gráfico de dispersión
+        fig = px.scatter(df_sectores, x='Crecimiento Anual (%)', y='Tasa Informalidad (%)',
+                        size='Afiliados', text='Sector',
+                        title='Relación entre Crecimiento e Informalidad por Sector',
+                        size_max=60)
+        fig.update_traces(textposition='top center')
+        grafica(fig, use_container_width=True)
+    
+    # Evolución mensual por sector, leída del cubo sin reagregar registros
+    if 'informales' in cubo.valores:
+        informalidad = cubo.razon('informales', ('afiliados', 'informales'), ('mes', 'sector'), **filtro_estado) * 100
+        df_informalidad = pd.DataFrame(informalidad, index=meses_cubo, columns=cubo.etiquetas['sector'])
+        fig = px.line(df_informalidad, labels={'index': 'Mes', 'value': 'Tasa Informalidad (%)', 'variable': 'Sector'},
+                      title=f'Tasa de Informalidad por Sector - {estado_estudio}')
+        grafica(fig, use_container_width=True)
+    
+    # Análisis correlacional
+    st.subheader("📊 Análisis de Correlaciones")
+    
+    correlacion = motor.correlacion_sectores(df_sectores)
+    
+    # CORREGIDO: st.metric sin parámetro key
+    st.metric("Correlación Crecimiento-Informalidad", f"{correlacion:.3f}")
+    
+    # La significancia sale del intervalo bootstrap, no de un umbral fijo
+    try:
+        par = correlaciones_estudio(motor.huella_datos(df_sectores),
+                                    df_sectores[['Crecimiento Anual (%)', 'Tasa Informalidad (%)']], 2000, 95)
+        inferior, superior = par.inferior[0, 1], par.superior[0, 1]
+        clasificacion = motor.clasificar_correlacion(correlacion, inferior, superior)
+        st.caption(f"Intervalo de confianza bootstrap al 95%: [{inferior:.3f}, {superior:.3f}]")
+    except ValueError:
+        clasificacion = "nula"
+    if clasificacion == "negativa":
+        st.info("🔍 **Hallazgo:** Existe correlación negativa significativa entre crecimiento e informalidad")
+    elif clasificacion == "positiva":
+        st.info("🔍 **Hallazgo:** Existe correlación positiva significativa entre crecimiento e informalidad")
+    else:
+        st.info("🔍 **Hallazgo:** No existe correlación significativa entre las variables")
+    
+    # Matrices completas de indicadores por celda sector × estado
+    st.subheader("🧮 Matriz de Correlaciones de Indicadores")
+    if datos_reales is not None:
+        df_indicadores = datos_reales.indicadores()
+    else:
+        df_indicadores = datos_seccion("Indicadores Laborales", semilla_seccion("Estudios Investigación"))
+    
+    col_c1, col_c2, col_c3 = st.columns(3)
+    tipo_matriz = col_c1.radio("Matriz:", ["Correlación", "Correlación parcial"], horizontal=True,
+                               key="tipo_matriz_correlacion")
+    num_remuestreos = col_c2.select_slider("Remuestreos bootstrap:", [200, 500, 1000, 2000, 5000], value=1000,
+                                           key="remuestreos_bootstrap")
+    nivel_confianza = col_c3.selectbox("Nivel de confianza (%):", [90, 95, 99], index=1, key="nivel_confianza_corr")
+    
+    try:
+        matriz = correlaciones_estudio(motor.huella_datos(df_indicadores), df_indicadores,
+                                       num_remuestreos, nivel_confianza)
+    except ValueError as error:
+        st.warning(f"⚠️ {error}")
+        return
+    parcial = tipo_matriz == "Correlación parcial"
+    valores = matriz.parcial if parcial else matriz.correlacion
+    significativa = matriz.significativa(parcial)
+    
+    # Solo se rotulan las celdas cuyo intervalo excluye el cero
+    etiquetas = np.where(significativa, np.char.mod("%.2f", np.nan_to_num(valores)), "")
+    fig = go.Figure(go.Heatmap(z=valores, x=matriz.indicadores, y=matriz.indicadores, text=etiquetas,
+                               texttemplate="%{text}", zmin=-1, zmax=1, colorscale='RdBu'))
+    fig.update_layout(title=f'{tipo_matriz} ({matriz.num_observaciones} celdas sector × estado; '
+                            f'rotuladas las significativas al {nivel_confianza}%)',
+                      height=max(500, 28 * len(matriz.indicadores)), yaxis_autorange='reversed')
+    grafica(fig, use_container_width=True)
+    
+    tabla_pares = matriz.tabla(parcial)
+    st.metric("Pares significativos", f"{int(tabla_pares['Significativa'].sum())} de {len(tabla_pares)}")
+    st.dataframe(
+        tabla_pares[tabla_pares['Significativa']].drop(columns='Significativa'),
+        use_container_width=True,
+        hide_index=True,
+        column_config={c: st.column_config.NumberColumn(format="%.3f")
+                       for c in ['Correlación', 'IC Inferior', 'IC Superior']}
+    )
+
+# FUNCIÓN 4: REPORTES DE AVANCES
+@st.fragment
+@instrumentar("Reportes Avances")
+def seccion_reportes():
+    st.header("📋 Generación de Reportes de Avances y Logros")
+    
+    st.markdown("""
+    **Objetivo:** Elaborar propuestas de reportes que muestren acciones, avances y logros en afiliación y recaudación
+    """)
+    
+    # Datos sintéticos para reportes
+    if datos_reales is not None:
+        datos_reportes = datos_reales.reportes()
+        clave_almacen = datos_reales.huella
+    else:
+        boton_regenerar("Reportes Avances")
+        clave_almacen = semilla_seccion("Reportes Avances")
+        datos_reportes = datos_seccion("Reportes Avances", clave_almacen)
+    
+    # Almacén por sesión: los avances diarios se acumulan sobre él de forma incremental
+    if st.session_state.get('clave_almacen_avances') != clave_almacen:
+        st.session_state.almacen_avances = motor.AlmacenAvances.desde_registros(
+            datos_reportes['estados'],
+            datos_reportes['meta_afiliacion'],
+            datos_reportes['avance_afiliacion'],
+            datos_reportes['meta_recaudacion'],
+            datos_reportes['avance_recaudacion'],
+            datos_reportes.get('delegaciones'),
+            datos_reportes.get('subdelegaciones')
+        )
+        st.session_state.clave_almacen_avances = clave_almacen
+    almacen = st.session_state.almacen_avances
+    
+    if st.button("📥 Incorporar avance del día", key="btn_avance_diario"):
+        indices, deltas = motor.generar_deltas_avance(motor.nueva_semilla(), len(almacen.nombres['Subdelegación']))
+        almacen.aplicar_deltas(indices, deltas)
+    
+    # Totales nacionales
+    totales = almacen.totales()
+    col_nac1, col_nac2, col_nac3 = st.columns(3)
+    col_nac1.metric("% Avance Afiliación Nacional", f"{totales['% Avance Afiliación']:.1f}%")
+    col_nac2.metric("% Avance Recaudación Nacional", f"{totales['% Avance Recaudación']:.1f}%")
+    col_nac3.metric("Días de avance incorporados", almacen.dias_aplicados)
+    
+    st.subheader("📈 Dashboard de Avances")
+    col_nivel, col_filtro = st.columns(2)
+    nivel = col_nivel.selectbox("Nivel de agregación:", ['Estado', 'Delegación', 'Subdelegación'], key="nivel_reportes")
+    filtro = None
+    if nivel != 'Estado':
+        estado_filtro = col_filtro.selectbox("Estado:", ["Todos"] + list(almacen.nombres['Estado']),
+                                             key="estado_filtro_reportes")
+        if estado_filtro != "Todos":
+            filtro = {'Estado': estado_filtro}
+    
+    df_reportes = almacen.tabla(nivel, filtro)
+    
+    # Columnas numéricas: el formato se aplica solo al mostrar
+    st.dataframe(
+        df_reportes,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            'Meta Afiliación': st.column_config.NumberColumn(format="%.0f"),
+            'Avance Afiliación': st.column_config.NumberColumn(format="%.0f"),
+            '% Avance Afiliación': st.column_config.NumberColumn(format="%.1f%%"),
+            'Meta Recaudación (MXN)': st.column_config.NumberColumn(format="$%.0f"),
+            'Avance Recaudación (MXN)': st.column_config.NumberColumn(format="$%.0f"),
+            '% Avance Recaudación': st.column_config.NumberColumn(format="%.1f%%")
+        }
+    )
+    
+    # Selector de unidad para detalle
+    unidades = list(df_reportes[nivel])
+    estado_seleccionado = st.selectbox(f"Selecciona una unidad ({nivel.lower()}) para reporte detallado:",
+                                       unidades, key="estado_select")
+    
+    if estado_seleccionado:
+        fila = df_reportes.iloc[unidades.index(estado_seleccionado)]
+        
+        col1, col2, col3, col4 = st.columns(4)
+        
+        with col1:
+            # CORREGIDO: st.metric sin parámetro key
+            st.metric("Meta Afiliación", f"{fila['Meta Afiliación']:,.0f}")
+            st.metric("Avance Afiliación", f"{fila['Avance Afiliación']:,.0f}")
+        
+        with col2:
+            porcentaje_afiliacion = fila['% Avance Afiliación']
+            st.metric("% Avance Afiliación", f"{porcentaje_afiliacion:.1f}%")
+        
+        with col3:
+            st.metric("Meta Recaudación", f"${fila['Meta Recaudación (MXN)']:,.0f}")
+            st.metric("Avance Recaudación", f"${fila['Avance Recaudación (MXN)']:,.0f}")
+        
+        with col4:
+            porcentaje_recaudacion = fila['% Avance Recaudación']
+            st.metric("% Avance Recaudación", f"{porcentaje_recaudacion:.1f}%")
+        
+        # Gráfico de progreso
+        fig = motor.figura_medidores(porcentaje_afiliacion, porcentaje_recaudacion, estado_seleccionado)
+        grafica(fig, use_container_width=True)
+    
+    # Mismos medidores leídos del cubo sector × estado × mes
+    with st.expander("🧊 Avance por Sector y Mes"):
+        cubo = cubo_regional()
+        col_cubo1, col_cubo2, col_cubo3 = st.columns(3)
+        estado_cubo = col_cubo1.selectbox("Estado:", ["Nacional"] + list(cubo.etiquetas['estado']),
+                                          key="estado_cubo_reportes")
+        sector_cubo = col_cubo2.selectbox("Sector:", ["Todos"] + list(cubo.etiquetas['sector']),
+                                          key="sector_cubo_reportes")
+        mes_cubo = col_cubo3.selectbox("Mes:", list(cubo.etiquetas['mes'].astype(str))[::-1], key="mes_cubo_reportes")
+        filtros_cubo = {}
+        if estado_cubo != "Nacional":
+            filtros_cubo['estado'] = estado_cubo
+        if sector_cubo != "Todos":
+            filtros_cubo['sector'] = sector_cubo
+        avance_afiliacion, avance_recaudacion = cubo.avance(mes_cubo, **filtros_cubo)
+        if np.isnan(avance_afiliacion) and np.isnan(avance_recaudacion):
+            st.info("El archivo cargado no incluye metas de afiliación ni de recaudación")
+        else:
+            grafica(motor.figura_medidores(avance_afiliacion, avance_recaudacion,
+                                           f"{sector_cubo} - {estado_cubo} ({mes_cubo})"),
+                    use_container_width=True)
+    
+    # Reportes ejecutivos en lote: se renderizan en serie dentro del servidor (un pool de
+    # procesos desde un proceso con hilos no es seguro) en una carpeta temporal que se
+    # borra en cuanto se arma el ZIP; el pool queda para ``python -m motor.informes``
+    with st.expander("🗂️ Reportes ejecutivos por unidad"):
+        col_lote1, col_lote2 = st.columns(2)
+        nivel_lote = col_lote1.selectbox("Un reporte por:", ['Estado', 'Delegación'], key="nivel_informes")
+        formatos_lote = col_lote2.multiselect("Formatos:", motor.formatos_disponibles(), default=["html"],
+                                              key="formatos_informes")
+        if st.button("🖨️ Generar reportes", key="btn_generar_informes") and formatos_lote:
+            with tempfile.TemporaryDirectory(prefix="reportes_") as carpeta_informes:
+                resumen = motor.generar_informes(almacen, carpeta_informes, nivel_lote, formatos_lote)
+                paquete = motor.empaquetar(resumen)
+            st.success(f"{len(resumen.generados)} reportes generados ({resumen.segundos:.2f} s)")
+            st.download_button("📦 Descargar reportes (ZIP)", paquete,
+                               file_name=f"reportes_{nivel_lote.lower()}.zip", mime="application/zip",
+                               key="descargar_informes")
+
+# FUNCIÓN 5: METAS DE DESEMPEÑO
+@st.fragment
+@instrumentar("Metas Desempeño")
+def seccion_metas():
+    st.header("🎯 Definición de Metas de Resultados y Desempeño")
+    
+    st.markdown("""
+    **Objetivo:** Colaborar en la definición de metas para unidades administrativas de Órganos Desconcentrados
+    """)
+    
+    boton_regenerar("Metas Desempeño")
+    semilla_metas = semilla_seccion("Metas Desempeño")
+    
+    # Simulador de establecimiento de metas
+    col1, col2 = st.columns([2, 1])
+    
+    with col2:
+        st.subheader("📐 Configuración de Metas")
+        
+        tipo_meta = st.radio("Tipo de Meta:", motor.TIPOS_META, key="tipo_meta_radio")
+        
+        if tipo_meta == "Afiliación":
+            meta_base = st.number_input("Meta base de afiliación:", 1000, 1000000, 50000, key="meta_afiliacion_input")
+            crecimiento_meta = st.slider("Crecimiento esperado (%)", 0, 50, 15, key="crecimiento_afiliacion_slider")
+            
+        elif tipo_meta == "Recaudación":
+            meta_base = st.number_input("Meta base de recaudación (MXN):", 1000000, 100000000, 5000000, key="meta_recaudacion_input")
+            crecimiento_meta = st.slider("Crecimiento esperado (%)", 0, 50, 12, key="crecimiento_recaudacion_slider")
+            
+        else:  # Eficiencia Operativa
+            meta_base = st.number_input("Tiempo promedio actual (días):", 1, 30, 10, key="meta_eficiencia_input")
+            crecimiento_meta = st.slider("Reducción esperada (%)", 0, 50, 20, key="mejora_eficiencia_slider")
+        
+        meta_final = motor.calcular_meta(tipo_meta, meta_base, crecimiento_meta)
+        
+        # CORREGIDO: st.metric sin parámetro key
+        st.metric("Meta Propuesta", f"{meta_final:,.0f}" if tipo_meta != "Eficiencia Operativa" else f"{meta_final:.1f} días")
+        
+        # Se guarda más abajo, cuando ya están calculadas las metas de todas las unidades
+        guardar_meta = st.button("💾 Guardar Configuración de Meta", key="btn_guardar_meta")
+        aviso_guardado = st.empty()
+    
+    with col1:
+        st.subheader("📊 Simulación de Cumplimiento de Metas")
+        
+        # Trayectorias estocásticas del cumplimiento trimestral de la meta configurada
+        simulacion = motor.simular_cumplimiento(tipo_meta, crecimiento_meta, num_trayectorias=5000,
+                                                semilla=semilla_metas)
+        p5, p50, p95 = simulacion.percentiles
+        
+        df_simulacion = pd.DataFrame({
+            'Trimestre': motor.TRIMESTRES,
+            'Cumplimiento (%)': p50
+        })
+        
+        fig = px.bar(df_simulacion, x='Trimestre', y='Cumplimiento (%)',
+                    title='Simulación de Cumplimiento Trimestral (mediana y rango P5-P95)',
+                    color='Cumplimiento (%)',
+                    color_continuous_scale='RdYlGn',
+                    error_y=p95 - p50, error_y_minus=p50 - p5)
+        fig.add_hline(y=100, line_dash="dash", line_color="red", 
+                     annotation_text="Meta 100%", annotation_position="bottom right")
+        grafica(fig, use_container_width=True)
+        
+        # Análisis de riesgo
+        col_riesgo1, col_riesgo2 = st.columns(2)
+        col_riesgo1.metric("Probabilidad de cumplir la meta", f"{simulacion.probabilidad * 100:.1f}%")
+        col_riesgo2.metric("Trimestres con riesgo de incumplimiento (esperados)",
+                           f"{simulacion.trimestres_riesgo:.2f}")
+    
+    # La misma meta aplicada a todas las subdelegaciones en una sola simulación
+    st.subheader("🏢 Metas para Todas las Unidades")
+    unidades = datos_seccion("Metas Desempeño", semilla_metas)
+    df_unidades = motor.metas_unidades(unidades[unidades['Tipo'] == tipo_meta], {tipo_meta: crecimiento_meta},
+                                       semilla=semilla_metas)
+    df_unidades = df_unidades.drop(columns='Tipo').sort_values('Probabilidad de Cumplir (%)', ignore_index=True)
+    
+    registro = registro_metas()
+    periodo = str(datetime.now().year)
+    if guardar_meta:
+        revision = registro.guardar(df_unidades['Subdelegación'], tipo_meta, df_unidades['Base'],
+                                    crecimiento_meta, df_unidades['Meta Final'], periodo)
+        aviso_guardado.success(f"✅ Configuración de meta guardada exitosamente "
+                               f"({len(df_unidades)} unidades, revisión {revision})")
+    
+    # Última versión guardada de cada unidad para el tipo y periodo actuales
+    vigentes = registro.vigentes(tipo_meta, periodo).set_index('unidad')
+    df_unidades['Meta Vigente'] = df_unidades['Subdelegación'].map(vigentes['meta_final'])
+    df_unidades['Versión'] = df_unidades['Subdelegación'].map(vigentes['version']).astype('Int64')
+    
+    # Distribución de una meta nacional entre unidades (programa cuadrático con arranque en caliente)
+    if tipo_meta != "Eficiencia Operativa":
+        with st.expander("⚖️ Distribución de la Meta Nacional", expanded=True):
+            col_a1, col_a2 = st.columns(2)
+            meta_nacional_pct = col_a1.slider("Meta nacional (% de la suma de metas propuestas):", 80, 130, 100,
+                                              key="meta_nacional_slider")
+            capacidad = col_a2.slider("Capacidad máxima (veces la tendencia histórica):", 1.0, 4.0, 2.5, 0.5,
+                                      key="capacidad_unidades_slider")
+            base_unidades = df_unidades['Base'].to_numpy()
+            tendencia_unidades = np.maximum(df_unidades['Tendencia (%)'].to_numpy(), 1) / 100
+            meta_nacional = df_unidades['Meta Final'].sum() * meta_nacional_pct / 100
+            
+            clave_asignacion = (tipo_meta, semilla_metas)
+            anterior = st.session_state.get('asignacion_metas')
+            inicio = anterior[1] if anterior and anterior[0] == clave_asignacion else None
+            try:
+                # Las unidades con mejor desempeño histórico absorben más del ajuste
+                asignacion = motor.asignar_metas(
+                    df_unidades['Meta Final'].to_numpy(), meta_nacional,
+                    limite_inferior=base_unidades,
+                    limite_superior=base_unidades * (1 + capacidad * tendencia_unidades),
+                    pesos=1 / (base_unidades * tendencia_unidades),
+                    inicio=inicio
+                )
+            except ValueError as error:
+                asignacion = None
+                st.error(f"❌ {error}")
+            
+            if asignacion is not None:
+                st.session_state.asignacion_metas = (clave_asignacion, asignacion)
+                df_unidades['Meta Asignada'] = asignacion.metas
+                col_s1, col_s2, col_s3, col_s4 = st.columns(4)
+                col_s1.metric("Meta nacional", f"{meta_nacional:,.0f}")
+                col_s2.metric("Tiempo de solución", f"{asignacion.segundos * 1000:.1f} ms")
+                col_s3.metric("Iteraciones", asignacion.iteraciones,
+                              help="Con arranque en caliente desde la solución anterior" if inicio else None)
+                col_s4.metric("Unidades al límite de capacidad", asignacion.en_limite_superior)
+    
+    col_u1, col_u2, col_u3 = st.columns(3)
+    col_u1.metric("Unidades", len(df_unidades))
+    col_u2.metric("Probabilidad promedio de cumplir", f"{df_unidades['Probabilidad de Cumplir (%)'].mean():.1f}%")
+    col_u3.metric("Unidades con probabilidad ≥ 80%", int((df_unidades['Probabilidad de Cumplir (%)'] >= 80).sum()))
+    
+    formato_valor = "%.1f" if tipo_meta == "Eficiencia Operativa" else ("$%.0f" if tipo_meta == "Recaudación" else "%.0f")
+    st.dataframe(
+        df_unidades,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            'Base': st.column_config.NumberColumn(format=formato_valor),
+            'Meta Final': st.column_config.NumberColumn(format=formato_valor),
+            'Tendencia (%)': st.column_config.NumberColumn(format="%.1f%%"),
+            'Probabilidad de Cumplir (%)': st.column_config.ProgressColumn(format="%.0f%%", min_value=0, max_value=100),
+            'Trimestres en Riesgo (esperados)': st.column_config.NumberColumn(format="%.2f"),
+            'Meta Vigente': st.column_config.NumberColumn(format=formato_valor),
+            'Meta Asignada': st.column_config.NumberColumn(format=formato_valor)
+        }
+    )
+    
+    with st.expander("🗃️ Historial de metas guardadas"):
+        unidad_historial = st.selectbox("Unidad:", list(df_unidades['Subdelegación']), key="unidad_historial_metas")
+        historial = registro.historial(unidad_historial, tipo_meta)
+        if historial.empty:
+            st.info("No hay metas guardadas para esta unidad")
+        else:
+            st.dataframe(historial, use_container_width=True, hide_index=True)
+
+# Fragmento anidado: la ventana/α solo redibuja este panel
+@st.fragment
+@instrumentar("Detección en Línea")
+def panel_deteccion_en_linea(metodo, parametros_detector, df_deteccion, tipo_datos):
+    datos = df_deteccion['Valor'].to_numpy()
+    modo_linea = st.radio("Estadísticos:", ["Ventana móvil", "Ponderación exponencial"],
+                          horizontal=True, key="modo_linea_radio")
+    if modo_linea == "Ventana móvil":
+        ventana = st.slider("Tamaño de ventana (días):", 7, 60, 14, key="ventana_linea_slider")
+        alfa = None
+    else:
+        ventana = 30
+        alfa = st.slider("Factor de suavizamiento (α):", 0.01, 0.5, 0.1, 0.01, key="alfa_linea_slider")
+    
+    detector = motor.DetectorEnLinea(metodo, ventana=ventana, alfa=alfa, **parametros_detector)
+    mascara_linea, inferiores_linea, superiores_linea = detector.procesar(datos)
+    st.metric("Anomalías Detectadas en Línea", int(mascara_linea.sum()))
+    
+    fig_linea = go.Figure()
+    fig_linea.add_trace(go.Scatter(x=df_deteccion['Día'], y=datos, mode='lines+markers',
+                                   name='Valor', line=dict(color='blue')))
+    fig_linea.add_trace(go.Scatter(x=df_deteccion['Día'], y=superiores_linea, mode='lines',
+                                   name='Lím. Sup. móvil', line=dict(color='orange', dash='dash')))
+    fig_linea.add_trace(go.Scatter(x=df_deteccion['Día'], y=inferiores_linea, mode='lines',
+                                   name='Lím. Inf. móvil', line=dict(color='orange', dash='dash')))
+    fig_linea.add_trace(go.Scatter(x=df_deteccion['Día'][mascara_linea], y=datos[mascara_linea],
+                                   mode='markers', name='Atípico en línea',
+                                   marker=dict(color='red', size=12, symbol='x')))
+    fig_linea.update_layout(title=f'Límites Móviles - {modo_linea}',
+                            xaxis_title='Día', yaxis_title=tipo_datos)
+    grafica(fig_linea, use_container_width=True)
+
+
+# FUNCIÓN 6: DETECCIÓN DE ANOMALÍAS
+@st.fragment
+@instrumentar("Detección Anomalías")
+def seccion_anomalias():
+    st.header("🔍 Detección de Esquemas de Comportamiento Atípicos")
+    
+    st.markdown("""
+    **Objetivo:** Identificar esquemas de comportamiento atípicos que impacten al Instituto en materia de afiliación y recaudación
+    """)
+    
+    # Configuración inicial en session_state
+    if 'parametros_anomalias' not in st.session_state:
+        st.session_state.parametros_anomalias = None
+    if 'metodo_seleccionado' not in st.session_state:
+        st.session_state.metodo_seleccionado = "IQR (Recomendado)"
+    if 'sensibilidad_actual' not in st.session_state:
+        st.session_state.sensibilidad_actual = 3
+    
+    # Configuración dentro de la sección: los fragmentos no pueden escribir en el sidebar
+    with st.expander("⚙️ Configuración de Detección", expanded=True):
+        # Selector de método de detección
+        metodo = st.selectbox(
+            "Método de detección:",
+            list(motor.DETECTORES),
+            key="metodo_deteccion_select"
+        )
+        
+        # Ajustar sensibilidad según el método
+        if metodo == "Desviación Estándar":
+            sensibilidad = st.slider(
+                "Número de desviaciones estándar:",
+                min_value=1.0,
+                max_value=5.0,
+                value=3.0,
+                step=0.5,
+                key="sensibilidad_std"
+            )
+        elif metodo == "Percentiles":
+            col_perc1, col_perc2 = st.columns(2)
+            with col_perc1:
+                percentil_inf = st.slider("Percentil inferior:", 1, 25, 5, key="percentil_inf")
+            with col_perc2:
+                percentil_sup = st.slider("Percentil superior:", 75, 99, 95, key="percentil_sup")
+        elif metodo in ("Mediana/MAD", "Estacional (descomposición)"):
+            sensibilidad = st.slider(
+                "Número de desviaciones MAD:",
+                min_value=2.0,
+                max_value=6.0,
+                value=3.5,
+                step=0.5,
+                key="sensibilidad_mad"
+            )
+        elif metodo == "Isolation Forest":
+            umbral_aislamiento = st.slider(
+                "Umbral de puntaje de aislamiento:",
+                min_value=0.5,
+                max_value=0.8,
+                value=0.6,
+                step=0.01,
+                key="umbral_isolation"
+            )
+        else:  # IQR
+            sensibilidad = st.slider(
+                "Multiplicador IQR:",
+                min_value=1.0,
+                max_value=3.0,
+                value=1.5,
+                step=0.1,
+                key="sensibilidad_iqr"
+            )
+        
+        # Selector de tipo de datos
+        tipo_datos = st.selectbox(
+            "Tipo de datos a analizar:",
+            ["Afiliaciones Diarias", "Recaudación Diaria", "Tasa de Crecimiento", "Eficiencia Operativa"],
+            key="tipo_datos_select"
+        )
+        
+        # Rango de días a analizar
+        num_dias = st.slider(
+            "Número de días a analizar:",
+            min_value=7,
+            max_value=90,
+            value=30,
+            key="num_dias_slider"
+        )
+        
+        # Botón para generar nuevos datos
+        if st.button("🔄 Generar Nuevos Datos Aleatorios", key="btn_nuevos_datos"):
+            st.session_state.parametros_anomalias = None
+            st.session_state.semillas["Detección Anomalías"] = motor.nueva_semilla()
+    
+    # La sesión fija los parámetros de la serie; los datos viven en el almacén compartido
+    if st.session_state.parametros_anomalias is None:
+        st.session_state.parametros_anomalias = {'tipo_datos': tipo_datos, 'num_dias': num_dias}
+    
+    # Recuperar datos
+    if datos_reales is not None and tipo_datos in motor.MEDIDAS_DETECCION:
+        # Serie diaria real: últimos num_dias días del archivo cargado
+        df_deteccion = datos_reales.deteccion(motor.MEDIDAS_DETECCION[tipo_datos], num_dias)
+        datos = df_deteccion['Valor'].to_numpy()
+        base_value = float(np.median(datos))
+    else:
+        # Serie sintética con anomalías (entre 2 y 4) con la semilla de la sección
+        datos_actuales = datos_seccion("Detección Anomalías", semilla_seccion("Detección Anomalías"),
+                                       **st.session_state.parametros_anomalias)
+        dias = datos_actuales['dias']
+        datos = datos_actuales['datos']
+        tipo_datos = datos_actuales['tipo_datos']
+        base_value = datos_actuales['base_value']
+        
+        df_deteccion = pd.DataFrame({
+            'Día': dias,
+            'Valor': datos
+        })
+    
+    # Calcular límites según el método seleccionado
+    if metodo == "Percentiles":
+        parametros_detector = dict(percentil_inf=percentil_inf, percentil_sup=percentil_sup)
+    elif metodo == "Isolation Forest":
+        parametros_detector = dict(umbral=umbral_aislamiento)
+    else:
+        parametros_detector = dict(sensibilidad=sensibilidad)
+    if metodo == "Estacional (descomposición)" and 'Fecha' in df_deteccion:
+        parametros_detector['fin_de_mes'] = df_deteccion['Fecha'].dt.is_month_end.to_numpy()
+    
+    resultado_deteccion = motor.detectar(metodo, datos, **parametros_detector)
+    limites_inferiores = resultado_deteccion.limite_inferior[0]
+    limites_superiores = resultado_deteccion.limite_superior[0]
+    limites_variables = not resultado_deteccion.limites_constantes
+    # Con límites por día se reporta su promedio; isolation forest no define límites
+    limite_inferior = float(np.nanmean(limites_inferiores)) if not np.isnan(limites_inferiores).all() else np.nan
+    limite_superior = float(np.nanmean(limites_superiores)) if not np.isnan(limites_superiores).all() else np.nan
+    
+    # Identificar anomalías
+    anomalias = df_deteccion[resultado_deteccion.mascara[0]]
+    
+    # Layout principal
+    col_estadisticas, col_visualizacion = st.columns([1, 2])
+    
+    with col_estadisticas:
+        st.subheader("📊 Estadísticas de Detección")
+        
+        # Métricas clave
+        st.metric("Total de Días Analizados", len(df_deteccion))
+        st.metric("Anomalías Detectadas", len(anomalias))
+        
+        tasa_anomalias = (len(anomalias) / len(df_deteccion)) * 100
+        st.metric("Tasa de Anomalías", f"{tasa_anomalias:.1f}%")
+        
+        etiqueta_limite = " (promedio)" if limites_variables else ""
+        st.metric(f"Límite Superior{etiqueta_limite}", f"{limite_superior:,.1f}" if not np.isnan(limite_superior) else "—")
+        st.metric(f"Límite Inferior{etiqueta_limite}", f"{limite_inferior:,.1f}" if not np.isnan(limite_inferior) else "—")
+        st.caption(f"⏱️ {resultado_deteccion.detector}: {resultado_deteccion.segundos * 1000:.1f} ms")
+        
+        # Análisis de impacto
+        if not anomalias.empty:
+            impacto_total = anomalias['Valor'].sum() - (base_value * len(anomalias))
+            st.metric(
+                "Impacto Total", 
+                f"{impacto_total:,.0f}",
+                delta=f"{impacto_total:+,.0f}"
+            )
+        
+        # Recomendación automática
+        st.subheader("💡 Recomendación")
+        nivel_recomendacion = motor.recomendacion(len(anomalias))
+        if nivel_recomendacion == "urgente":
+            st.error("🚨 **Investigación Urgente**: Múltiples anomalías detectadas")
+        elif nivel_recomendacion == "reforzado":
+            st.warning("⚠️ **Monitoreo Reforzado**: Anomalías significativas presentes")
+        elif nivel_recomendacion == "puntual":
+            st.info("🔍 **Investigación Puntual**: Anomalía aislada detectada")
+        else:
+            st.success("✅ **Comportamiento Normal**: Sin anomalías detectadas")
+    
+    with col_visualizacion:
+        st.subheader(f"📈 Análisis de {tipo_datos}")
+        
+        # Gráfico principal: la serie normal se reduce si es larga; las anomalías siempre se dibujan
+        mascara = resultado_deteccion.mascara[0]
+        fig = figura(
+            "deteccion", motor.figura_deteccion,
+            df_deteccion['Día'].to_numpy(), datos, mascara, limites_inferiores, limites_superiores,
+            base_value=base_value, tipo_datos=tipo_datos, limites_variables=limites_variables
+        )
+        grafica(fig, use_container_width=True)
+        
+        # Detección en línea: cada día se evalúa solo con los datos previos
+        with st.expander("📡 Detección en Línea (límites móviles)"):
+            if metodo not in motor.METODOS:
+                st.info("La detección en línea está disponible para IQR, Desviación Estándar y Percentiles.")
+            else:
+                panel_deteccion_en_linea(metodo, parametros_detector, df_deteccion, tipo_datos)
+    
+    # Gráficos adicionales
+    col_hist, col_box = st.columns(2)
+    
+    with col_hist:
+        st.subheader("📊 Distribución de Datos")
+        # Límites solo cuando no varían por día; el histograma se agrega en el servidor
+        limites_hist = None if limites_variables else (limite_superior, limite_inferior)
+        fig_hist = figura("histograma", motor.figura_histograma, datos, limites_hist, base_value)
+        
+        grafica(fig_hist, use_container_width=True)
+    
+    with col_box:
+        st.subheader("📦 Diagrama de Caja")
+        fig_box = figura("caja", motor.figura_caja, datos, mascara)
+        
+        grafica(fig_box, use_container_width=True)
+    
+    # Reporte detallado de anomalías
+    if not anomalias.empty:
+        st.subheader("📋 Reporte Detallado de Anomalías")
+        
+        # Preparar datos del reporte
+        reporte_anomalias = motor.reporte_anomalias(
+            anomalias, base_value, limites_superiores[resultado_deteccion.mascara[0]])
+        
+        # Mostrar tabla
+        st.dataframe(
+            reporte_anomalias[['Día', 'Valor', 'Tipo', 'Severidad', 'Desviación', 'Desviación %']],
+            use_container_width=True
+        )
+        
+        # Análisis de patrones
+        st.subheader("🔍 Análisis de Patrones")
+        
+        if len(anomalias) >= 3:
+            # Calcular frecuencia de anomalías
+            dias_entre_anomalias = np.diff(anomalias['Día'])
+            frecuencia_promedio = np.mean(dias_entre_anomalias)
+            
+            col_pat1, col_pat2, col_pat3 = st.columns(3)
+            with col_pat1:
+                st.metric("Frecuencia Promedio", f"{frecuencia_promedio:.1f} días")
+            with col_pat2:
+                tipos_anomalias = reporte_anomalias['Tipo'].value_counts()
+                mayor_tipo = tipos_anomalias.idxmax()
+                st.metric("Tipo Predominante", mayor_tipo)
+            with col_pat3:
+                severidad_pred = reporte_anomalias['Severidad'].value_counts().idxmax()
+                st.metric("Severidad Predominante", severidad_pred)
+    else:
+        st.success("🎉 No se detectaron anomalías en el período analizado. El comportamiento se encuentra dentro de los parámetros normales.")
+    
+    # Costo y resultado de todos los detectores registrados sobre la misma serie
+    with st.expander("⏱️ Comparación de Detectores"):
+        df_comparacion = pd.DataFrame([
+            {
+                'Detector': r.detector,
+                'Anomalías': int(r.mascara.sum()),
+                'Tiempo (ms)': r.segundos * 1000,
+                'Puntos/segundo': r.puntos_por_segundo
+            }
+            for r in motor.comparar_detectores(datos)
+        ])
+        st.dataframe(df_comparacion, use_container_width=True, hide_index=True)
+    
+    # Escaneo de todas las series del archivo cargado en una sola pasada
+    if datos_reales is not None and tipo_datos in motor.MEDIDAS_DETECCION:
+        with st.expander("🗺️ Escaneo por Estado y Sector"):
+            dimension = st.radio("Agrupar series por:", ["estado", "sector"], horizontal=True,
+                                 key="escaneo_dimension")
+            df_matriz = datos_reales.matriz(motor.MEDIDAS_DETECCION[tipo_datos], por=dimension)
+            resultado_lote = motor.detectar_lote(
+                df_matriz.to_numpy(dtype=np.float32),
+                sensibilidad_iqr=sensibilidad if metodo == "IQR (Recomendado)" else 1.5,
+                sensibilidad_std=sensibilidad if metodo == "Desviación Estándar" else 3.0,
+                percentil_inf=percentil_inf if metodo == "Percentiles" else 5,
+                percentil_sup=percentil_sup if metodo == "Percentiles" else 95
+            )
+            df_escaneo = pd.DataFrame({
+                dimension.capitalize(): df_matriz.index.astype(str),
+                **{m: resultado_lote.conteo_por_serie(m, len(df_matriz)) for m in motor.METODOS}
+            }).sort_values(metodo if metodo in motor.METODOS else motor.METODOS[0], ascending=False)
+            st.dataframe(df_escaneo, use_container_width=True, hide_index=True)
+
+
+
+SECCIONES = {
+    "Presupuesto": seccion_presupuesto,
+    "Análisis Reformas": seccion_reformas,
+    "Estudios Investigación": seccion_estudios,
+    "Reportes Avances": seccion_reportes,
+    "Metas Desempeño": seccion_metas,
+    "Detección Anomalías": seccion_anomalias
+}
+
+# Si no se ha seleccionado ninguna función, mostrar pantalla de inicio
+if not st.session_state.selected_funcion:
+    pantalla_inicio()
+else:
+    SECCIONES[st.session_state.selected_funcion]()
+
+# Botón para volver al inicio
+st.markdown("---")
+if st.button("🏠 Volver al Inicio", key="btn_volver_inicio"):
+    st.session_state.selected_funcion = None
+    st.rerun()
+
+# Footer
+st.markdown("---")
+st.markdown(
+    "**Desarrollado como demostración de capacidades técnicas para el proceso de selección - "
+    "Subjefe de División de Política Fiscal**"
+)
+# Panel de rendimiento: se dibuja al final para incluir los tiempos de esta ejecución
+CARPETA_METRICAS = os.environ.get("METRICAS_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "metricas"))
+
+if modo_depuracion:
+    with st.sidebar:
+        st.divider()
+        st.header("🛠️ Rendimiento")
+        alcance_metricas = st.radio("Mediciones de:", ["Esta sesión", "Todas las sesiones"],
+                                    horizontal=True, key="alcance_metricas")
+        df_metricas = motor.INSTRUMENTACION.resumen(ID_SESION if alcance_metricas == "Esta sesión" else None)
+        st.dataframe(
+            df_metricas, use_container_width=True, hide_index=True,
+            column_config={
+                'p50 (ms)': st.column_config.NumberColumn(format="%.1f"),
+                'p95 (ms)': st.column_config.NumberColumn(format="%.1f"),
+                'Bytes (p50)': st.column_config.NumberColumn(format="%.0f"),
+            }
+        )
+        st.caption(f"Sesión {ID_SESION} · ventana de {motor.INSTRUMENTACION.ventana} mediciones por etapa")
+        estadisticas_almacen = almacen_datos().estadisticas()
+        st.caption(
+            f"Datos compartidos: {estadisticas_almacen['entradas']} conjuntos, "
+            f"{estadisticas_almacen['bytes'] / 2**20:,.1f} de {estadisticas_almacen['presupuesto_bytes'] / 2**20:,.0f} MB · "
+            f"{estadisticas_almacen['aciertos']} aciertos, {estadisticas_almacen['fallos']} fallos, "
+            f"{estadisticas_almacen['desalojos']} desalojos"
+        )
+        if st.button("💾 Exportar métricas", key="btn_exportar_metricas"):
+            ruta_json, ruta_prom = motor.INSTRUMENTACION.exportar(CARPETA_METRICAS)
+            st.caption(f"✅ {ruta_json} y {ruta_prom}")
+        col_json, col_prom = st.columns(2)
+        with col_json:
+            st.download_button("JSON", motor.INSTRUMENTACION.a_json(), file_name="metricas.json",
+                               mime="application/json", key="descargar_metricas_json")
+        with col_prom:
+            st.download_button("Prometheus", motor.INSTRUMENTACION.a_prometheus(), file_name="metricas.prom",
+                               mime="text/plain", key="descargar_metricas_prom")
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""
+Suite de rendimiento de los cálculos de ``motor``.
+
+Cada caso prepara sus datos fuera del cronómetro y mide solo el cálculo, sin
+Streamlit. Hay dos perfiles: ``realista`` (los tamaños que usa la app) y
+``estres`` (hasta 10^8 puntos). Por caso se reporta el mejor tiempo y la
+mediana de varias repeticiones, el rendimiento en elementos por segundo y la
+memoria pico reservada durante una corrida (``tracemalloc``, que también
+registra los arreglos de NumPy). Los resultados se comparan contra una línea
+base guardada en JSON y el proceso termina con código 1 si algún caso es más
+lento o usa más memoria que la tolerancia.
+
+Uso::
+
+    python -m benchmarks                         # perfil realista contra linea_base.json
+    python -m benchmarks --perfil estres --filtro anomalias
+    python -m benchmarks --guardar-linea-base    # actualiza la línea base de esta máquina
+
+``benchmarks.sesiones`` es aparte la prueba de carga de ``app.py`` completa
+con sesiones concurrentes simuladas (``python -m benchmarks.sesiones``).
+"""
+
+from benchmarks.casos import CASOS, Caso, casos, registrar_grupo
+from benchmarks.ejecutar import Medicion, comparar, main, medir
+
+__all__ = [
+    "CASOS",
+    "Caso",
+    "casos",
+    "registrar_grupo",
+    "Medicion",
+    "comparar",
+    "main",
+    "medir",
+]
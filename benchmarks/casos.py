@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+"""
+Casos de la suite de rendimiento, agrupados por sección de la app.
+
+``preparar`` genera los datos de entrada (fuera del cronómetro) y devuelve
+``(funcion, elementos)``: la función sin argumentos que se mide y el número
+de elementos que procesa, con el que se calcula el rendimiento. Los datos son
+sintéticos con semilla fija para que las corridas sean comparables.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+import motor
+from motor.sensibilidad import elasticidades
+
+PERFILES: Tuple[str, ...] = ("realista", "estres")
+SEMILLA: int = 2024
+
+
+@dataclass
+class Caso:
+    """Cálculo a medir con su perfil de tamaño."""
+
+    nombre: str
+    perfil: str
+    preparar: Callable[[], Tuple[Callable[[], object], int]]
+    # Los casos que tardan segundos por corrida limitan sus repeticiones
+    max_repeticiones: Optional[int] = None
+
+
+CASOS: Dict[str, Callable[[], List[Caso]]] = {}
+
+
+def registrar_grupo(nombre: str):
+    """Decorador que registra una función que devuelve los casos de un grupo."""
+    def decorador(funcion):
+        CASOS[nombre] = funcion
+        return funcion
+    return decorador
+
+
+def casos(perfiles: Sequence[str] = ("realista",), filtro: Optional[str] = None) -> List[Caso]:
+    """Casos de los perfiles indicados cuyo nombre contiene ``filtro``."""
+    seleccion = []
+    for construir in CASOS.values():
+        for caso in construir():
+            if caso.perfil in perfiles and (filtro is None or filtro in caso.nombre):
+                seleccion.append(caso)
+    return seleccion
+
+
+@registrar_grupo("presupuesto")
+def _presupuesto() -> List[Caso]:
+    def matriz(escenarios: int, horizonte: int):
+        def preparar():
+            rng = np.random.default_rng(SEMILLA)
+            base = rng.uniform(400000, 600000, escenarios)
+            crecimiento = rng.normal(5, 2, escenarios)
+            inflacion = rng.normal(4, 1, escenarios)
+            return (lambda: motor.proyectar_matriz(base, crecimiento, inflacion, horizonte, real=True),
+                    escenarios * horizonte)
+        return preparar
+
+    def escenarios(horizonte: int):
+        def preparar():
+            return lambda: motor.proyectar_escenarios(500000, 5.0, 4.0, horizonte), len(motor.ESCENARIOS) * horizonte
+        return preparar
+
+    def rejilla():
+        crecimientos, inflaciones = np.linspace(0, 10, 41), np.linspace(2, 8, 25)
+        return (lambda: motor.rejilla_escenarios(500000, crecimientos, inflaciones, 10, real=True),
+                len(crecimientos) * len(inflaciones) * 10)
+
+    resultado = [
+        Caso(f"presupuesto.escenarios h={h}", "realista", escenarios(h)) for h in (4, 10, 30)
+    ]
+    resultado.append(Caso("presupuesto.rejilla 41x25 h=10", "realista", rejilla))
+    for n, h in ((3, 4), (1000, 10), (100000, 30)):
+        resultado.append(Caso(f"presupuesto.matriz n={n:,} h={h}", "realista", matriz(n, h)))
+    for n, h in ((1000000, 30), (10000000, 4)):
+        resultado.append(Caso(f"presupuesto.matriz n={n:,} h={h}", "estres", matriz(n, h), max_repeticiones=3))
+    return resultado
+
+
+@registrar_grupo("reformas")
+def _reformas() -> List[Caso]:
+    def escenarios():
+        impactos = list(motor.IMPACTO_BASE)
+
+        def calcular():
+            for idx in range(len(motor.REFORMAS)):
+                for sensibilidad in range(-50, 51, 5):
+                    actualizados = motor.impactos_actualizados(impactos, idx, sensibilidad)
+                    motor.escenarios_reforma(actualizados[idx])
+                    motor.ajustar_confianza(motor.CONFIANZA[idx], sensibilidad)
+        return calcular, len(motor.REFORMAS) * 21
+
+    def tabla_elasticidades(num_registros: int):
+        # ``elasticidades`` está memoizada: se mide la función sin la caché
+        return lambda: (lambda: elasticidades.__wrapped__(num_registros), num_registros)
+
+    def barrido(num_perturbaciones: int, combinadas: bool):
+        def preparar():
+            tabla = elasticidades(100000)
+            impactos = np.asarray(motor.IMPACTO_BASE)
+            if combinadas:
+                rng = np.random.default_rng(SEMILLA)
+                perturbaciones = rng.uniform(-20, 20, (num_perturbaciones, tabla.shape[1]))
+            else:
+                perturbaciones = np.linspace(-20, 20, num_perturbaciones)
+            return (lambda: motor.barrido(impactos, tabla.to_numpy(), perturbaciones),
+                    num_perturbaciones * tabla.size)
+        return preparar
+
+    def tornado():
+        tabla = elasticidades(100000)
+        impactos = np.asarray(motor.IMPACTO_BASE)
+        return lambda: motor.tornado(impactos, tabla), tabla.size
+
+    return [
+        Caso("reformas.escenarios", "realista", escenarios),
+        Caso("reformas.tornado", "realista", tornado),
+        Caso("reformas.barrido g=201", "realista", barrido(201, False)),
+        Caso("reformas.barrido combinado g=10,000", "realista", barrido(10000, True)),
+        Caso("reformas.elasticidades n=100,000", "realista", tabla_elasticidades(100000), max_repeticiones=3),
+        Caso("reformas.barrido combinado g=1,000,000", "estres", barrido(1000000, True), max_repeticiones=3),
+        Caso("reformas.elasticidades n=1,000,000", "estres", tabla_elasticidades(1000000), max_repeticiones=1),
+    ]
+
+
+@registrar_grupo("estudios")
+def _estudios() -> List[Caso]:
+    def sectores(num_sectores: int):
+        def preparar():
+            rng = np.random.default_rng(SEMILLA)
+            crecimiento = rng.normal(3, 2, num_sectores)
+            df = pd.DataFrame({
+                "Crecimiento Anual (%)": crecimiento,
+                "Tasa Informalidad (%)": 40 - 2 * crecimiento + rng.normal(0, 5, num_sectores),
+            })
+            return lambda: motor.correlacion_sectores(df), num_sectores
+        return preparar
+
+    def bootstrap(num_remuestreos: int):
+        def preparar():
+            indicadores = motor.generar_datos("Indicadores Laborales", SEMILLA)
+            datos = indicadores.select_dtypes("number")
+            return (lambda: motor.correlaciones_bootstrap(datos, num_remuestreos=num_remuestreos),
+                    num_remuestreos * datos.size)
+        return preparar
+
+    return [
+        Caso("estudios.correlacion_sectores n=10", "realista", sectores(10)),
+        Caso("estudios.correlaciones_bootstrap b=1,000", "realista", bootstrap(1000), max_repeticiones=3),
+        Caso("estudios.correlacion_sectores n=1,000,000", "estres", sectores(1000000)),
+        Caso("estudios.correlaciones_bootstrap b=10,000", "estres", bootstrap(10000), max_repeticiones=1),
+    ]
+
+
+@registrar_grupo("reportes")
+def _reportes() -> List[Caso]:
+    def almacen_sintetico(num_subdelegaciones: Optional[int]) -> motor.AlmacenAvances:
+        if num_subdelegaciones is None:
+            return motor.AlmacenAvances.desde_registros(**motor.generar_datos("Reportes Avances", SEMILLA))
+        rng = np.random.default_rng(SEMILLA)
+        delegacion = rng.integers(0, 1000, num_subdelegaciones)
+        meta_afiliacion = rng.integers(8000, 60000, num_subdelegaciones)
+        meta_recaudacion = rng.integers(200, 1600, num_subdelegaciones) * 1000
+        return motor.AlmacenAvances.desde_registros(
+            estados=np.char.add("Estado ", (delegacion % 32).astype(str)),
+            delegaciones=np.char.add("Delegación ", delegacion.astype(str)),
+            subdelegaciones=np.char.add("Subdelegación ", np.arange(num_subdelegaciones).astype(str)),
+            meta_afiliacion=meta_afiliacion,
+            avance_afiliacion=meta_afiliacion * rng.uniform(0.6, 1.2, num_subdelegaciones),
+            meta_recaudacion=meta_recaudacion,
+            avance_recaudacion=meta_recaudacion * rng.uniform(0.7, 1.3, num_subdelegaciones),
+        )
+
+    def tabla(nivel: str, num_subdelegaciones: Optional[int] = None):
+        def preparar():
+            almacen = almacen_sintetico(num_subdelegaciones)
+            return lambda: almacen.tabla(nivel), len(almacen.nombres[nivel])
+        return preparar
+
+    def deltas(num_subdelegaciones: Optional[int] = None):
+        def preparar():
+            almacen = almacen_sintetico(num_subdelegaciones)
+            n = len(almacen.nombres["Subdelegación"])
+            indices, incrementos = motor.generar_deltas_avance(SEMILLA, n)
+            return lambda: almacen.aplicar_deltas(indices, incrementos), len(indices)
+        return preparar
+
+    return [
+        Caso("reportes.tabla Estado", "realista", tabla("Estado")),
+        Caso("reportes.tabla Subdelegación", "realista", tabla("Subdelegación")),
+        Caso("reportes.aplicar_deltas", "realista", deltas()),
+        Caso("reportes.tabla Subdelegación n=1,000,000", "estres", tabla("Subdelegación", 1000000),
+             max_repeticiones=3),
+        Caso("reportes.aplicar_deltas n=1,000,000", "estres", deltas(1000000), max_repeticiones=3),
+    ]
+
+
+@registrar_grupo("metas")
+def _metas() -> List[Caso]:
+    porcentajes = {"Afiliación": 10.0, "Recaudación": 8.0, "Eficiencia Operativa": 12.0}
+
+    def unidades(num_trayectorias: int):
+        def preparar():
+            df = motor.generar_datos("Metas Desempeño", SEMILLA)
+            return (lambda: motor.metas_unidades(df, porcentajes, num_trayectorias=num_trayectorias),
+                    len(df) * num_trayectorias * len(motor.TRIMESTRES))
+        return preparar
+
+    def simulacion(num_unidades: int, num_trayectorias: int):
+        def preparar():
+            tipos = np.resize(motor.TIPOS_META, num_unidades)
+            porcentaje = np.resize([10.0, 8.0, 12.0], num_unidades)
+            return (lambda: motor.simular_cumplimiento(tipos, porcentaje, num_trayectorias),
+                    num_unidades * num_trayectorias * len(motor.TRIMESTRES))
+        return preparar
+
+    return [
+        Caso("metas.simular_cumplimiento n=1 t=2,000", "realista", simulacion(1, 2000)),
+        Caso("metas.metas_unidades t=2,000", "realista", unidades(2000), max_repeticiones=3),
+        Caso("metas.simular_cumplimiento n=20,000 t=2,000", "estres", simulacion(20000, 2000), max_repeticiones=1),
+    ]
+
+
+@registrar_grupo("anomalias")
+def _anomalias() -> List[Caso]:
+    def serie(num_puntos: int) -> np.ndarray:
+        rng = np.random.default_rng(SEMILLA)
+        datos = rng.standard_normal(num_puntos, dtype=np.float32)
+        datos *= 500
+        datos += 5000
+        return datos
+
+    def limites(metodo: str, num_puntos: int):
+        def preparar():
+            datos = serie(num_puntos)
+
+            def detectar():
+                sensibilidad = 3.0 if metodo == "Desviación Estándar" else 1.5
+                inferior, superior = motor.calcular_limites(datos, metodo, sensibilidad)
+                return np.count_nonzero((datos < inferior) | (datos > superior))
+            return detectar, num_puntos
+        return preparar
+
+    def lote(num_series: int, num_dias: int):
+        def preparar():
+            matriz = serie(num_series * num_dias).reshape(num_series, num_dias)
+            return lambda: motor.detectar_lote(matriz), matriz.size
+        return preparar
+
+    resultado = []
+    for metodo in motor.METODOS:
+        for n in (90, 365, 100000, 10000000):
+            resultado.append(Caso(f"anomalias.{metodo} n={n:,}", "realista", limites(metodo, n),
+                                  max_repeticiones=3 if n >= 10000000 else None))
+        resultado.append(Caso(f"anomalias.{metodo} n=100,000,000", "estres", limites(metodo, 100000000),
+                              max_repeticiones=1))
+    resultado += [
+        Caso("anomalias.lote 1,000x365", "realista", lote(1000, 365)),
+        Caso("anomalias.lote 10,000x10,000", "estres", lote(10000, 10000), max_repeticiones=1),
+    ]
+    return resultado
@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+"""
+Medición de los casos, comparación contra la línea base y CLI.
+
+Los tiempos usan ``timeit``: cada repetición ejecuta el caso las veces
+necesarias para durar al menos ``TIEMPO_MINIMO`` segundos y se reporta el
+tiempo por llamada. Para detectar regresiones se compara el mejor tiempo
+(el menos afectado por ruido de otros procesos) y la memoria pico.
+
+En máquinas virtuales la velocidad de la CPU cambia entre corridas e incluso
+durante una corrida; por eso justo antes de cada caso se mide una carga fija
+de calibración (NumPy e intérprete) y lo que se compara con la línea base es
+el tiempo del caso dividido entre el de la calibración. Los casos que salen
+como regresión se vuelven a medir (``--reintentos``) y se conserva la mejor
+medición, para no fallar por una ráfaga de carga de otros procesos.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.casos import PERFILES, Caso, casos
+
+REPETICIONES: int = 5
+TIEMPO_MINIMO: float = 0.2
+TOLERANCIA: float = 0.25
+REINTENTOS: int = 2
+# Diferencias de memoria menores que esta no cuentan como regresión (ruido del intérprete)
+HOLGURA_MEMORIA: int = 2**20
+LINEA_BASE: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "linea_base.json")
+
+
+@dataclass
+class Medicion:
+    """Tiempos por llamada (segundos), memoria pico (bytes) y elementos de un caso."""
+
+    nombre: str
+    perfil: str
+    elementos: int
+    mejor_s: float
+    mediana_s: float
+    repeticiones: int
+    pico_bytes: int
+    calibracion_s: float
+
+    @property
+    def tiempo_relativo(self) -> float:
+        """Mejor tiempo en unidades de la carga de calibración."""
+        return self.mejor_s / self.calibracion_s
+
+    @property
+    def rendimiento(self) -> float:
+        """Elementos por segundo con el mejor tiempo."""
+        return self.elementos / self.mejor_s if self.mejor_s > 0 else float("nan")
+
+
+def _carga_calibracion() -> None:
+    datos = np.random.default_rng(0).standard_normal(200000)
+    np.sort(datos)
+    np.percentile(datos, [5, 95])
+    sum(i * i for i in range(20000))
+
+
+def calibrar(repeticiones: int = REPETICIONES) -> float:
+    """Mejor tiempo (segundos) de la carga de referencia en esta máquina y momento."""
+    return min(timeit.Timer(_carga_calibracion).repeat(repeat=repeticiones, number=5)) / 5
+
+
+def medir(caso: Caso, repeticiones: int = REPETICIONES, tiempo_minimo: float = TIEMPO_MINIMO) -> Medicion:
+    """Mide tiempo y memoria pico de ``caso``; la preparación no se cronometra."""
+    funcion, elementos = caso.preparar()
+    if caso.max_repeticiones is not None:
+        repeticiones = min(repeticiones, caso.max_repeticiones)
+
+    # Corrida aparte para la memoria: tracemalloc agrega costo por asignación
+    gc.collect()
+    tracemalloc.start()
+    try:
+        funcion()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    calibracion = calibrar(3)
+    temporizador = timeit.Timer(funcion)
+    if caso.max_repeticiones is not None and caso.max_repeticiones <= 1:
+        numero = 1
+    else:
+        # Número de llamadas por repetición para que cada una dure lo suficiente
+        numero, total = temporizador.autorange()
+        numero = max(int(numero * tiempo_minimo / max(total, 1e-9)), 1)
+    tiempos = [t / numero for t in temporizador.repeat(repeat=repeticiones, number=numero)]
+    del funcion, temporizador
+    gc.collect()
+    return Medicion(
+        nombre=caso.nombre,
+        perfil=caso.perfil,
+        elementos=int(elementos),
+        mejor_s=min(tiempos),
+        mediana_s=statistics.median(tiempos),
+        repeticiones=len(tiempos),
+        pico_bytes=int(pico),
+        calibracion_s=calibracion,
+    )
+
+
+def maquina() -> Dict[str, object]:
+    """Datos del entorno que se guardan con la línea base."""
+    return {
+        "plataforma": platform.platform(),
+        "procesador": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+
+
+def cargar_linea_base(ruta: str) -> Dict:
+    if not os.path.exists(ruta):
+        return {"maquina": {}, "casos": {}}
+    with open(ruta, encoding="utf-8") as archivo:
+        return json.load(archivo)
+
+
+def guardar_linea_base(mediciones: Sequence[Medicion], ruta: str) -> None:
+    """Agrega o reemplaza los casos medidos en la línea base (conserva los demás)."""
+    linea_base = cargar_linea_base(ruta)
+    linea_base["maquina"] = maquina()
+    for m in mediciones:
+        linea_base["casos"][m.nombre] = asdict(m)
+    linea_base["casos"] = dict(sorted(linea_base["casos"].items()))
+    temporal = ruta + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as archivo:
+        json.dump(linea_base, archivo, ensure_ascii=False, indent=1)
+        archivo.write("\n")
+    os.replace(temporal, ruta)
+
+
+def comparar(mediciones: Sequence[Medicion], linea_base: Dict, tolerancia: float = TOLERANCIA) -> pd.DataFrame:
+    """Tabla de resultados con la razón contra la línea base y el estado de cada caso.
+
+    La razón de tiempo compara tiempos relativos a la calibración, así que
+    descuenta los cambios de velocidad de la máquina entre corridas.
+
+    Un caso es ``regresión`` si su mejor tiempo o su memoria pico superan la
+    línea base en más de ``tolerancia`` (fracción); en memoria, además, por
+    más de ``HOLGURA_MEMORIA`` bytes.
+    """
+    filas = []
+    for m in mediciones:
+        base = linea_base.get("casos", {}).get(m.nombre)
+        razon_tiempo = m.tiempo_relativo / (base["mejor_s"] / base["calibracion_s"]) if base else np.nan
+        razon_memoria = (m.pico_bytes + 1) / (base["pico_bytes"] + 1) if base else np.nan
+        if base is None:
+            estado = "sin línea base"
+        elif razon_tiempo > 1 + tolerancia or (
+            razon_memoria > 1 + tolerancia and m.pico_bytes - base["pico_bytes"] > HOLGURA_MEMORIA
+        ):
+            estado = "regresión"
+        elif razon_tiempo < 1 / (1 + tolerancia):
+            estado = "mejora"
+        else:
+            estado = "ok"
+        filas.append({
+            "Caso": m.nombre,
+            "Perfil": m.perfil,
+            "Elementos": m.elementos,
+            "Mejor (ms)": m.mejor_s * 1000,
+            "Mediana (ms)": m.mediana_s * 1000,
+            "Elementos/s": m.rendimiento,
+            "Pico (MB)": m.pico_bytes / 2**20,
+            "Tiempo vs base": razon_tiempo,
+            "Memoria vs base": razon_memoria,
+            "Estado": estado,
+        })
+    return pd.DataFrame(filas)
+
+
+def main(argumentos: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Mide los cálculos de motor y los compara con la línea base.")
+    parser.add_argument("--perfil", choices=PERFILES + ("todos",), default="realista")
+    parser.add_argument("--filtro", help="Solo los casos cuyo nombre contiene este texto")
+    parser.add_argument("--repeticiones", type=int, default=REPETICIONES)
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA,
+                        help="Fracción de aumento de tiempo o memoria que se considera regresión")
+    parser.add_argument("--reintentos", type=int, default=REINTENTOS,
+                        help="Veces que se vuelve a medir un caso con regresión antes de reportarlo")
+    parser.add_argument("--linea-base", default=LINEA_BASE)
+    parser.add_argument("--guardar-linea-base", action="store_true",
+                        help="Guarda los resultados como línea base en lugar de fallar por regresiones")
+    parser.add_argument("--salida", help="Archivo JSON con las mediciones de esta corrida")
+    parser.add_argument("--listar", action="store_true", help="Lista los casos sin medirlos")
+    args = parser.parse_args(argumentos)
+
+    perfiles = PERFILES if args.perfil == "todos" else (args.perfil,)
+    seleccion = casos(perfiles, args.filtro)
+    if not seleccion:
+        parser.error("Ningún caso coincide con el perfil y el filtro")
+    if args.listar:
+        for caso in seleccion:
+            print(f"{caso.perfil:9} {caso.nombre}")
+        return 0
+
+    linea_base = cargar_linea_base(args.linea_base)
+    if linea_base["maquina"] and linea_base["maquina"] != maquina():
+        print(f"Aviso: la línea base se midió en otra máquina: {linea_base['maquina']}", file=sys.stderr)
+
+    mediciones: List[Medicion] = []
+    for caso in seleccion:
+        print(f"· {caso.nombre}", file=sys.stderr, flush=True)
+        mediciones.append(medir(caso, args.repeticiones))
+
+    tabla = comparar(mediciones, linea_base, args.tolerancia)
+    for _ in range(0 if args.guardar_linea_base else args.reintentos):
+        dudosos = np.flatnonzero(tabla["Estado"].to_numpy() == "regresión")
+        if not len(dudosos):
+            break
+        for i in dudosos:
+            print(f"· {seleccion[i].nombre} (nueva medición)", file=sys.stderr, flush=True)
+            nueva = medir(seleccion[i], args.repeticiones)
+            if nueva.tiempo_relativo < mediciones[i].tiempo_relativo:
+                mediciones[i] = nueva
+        tabla = comparar(mediciones, linea_base, args.tolerancia)
+    formatos = {"Elementos/s": "{:,.0f}".format, "Pico (MB)": "{:,.1f}".format}
+    with pd.option_context("display.width", 200, "display.max_rows", None, "display.float_format", "{:,.3f}".format):
+        print(tabla.to_string(index=False, formatters=formatos))
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            json.dump({"maquina": maquina(), "casos": [asdict(m) for m in mediciones]},
+                      archivo, ensure_ascii=False, indent=1)
+    if args.guardar_linea_base:
+        guardar_linea_base(mediciones, args.linea_base)
+        print(f"Línea base actualizada: {os.path.abspath(args.linea_base)}")
+        return 0
+
+    regresiones = tabla[tabla["Estado"] == "regresión"]
+    if len(regresiones):
+        print(f"{len(regresiones)} casos con regresión: {', '.join(regresiones['Caso'])}", file=sys.stderr)
+        return 1
+    return 0
@@ -0,0 +1,332 @@
+# -*- coding: utf-8 -*-
+"""
+Prueba de carga de ``app.py`` con sesiones concurrentes simuladas.
+
+Cada sesión es un ``AppTest`` de Streamlit que recorre un guion de analista:
+entra a las seis funciones y mueve sus sliders a valores aleatorios (con una
+semilla por sesión, de modo que las sesiones no siempre aciertan en la
+caché). Cada sesión corre en su propio proceso y todas compiten por la CPU.
+No se usan hilos porque ``AppTest`` no es seguro entre hilos: cada
+reejecución reemplaza estado global del proceso (la instancia de
+``Runtime``, opciones de configuración) y compila ``app.py`` con ``ast.parse``,
+que en Python 3.11 falla desde varios hilos a la vez. Por eso las sesiones no
+comparten las cachés de ``st.cache_data`` y ``st.cache_resource`` como en un
+solo servidor; se parece más a varios procesos de ``streamlit run`` detrás de
+un balanceador.
+
+Antes de la barrera que arranca el nivel, cada proceso recorre el guion una vez
+para calentar sus cachés (como un servidor que lleva tiempo arriba); lo que se
+mide empieza después.
+
+Por nivel de concurrencia se reporta la latencia de cada reejecución
+(p50/p95/p99), las interacciones por segundo y la memoria residente que
+agrega cada sesión a su proceso. Las interacciones con error no cuentan en
+rendimiento ni latencias: terminan en milisegundos sin hacer el trabajo. Un
+nivel con errores se marca como no válido y queda fuera del cálculo de
+saturación, que es el último nivel válido en el que agregar sesiones todavía
+aumentó el rendimiento en más de ``UMBRAL_SATURACION``.
+
+Uso::
+
+    python -m benchmarks.sesiones --sesiones 1 2 4 8 16 --rondas 2
+"""
+
+import argparse
+import gc
+import logging
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import streamlit.config as streamlit_config
+import streamlit.logger as streamlit_logger
+from streamlit.testing.v1 import AppTest
+
+import motor
+
+APP: str = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+NIVELES: Tuple[int, ...] = (1, 2, 4, 8)
+RONDAS: int = 2
+TIEMPO_LIMITE: float = 300
+# Aumento relativo de rendimiento por debajo del cual se considera saturado
+UMBRAL_SATURACION: float = 0.10
+
+# Sliders que el guion mueve en cada función (los que no están visibles se omiten)
+SLIDERS: Dict[str, List[str]] = {
+    "Presupuesto": ["presupuesto_crecimiento", "presupuesto_inflacion", "presupuesto_horizonte"],
+    "Análisis Reformas": ["sensibilidad_slider", "rango_barrido"],
+    "Estudios Investigación": [],
+    "Reportes Avances": [],
+    "Metas Desempeño": ["crecimiento_afiliacion_slider", "meta_nacional_slider"],
+    "Detección Anomalías": ["num_dias_slider", "sensibilidad_iqr"],
+}
+
+
+@dataclass
+class Interaccion:
+    """Latencia de una reejecución de la app dentro de una sesión."""
+
+    nivel: int
+    sesion: int
+    paso: str
+    segundos: float
+    error: Optional[str] = None
+
+
+def _rss() -> int:
+    """Memoria residente actual del proceso (bytes); el máximo histórico fuera de Linux."""
+    try:
+        with open("/proc/self/statm") as archivo:
+            return int(archivo.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        escala = 1 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * escala
+
+
+def _valor_slider(slider, rng: np.random.Generator):
+    """Valor aleatorio dentro del rango del slider, respetando su paso y tipo."""
+    pasos = int(round((slider.max - slider.min) / slider.step))
+    return type(slider.value)(round(slider.min + rng.integers(0, pasos + 1) * slider.step, 6))
+
+
+def guion(rng: np.random.Generator) -> List[Tuple[str, Callable]]:
+    """Pasos de una ronda: ``(nombre, accion(at))``; cada acción termina con ``run()``."""
+    pasos: List[Tuple[str, Callable]] = []
+    for seccion, sliders in SLIDERS.items():
+        pasos.append((seccion, lambda at, s=seccion: at.button(key=f"btn_{s}").click().run()))
+        for clave in sliders:
+            def mover(at, clave=clave):
+                visibles = {s.key for s in at.slider}
+                if clave not in visibles:
+                    return None
+                slider = at.slider(key=clave)
+                return slider.set_value(_valor_slider(slider, rng)).run()
+            pasos.append((f"{seccion} · {clave}", mover))
+    pasos.append(("Inicio", lambda at: at.button(key="btn_volver_inicio").click().run()))
+    return pasos
+
+
+def _silenciar_streamlit() -> None:
+    # Los avisos de contexto y de obsolescencia se repiten en cada reejecución; la
+    # configuración se lee antes para que no restablezca el nivel del registro
+    streamlit_config.get_config_options()
+    streamlit_logger.set_log_level(logging.ERROR)
+
+
+def _sesion(app: str, nivel: int, indice: int, rondas: int, semilla: int, tiempo_limite: float,
+            inicio: Optional["multiprocessing.synchronize.Barrier"], sesiones: list) -> List[Interaccion]:
+    rng = np.random.default_rng([semilla, nivel, indice])
+    at = AppTest.from_file(app, default_timeout=tiempo_limite)
+    sesiones.append(at)
+    mediciones = []
+
+    def medir(paso: str, accion: Callable) -> None:
+        t0 = time.perf_counter()
+        error = None
+        try:
+            if accion(at) is None:
+                return
+            if at.exception:
+                error = str(at.exception[0].message)
+        except Exception as excepcion:  # la sesión sigue aunque una interacción falle
+            error = f"{type(excepcion).__name__}: {excepcion}"
+        mediciones.append(Interaccion(nivel, indice, paso, time.perf_counter() - t0, error))
+
+    if inicio is not None:
+        inicio.wait()
+    medir("Carga inicial", lambda at: at.run())
+    for _ in range(rondas):
+        for paso, accion in guion(rng):
+            medir(paso, accion)
+    return mediciones
+
+
+def calentar(app: str = APP, semilla: int = 2024, tiempo_limite: float = TIEMPO_LIMITE) -> List[Interaccion]:
+    """Recorre el guion una vez con una sola sesión para crear las cachés de la app."""
+    return _sesion(app, 0, 0, 1, semilla, tiempo_limite, None, [])
+
+
+def _proceso_sesion(app: str, nivel: int, indice: int, rondas: int, semilla: int, tiempo_limite: float,
+                    calentar_cache: bool, metricas: Optional[str], inicio, cola) -> None:
+    """Cuerpo de cada proceso: calienta, espera la barrera, corre la sesión y envía sus mediciones."""
+    try:
+        _silenciar_streamlit()
+        if calentar_cache:
+            calentar(app, semilla, tiempo_limite)
+        gc.collect()
+        memoria_inicial = _rss()
+        sesiones: list = []
+        mediciones = _sesion(app, nivel, indice, rondas, semilla, tiempo_limite, inicio, sesiones)
+        # La sesión sigue viva: la diferencia es su estado más lo que agregó a las cachés
+        memoria = _rss() - memoria_inicial
+        if metricas:
+            motor.INSTRUMENTACION.exportar(os.path.join(metricas, f"{nivel}-sesiones-{indice}"))
+        cola.put((mediciones, memoria))
+    except BaseException as excepcion:
+        # Sin esto las demás sesiones esperarían en la barrera para siempre
+        inicio.abort()
+        error = f"{type(excepcion).__name__}: {excepcion}"
+        cola.put(([Interaccion(nivel, indice, "Proceso", 0.0, error)], 0))
+
+
+@dataclass
+class ResultadoNivel:
+    """Interacciones, duración total y memoria agregada por sesión de un nivel."""
+
+    sesiones: int
+    interacciones: List[Interaccion]
+    segundos: float
+    memoria_por_sesion: float
+
+
+def ejecutar_nivel(
+    num_sesiones: int,
+    rondas: int = RONDAS,
+    semilla: int = 2024,
+    app: str = APP,
+    tiempo_limite: float = TIEMPO_LIMITE,
+    calentar_cache: bool = True,
+    metricas: Optional[str] = None,
+) -> ResultadoNivel:
+    """Corre ``num_sesiones`` sesiones simultáneas, una por proceso, y mide latencias y memoria."""
+    # ``spawn``: un proceso nuevo no hereda hilos ni el estado global de Streamlit del padre
+    contexto = multiprocessing.get_context("spawn")
+    inicio = contexto.Barrier(num_sesiones + 1)
+    cola = contexto.Queue()
+    procesos = [
+        contexto.Process(
+            target=_proceso_sesion, name=f"sesion-{i}", daemon=True,
+            args=(app, num_sesiones, i, rondas, semilla, tiempo_limite, calentar_cache, metricas, inicio, cola),
+        )
+        for i in range(num_sesiones)
+    ]
+    for proceso in procesos:
+        proceso.start()
+    try:
+        inicio.wait()
+    except threading.BrokenBarrierError:
+        pass  # algún proceso falló antes de empezar; su error llega por la cola
+    t0 = time.perf_counter()
+    # La cola se vacía antes de ``join`` para que ningún proceso se bloquee al escribir
+    resultados = [cola.get() for _ in procesos]
+    segundos = time.perf_counter() - t0
+    for proceso in procesos:
+        proceso.join()
+    interacciones = [m for mediciones, _ in resultados for m in mediciones]
+    memoria = float(np.mean([memoria for _, memoria in resultados]))
+    return ResultadoNivel(num_sesiones, interacciones, segundos, memoria)
+
+
+def resumen_niveles(resultados: Sequence[ResultadoNivel]) -> pd.DataFrame:
+    """Latencia, rendimiento y memoria por nivel de concurrencia.
+
+    Solo las interacciones sin error cuentan en rendimiento y latencias; un
+    nivel con algún error no es ``Válido``.
+    """
+    filas = []
+    for r in resultados:
+        latencias = np.array([m.segundos for m in r.interacciones if m.error is None]) * 1000
+        errores = sum(m.error is not None for m in r.interacciones)
+        filas.append({
+            "Sesiones": r.sesiones,
+            "Interacciones": len(latencias),
+            "Errores": errores,
+            "Válido": errores == 0,
+            "Duración (s)": r.segundos,
+            "Interacciones/s": len(latencias) / r.segundos,
+            "p50 (ms)": np.percentile(latencias, 50) if len(latencias) else np.nan,
+            "p95 (ms)": np.percentile(latencias, 95) if len(latencias) else np.nan,
+            "p99 (ms)": np.percentile(latencias, 99) if len(latencias) else np.nan,
+            "Memoria por sesión (MB)": r.memoria_por_sesion / 2**20,
+        })
+    return pd.DataFrame(filas)
+
+
+def resumen_pasos(resultado: ResultadoNivel) -> pd.DataFrame:
+    """p50/p95 (ms) por paso del guion en un nivel (sin errores), de la más lenta a la más rápida."""
+    df = pd.DataFrame([(m.paso, m.segundos * 1000) for m in resultado.interacciones if m.error is None],
+                      columns=["Paso", "ms"])
+    tabla = df.groupby("Paso", sort=False)["ms"].agg(
+        Muestras="size", p50=lambda x: np.percentile(x, 50), p95=lambda x: np.percentile(x, 95)
+    )
+    return tabla.rename(columns={"p50": "p50 (ms)", "p95": "p95 (ms)"}).sort_values("p95 (ms)", ascending=False)
+
+
+def saturacion(tabla: pd.DataFrame, umbral: float = UMBRAL_SATURACION) -> Optional[int]:
+    """Último nivel válido en el que el rendimiento creció más de ``umbral`` respecto del anterior.
+
+    Solo se comparan los niveles sin errores. ``None`` si el rendimiento
+    siguió creciendo en todos ellos.
+    """
+    validos = tabla[tabla["Válido"]]
+    rendimiento = validos["Interacciones/s"].to_numpy()
+    for i in range(1, len(rendimiento)):
+        if rendimiento[i] < rendimiento[i - 1] * (1 + umbral):
+            return int(validos["Sesiones"].iloc[i - 1])
+    return None
+
+
+def main(argumentos: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Simula sesiones concurrentes de app.py con AppTest.")
+    parser.add_argument("--sesiones", type=int, nargs="+", default=list(NIVELES),
+                        help="Niveles de concurrencia a medir")
+    parser.add_argument("--rondas", type=int, default=RONDAS, help="Veces que cada sesión recorre el guion")
+    parser.add_argument("--semilla", type=int, default=2024)
+    parser.add_argument("--app", default=APP)
+    parser.add_argument("--tiempo-limite", type=float, default=TIEMPO_LIMITE,
+                        help="Segundos máximos por reejecución")
+    parser.add_argument("--sin-calentar", action="store_true",
+                        help="Mide desde cachés vacías (cada sesión paga la carga en frío)")
+    parser.add_argument("--salida", help="CSV con todas las interacciones medidas")
+    parser.add_argument("--metricas", help="Carpeta donde cada sesión exporta su instrumentación por sección "
+                                           "y etapa (una subcarpeta por nivel y sesión)")
+    args = parser.parse_args(argumentos)
+
+    # El registro de metas de las sesiones simuladas no toca el de producción; los
+    # procesos de las sesiones heredan la variable de entorno
+    carpeta_temporal = tempfile.TemporaryDirectory()
+    os.environ["METAS_DB"] = os.path.join(carpeta_temporal.name, "metas.sqlite")
+
+    resultados = []
+    for nivel in sorted(set(args.sesiones)):
+        print(f"· {nivel} sesiones", file=sys.stderr, flush=True)
+        resultados.append(ejecutar_nivel(nivel, args.rondas, args.semilla, args.app, args.tiempo_limite,
+                                         not args.sin_calentar, args.metricas))
+
+    tabla = resumen_niveles(resultados)
+    with pd.option_context("display.width", 200, "display.float_format", "{:,.1f}".format):
+        print(tabla.to_string(index=False))
+        print(f"\nLatencia por paso con {resultados[-1].sesiones} sesiones:")
+        print(resumen_pasos(resultados[-1]).to_string())
+    invalidos = tabla.loc[~tabla["Válido"], "Sesiones"].tolist()
+    if invalidos:
+        print(f"\nNiveles no válidos (con errores), fuera del cálculo de saturación: {invalidos}")
+    nivel_saturacion = saturacion(tabla)
+    if not tabla["Válido"].any():
+        print("\nNingún nivel terminó sin errores: no se puede estimar la saturación")
+    elif nivel_saturacion is None:
+        print(f"\nEl rendimiento siguió creciendo hasta {tabla.loc[tabla['Válido'], 'Sesiones'].iloc[-1]} sesiones")
+    else:
+        print(f"\nSaturación: el rendimiento deja de crecer después de {nivel_saturacion} "
+              f"{'sesión' if nivel_saturacion == 1 else 'sesiones'} "
+              f"({tabla.loc[tabla['Sesiones'] == nivel_saturacion, 'Interacciones/s'].iloc[0]:.1f} interacciones/s)")
+
+    errores = [m for r in resultados for m in r.interacciones if m.error]
+    for m in errores[:5]:
+        print(f"Error en sesión {m.sesion} ({m.nivel} sesiones), paso {m.paso}: {m.error}", file=sys.stderr)
+    if args.salida:
+        pd.DataFrame([vars(m) for r in resultados for m in r.interacciones]).to_csv(args.salida, index=False)
+    carpeta_temporal.cleanup()
+    return 1 if errores else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+Motor de cálculo del simulador.
+
+Cada módulo expone los cálculos de una sección de ``app.py`` como funciones
+puras (sin llamadas a Streamlit), de modo que puedan cachearse, ejecutarse en
+lote o invocarse desde procesos programados.
+"""
+
+from motor.presupuesto import (
+    ESCENARIOS,
+    proyectar_escenarios,
+    proyectar_matriz,
+    rejilla_escenarios,
+)
+from motor.montecarlo import Distribucion, simular_presupuesto, simular_reforma
+from motor.reformas import (
+    CONFIANZA,
+    IMPACTO_BASE,
+    REFORMAS,
+    ajustar_confianza,
+    ajustar_impacto,
+    impactos_actualizados,
+    escenarios_reforma,
+)
+from motor.microsimulacion import (
+    REGLAS,
+    Poblacion,
+    componer_reglas,
+    impactos_microsimulacion,
+    registrar_regla,
+    simular_reformas,
+)
+from motor.sensibilidad import SUPUESTOS, barrido, elasticidades, tornado
+from motor.optimizacion import (
+    Combinacion,
+    TablaInteracciones,
+    enumerar_combinaciones,
+    frente_pareto,
+    mejor_combinacion,
+    tabla_interacciones,
+)
+from motor.cronograma import (
+    CURVAS,
+    DURACION_RAMPA,
+    FASES,
+    INICIO_RECAUDACION,
+    FlujosReforma,
+    flujos_reformas,
+    hitos_fases,
+)
+from motor.carga import (
+    MEDIDAS_DETECCION,
+    SeriesAgregadas,
+    cargar_series,
+    hash_contenido,
+)
+from motor.datos import GENERADORES, generar_datos, generar_deltas_avance, nueva_semilla
+from motor.avances import AlmacenAvances, catalogo_unidades
+from motor.cubo import Cubo
+from motor.compartido import AlmacenCompartido, congelar, tamaño_bytes
+from motor.instrumentacion import INSTRUMENTACION, Instrumentacion, etapa, medir
+from motor.registro_metas import RegistroMetas
+from motor.asignacion import AsignacionMetas, asignar_metas
+from motor.informes import ResumenInformes, empaquetar, formatos_disponibles, generar_informes
+from motor.detectores import (
+    DETECTORES,
+    ResultadoDeteccion,
+    comparar_detectores,
+    detectar,
+    registrar_detector,
+)
+from motor.estudios import (
+    MatrizCorrelaciones,
+    clasificar_correlacion,
+    correlacion_sectores,
+    correlaciones_bootstrap,
+)
+from motor.reportes import calcular_avances
+from motor.flujo import DetectorEnLinea
+from motor.metas import (
+    TIPOS_META,
+    TRIMESTRES,
+    ResultadoCumplimiento,
+    calcular_meta,
+    metas_unidades,
+    simular_cumplimiento,
+    trimestres_en_riesgo,
+)
+from motor.graficas import (
+    CacheFiguras,
+    figura_caja,
+    figura_cronograma,
+    figura_deteccion,
+    figura_escenarios,
+    figura_acumulado,
+    figura_histograma,
+    figura_medidores,
+    figura_tornado,
+    huella_datos,
+    lttb,
+    minmax,
+    reducir_serie,
+)
+from motor.anomalias import (
+    METODOS,
+    PARAMETROS_SERIE,
+    ResultadoLote,
+    apilar_series,
+    calcular_limites,
+    detectar_lote,
+    detectar_anomalias,
+    recomendacion,
+    reporte_anomalias,
+)
+
+__all__ = [
+    "ESCENARIOS",
+    "proyectar_escenarios",
+    "proyectar_matriz",
+    "rejilla_escenarios",
+    "Distribucion",
+    "simular_presupuesto",
+    "simular_reforma",
+    "REFORMAS",
+    "IMPACTO_BASE",
+    "CONFIANZA",
+    "ajustar_impacto",
+    "ajustar_confianza",
+    "impactos_actualizados",
+    "escenarios_reforma",
+    "Poblacion",
+    "REGLAS",
+    "registrar_regla",
+    "componer_reglas",
+    "simular_reformas",
+    "impactos_microsimulacion",
+    "SUPUESTOS",
+    "elasticidades",
+    "barrido",
+    "tornado",
+    "TablaInteracciones",
+    "Combinacion",
+    "tabla_interacciones",
+    "enumerar_combinaciones",
+    "frente_pareto",
+    "mejor_combinacion",
+    "FASES",
+    "CURVAS",
+    "INICIO_RECAUDACION",
+    "DURACION_RAMPA",
+    "FlujosReforma",
+    "flujos_reformas",
+    "hitos_fases",
+    "MEDIDAS_DETECCION",
+    "SeriesAgregadas",
+    "cargar_series",
+    "hash_contenido",
+    "GENERADORES",
+    "generar_datos",
+    "nueva_semilla",
+    "generar_deltas_avance",
+    "AlmacenAvances",
+    "catalogo_unidades",
+    "Cubo",
+    "AlmacenCompartido",
+    "congelar",
+    "tamaño_bytes",
+    "INSTRUMENTACION",
+    "Instrumentacion",
+    "etapa",
+    "medir",
+    "ResumenInformes",
+    "generar_informes",
+    "empaquetar",
+    "formatos_disponibles",
+    "DETECTORES",
+    "ResultadoDeteccion",
+    "comparar_detectores",
+    "detectar",
+    "registrar_detector",
+    "correlacion_sectores",
+    "clasificar_correlacion",
+    "MatrizCorrelaciones",
+    "correlaciones_bootstrap",
+    "DetectorEnLinea",
+    "calcular_avances",
+    "TIPOS_META",
+    "calcular_meta",
+    "trimestres_en_riesgo",
+    "TRIMESTRES",
+    "ResultadoCumplimiento",
+    "simular_cumplimiento",
+    "metas_unidades",
+    "RegistroMetas",
+    "AsignacionMetas",
+    "asignar_metas",
+    "CacheFiguras",
+    "huella_datos",
+    "lttb",
+    "minmax",
+    "reducir_serie",
+    "figura_deteccion",
+    "figura_histograma",
+    "figura_caja",
+    "figura_escenarios",
+    "figura_cronograma",
+    "figura_acumulado",
+    "figura_tornado",
+    "figura_medidores",
+    "METODOS",
+    "PARAMETROS_SERIE",
+    "ResultadoLote",
+    "apilar_series",
+    "detectar_lote",
+    "calcular_limites",
+    "detectar_anomalias",
+    "reporte_anomalias",
+    "recomendacion",
+]
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""
+Cálculos de la sección Detección Anomalías: límites, detección y reporte.
+
+Además del cálculo para una sola serie, ``detectar_lote`` procesa miles de
+series apiladas en una matriz serie × día y calcula los límites de los tres
+métodos en una sola pasada vectorizada por bloque de filas.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from motor.instrumentacion import etapa
+
+METODOS: List[str] = ["IQR (Recomendado)", "Desviación Estándar", "Percentiles"]
+
+# Bit que identifica a cada método en ``ResultadoLote.metodos``
+BITS_METODO: Dict[str, int] = {metodo: 1 << i for i, metodo in enumerate(METODOS)}
+
+FILAS_POR_BLOQUE: int = 4096
+
+# Parámetros de las series sintéticas por tipo de datos
+PARAMETROS_SERIE: Dict[str, Dict[str, float]] = {
+    "Afiliaciones Diarias": {
+        "base_value": 5000, "std_dev": 500,
+        "anomalia_alta": 15000, "anomalia_baja": 800,
+    },
+    "Recaudación Diaria": {
+        "base_value": 1000000, "std_dev": 100000,
+        "anomalia_alta": 3000000, "anomalia_baja": 200000,
+    },
+    "Tasa de Crecimiento": {
+        "base_value": 2.0, "std_dev": 0.5,
+        "anomalia_alta": 8.0, "anomalia_baja": -3.0,
+    },
+    "Eficiencia Operativa": {
+        "base_value": 85.0, "std_dev": 5.0,
+        "anomalia_alta": 98.0, "anomalia_baja": 45.0,
+    },
+}
+
+
+def calcular_limites(
+    datos: np.ndarray,
+    metodo: str,
+    sensibilidad: Optional[float] = None,
+    percentil_inf: float = 5,
+    percentil_sup: float = 95,
+) -> Tuple[float, float]:
+    """Calcula ``(limite_inferior, limite_superior)`` según el método elegido.
+
+    ``sensibilidad`` es el número de desviaciones estándar o el multiplicador
+    IQR; los percentiles solo se usan con el método ``"Percentiles"``.
+    """
+    if metodo == "Desviación Estándar":
+        media = np.mean(datos)
+        std = np.std(datos)
+        return float(media - sensibilidad * std), float(media + sensibilidad * std)
+    if metodo == "Percentiles":
+        with etapa("percentiles"):
+            limite_inferior, limite_superior = np.percentile(datos, [percentil_inf, percentil_sup])
+        return float(limite_inferior), float(limite_superior)
+    # IQR
+    with etapa("percentiles"):
+        q1, q3 = np.percentile(datos, [25, 75])
+    iqr = q3 - q1
+    return float(q1 - sensibilidad * iqr), float(q3 + sensibilidad * iqr)
+
+
+def detectar_anomalias(
+    df_deteccion: pd.DataFrame, limite_inferior: float, limite_superior: float
+) -> pd.DataFrame:
+    """Filas de ``df_deteccion`` cuyo ``Valor`` queda fuera de los límites."""
+    valores = df_deteccion["Valor"]
+    return df_deteccion[(valores > limite_superior) | (valores < limite_inferior)]
+
+
+def reporte_anomalias(
+    anomalias: pd.DataFrame, base_value: float, limite_superior
+) -> pd.DataFrame:
+    """Agrega desviación, tipo y severidad a cada anomalía detectada.
+
+    ``limite_superior`` puede ser un escalar o un arreglo alineado con las
+    anomalías; donde vale ``NaN`` el tipo se decide contra ``base_value``.
+    """
+    reporte = anomalias.copy()
+    reporte["Desviación"] = reporte["Valor"] - base_value
+    reporte["Desviación %"] = ((reporte["Valor"] - base_value) / base_value * 100).round(1)
+    superior = np.broadcast_to(np.asarray(limite_superior, dtype=float), len(reporte))
+    referencia = np.where(np.isnan(superior), base_value, superior)
+    reporte["Tipo"] = np.where(reporte["Valor"] > referencia, "Alta", "Baja")
+    desviacion_abs = reporte["Desviación %"].abs()
+    reporte["Severidad"] = np.select(
+        [desviacion_abs > 100, desviacion_abs > 50], ["Alta", "Media"], default="Baja"
+    )
+    return reporte
+
+
+def recomendacion(num_anomalias: int) -> str:
+    """Nivel de recomendación: ``urgente``, ``reforzado``, ``puntual`` o ``normal``."""
+    if num_anomalias > 4:
+        return "urgente"
+    if num_anomalias > 1:
+        return "reforzado"
+    if num_anomalias == 1:
+        return "puntual"
+    return "normal"
+
+
+@dataclass
+class ResultadoLote:
+    """Resultado disperso de ``detectar_lote``.
+
+    ``limites`` asocia a cada método un par de arreglos ``(inferior, superior)``
+    con un valor por serie. Las anomalías se guardan como pares
+    ``(series[i], dias[i])`` y ``metodos[i]`` es la máscara de bits
+    (``BITS_METODO``) de los métodos que marcaron ese punto.
+    """
+
+    limites: Dict[str, Tuple[np.ndarray, np.ndarray]]
+    series: np.ndarray
+    dias: np.ndarray
+    metodos: np.ndarray
+
+    def pares(self, metodo: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Pares ``(series, dias)`` marcados por ``metodo``."""
+        seleccion = (self.metodos & BITS_METODO[metodo]) != 0
+        return self.series[seleccion], self.dias[seleccion]
+
+    def conteo_por_serie(self, metodo: str, num_series: int) -> np.ndarray:
+        """Número de anomalías por serie para ``metodo``."""
+        series, _ = self.pares(metodo)
+        return np.bincount(series, minlength=num_series)
+
+
+def apilar_series(series: Sequence[np.ndarray], dtype=np.float32) -> np.ndarray:
+    """Apila series de distinta longitud en una matriz serie × día rellena con ``NaN``."""
+    longitudes = np.fromiter((len(s) for s in series), dtype=np.int64, count=len(series))
+    matriz = np.full((len(series), longitudes.max(initial=0)), np.nan, dtype=dtype)
+    columnas = np.arange(matriz.shape[1])
+    matriz[columnas < longitudes[:, None]] = np.concatenate(series) if len(series) else []
+    return matriz
+
+
+def limites_por_metodo(
+    bloque: np.ndarray,
+    sensibilidad_iqr: float,
+    sensibilidad_std: float,
+    percentil_inf: float,
+    percentil_sup: float,
+) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """Límites de los tres métodos para cada fila del bloque en una sola pasada."""
+    con_nan = np.isnan(bloque).any()
+    cuantil = np.nanquantile if con_nan else np.quantile
+    media = np.nanmean if con_nan else np.mean
+    desviacion = np.nanstd if con_nan else np.std
+
+    # Una sola llamada de cuantiles para IQR y percentiles
+    with etapa("percentiles"):
+        p_inf, q1, q3, p_sup = cuantil(
+            bloque, np.array([percentil_inf, 25, 75, percentil_sup]) / 100, axis=1
+        )
+    iqr = q3 - q1
+    mu = media(bloque, axis=1)
+    sigma = desviacion(bloque, axis=1)
+    return {
+        "IQR (Recomendado)": (q1 - sensibilidad_iqr * iqr, q3 + sensibilidad_iqr * iqr),
+        "Desviación Estándar": (mu - sensibilidad_std * sigma, mu + sensibilidad_std * sigma),
+        "Percentiles": (p_inf, p_sup),
+    }
+
+
+def _detectar_particion(args) -> ResultadoLote:
+    matriz, desplazamiento, parametros, filas_por_bloque = args
+    limites = {metodo: ([], []) for metodo in METODOS}
+    series, dias, metodos = [], [], []
+    for inicio in range(0, matriz.shape[0], filas_por_bloque):
+        bloque = matriz[inicio:inicio + filas_por_bloque]
+        limites_bloque = limites_por_metodo(bloque, **parametros)
+        codigos = np.zeros(bloque.shape, dtype=np.uint8)
+        for metodo, (inferior, superior) in limites_bloque.items():
+            fuera = (bloque < inferior[:, None]) | (bloque > superior[:, None])
+            codigos[fuera] |= BITS_METODO[metodo]
+            limites[metodo][0].append(inferior)
+            limites[metodo][1].append(superior)
+        filas, columnas = np.nonzero(codigos)
+        series.append((filas + inicio + desplazamiento).astype(np.int32))
+        dias.append(columnas.astype(np.int32))
+        metodos.append(codigos[filas, columnas])
+    return ResultadoLote(
+        limites={m: (np.concatenate(i), np.concatenate(s)) for m, (i, s) in limites.items()},
+        series=np.concatenate(series),
+        dias=np.concatenate(dias),
+        metodos=np.concatenate(metodos),
+    )
+
+
+def _unir_resultados(partes: Sequence[ResultadoLote]) -> ResultadoLote:
+    return ResultadoLote(
+        limites={
+            metodo: tuple(np.concatenate([p.limites[metodo][k] for p in partes]) for k in (0, 1))
+            for metodo in METODOS
+        },
+        series=np.concatenate([p.series for p in partes]),
+        dias=np.concatenate([p.dias for p in partes]),
+        metodos=np.concatenate([p.metodos for p in partes]),
+    )
+
+
+def detectar_lote(
+    matriz: np.ndarray,
+    sensibilidad_iqr: float = 1.5,
+    sensibilidad_std: float = 3.0,
+    percentil_inf: float = 5,
+    percentil_sup: float = 95,
+    procesos: Optional[int] = None,
+    filas_por_bloque: int = FILAS_POR_BLOQUE,
+) -> ResultadoLote:
+    """Detecta anomalías en cada fila de una matriz serie × día con los tres métodos.
+
+    Las series más cortas se rellenan con ``NaN`` (ver ``apilar_series``). Las
+    filas se procesan en bloques para acotar la memoria temporal y, con
+    ``procesos`` > 1, las particiones se reparten en un ``ProcessPoolExecutor``.
+    """
+    matriz = np.asarray(matriz)
+    parametros = dict(
+        sensibilidad_iqr=sensibilidad_iqr, sensibilidad_std=sensibilidad_std,
+        percentil_inf=percentil_inf, percentil_sup=percentil_sup,
+    )
+    if not procesos or procesos <= 1:
+        return _detectar_particion((matriz, 0, parametros, filas_por_bloque))
+
+    cortes = np.linspace(0, matriz.shape[0], procesos + 1, dtype=int)
+    tareas = [
+        (matriz[inicio:fin], inicio, parametros, filas_por_bloque)
+        for inicio, fin in zip(cortes[:-1], cortes[1:]) if fin > inicio
+    ]
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        return _unir_resultados(list(pool.map(_detectar_particion, tareas)))
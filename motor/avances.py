@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+Almacén columnar de metas y avances con agregados jerárquicos.
+
+Los valores se guardan por subdelegación en una matriz numérica (unidad ×
+medida) y se mantienen sus sumas por delegación, estado y a nivel nacional.
+Los avances diarios llegan como incrementos por subdelegación y se propagan
+hacia arriba con ``np.add.at`` siguiendo los índices del padre, sin volver a
+agregar toda la tabla. Las tablas que se devuelven son numéricas; el formato
+se aplica solo al mostrarlas.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from motor.reportes import calcular_avances
+
+ESTADOS: List[str] = [
+    'Aguascalientes', 'Baja California', 'Baja California Sur', 'Campeche', 'Chiapas',
+    'Chihuahua', 'Ciudad de México', 'Coahuila', 'Colima', 'Durango', 'Guanajuato',
+    'Guerrero', 'Hidalgo', 'Jalisco', 'México', 'Michoacán', 'Morelos', 'Nayarit',
+    'Nuevo León', 'Oaxaca', 'Puebla', 'Querétaro', 'Quintana Roo', 'San Luis Potosí',
+    'Sinaloa', 'Sonora', 'Tabasco', 'Tamaulipas', 'Tlaxcala', 'Veracruz', 'Yucatán', 'Zacatecas',
+]
+
+# Estados con más de una delegación; el resto tiene una delegación con su nombre
+DELEGACIONES_DIVIDIDAS: Dict[str, List[str]] = {
+    'Ciudad de México': ['CDMX Norte', 'CDMX Sur'],
+    'México': ['México Oriente', 'México Poniente'],
+    'Veracruz': ['Veracruz Norte', 'Veracruz Sur'],
+}
+
+# Jerarquía de la más fina a la más agregada
+NIVELES: List[str] = ['Subdelegación', 'Delegación', 'Estado', 'Nacional']
+MEDIDAS: List[str] = ['meta_afiliacion', 'avance_afiliacion', 'meta_recaudacion', 'avance_recaudacion']
+
+
+def catalogo_unidades() -> pd.DataFrame:
+    """Estado, delegación y subdelegación de cada unidad (35 delegaciones).
+
+    El número de subdelegaciones por delegación es fijo (semilla 0) para que
+    el catálogo no cambie entre ejecuciones.
+    """
+    rng = np.random.default_rng(0)
+    filas = []
+    for estado in ESTADOS:
+        for delegacion in DELEGACIONES_DIVIDIDAS.get(estado, [estado]):
+            for k in range(1, rng.integers(4, 13) + 1):
+                filas.append((estado, delegacion, f"{delegacion} {k:02d}"))
+    return pd.DataFrame(filas, columns=['Estado', 'Delegación', 'Subdelegación'])
+
+
+@dataclass
+class AlmacenAvances:
+    """Medidas por unidad de cada nivel con índices al nivel superior.
+
+    ``valores[nivel]`` es una matriz ``(unidades, len(MEDIDAS))`` y
+    ``padres[nivel]`` el índice de cada unidad en el nivel siguiente.
+    """
+
+    nombres: Dict[str, np.ndarray]
+    padres: Dict[str, np.ndarray]
+    valores: Dict[str, np.ndarray]
+    dias_aplicados: int = 0
+
+    @classmethod
+    def desde_registros(
+        cls,
+        estados: Sequence[str],
+        meta_afiliacion: Sequence[float],
+        avance_afiliacion: Sequence[float],
+        meta_recaudacion: Sequence[float],
+        avance_recaudacion: Sequence[float],
+        delegaciones: Optional[Sequence[str]] = None,
+        subdelegaciones: Optional[Sequence[str]] = None,
+    ) -> "AlmacenAvances":
+        """Construye el almacén con una fila por subdelegación.
+
+        Sin ``delegaciones``/``subdelegaciones`` cada estado es su propia
+        delegación y subdelegación (por ejemplo, datos reales por estado).
+        """
+        estados = np.asarray(estados)
+        delegaciones = estados if delegaciones is None else np.asarray(delegaciones)
+        subdelegaciones = delegaciones if subdelegaciones is None else np.asarray(subdelegaciones)
+
+        codigo_deleg, nombres_deleg = pd.factorize(delegaciones)
+        codigo_estado, nombres_estado = pd.factorize(estados)
+        # Estado de cada delegación: el de su primera subdelegación
+        primera = np.unique(codigo_deleg, return_index=True)[1]
+
+        base = np.column_stack([
+            meta_afiliacion, avance_afiliacion, meta_recaudacion, avance_recaudacion
+        ]).astype(float)
+        almacen = cls(
+            nombres={
+                'Subdelegación': np.asarray(subdelegaciones),
+                'Delegación': np.asarray(nombres_deleg),
+                'Estado': np.asarray(nombres_estado),
+                'Nacional': np.array(['Nacional']),
+            },
+            padres={
+                'Subdelegación': codigo_deleg,
+                'Delegación': codigo_estado[primera],
+                'Estado': np.zeros(len(nombres_estado), dtype=np.intp),
+            },
+            valores={'Subdelegación': base},
+        )
+        almacen.reagregar()
+        return almacen
+
+    def reagregar(self) -> None:
+        """Recalcula todos los agregados desde las subdelegaciones."""
+        for inferior, superior in zip(NIVELES[:-1], NIVELES[1:]):
+            suma = np.zeros((len(self.nombres[superior]), len(MEDIDAS)))
+            np.add.at(suma, self.padres[inferior], self.valores[inferior])
+            self.valores[superior] = suma
+
+    def aplicar_deltas(self, subdelegaciones: np.ndarray, deltas: np.ndarray) -> None:
+        """Suma ``deltas`` ``(k, len(MEDIDAS))`` a las subdelegaciones indicadas y a sus ancestros.
+
+        El costo es proporcional a ``k`` por nivel, no al tamaño del almacén;
+        los índices repetidos se acumulan.
+        """
+        indices = np.asarray(subdelegaciones, dtype=np.intp)
+        deltas = np.asarray(deltas, dtype=float)
+        for nivel in NIVELES:
+            np.add.at(self.valores[nivel], indices, deltas)
+            if nivel in self.padres:
+                indices = self.padres[nivel][indices]
+        self.dias_aplicados += 1
+
+    def ancestros(self, nivel: str) -> Dict[str, np.ndarray]:
+        """Nombre del ancestro de cada unidad de ``nivel`` en los niveles superiores (sin nacional)."""
+        indices = np.arange(len(self.nombres[nivel]))
+        resultado = {}
+        for superior in NIVELES[NIVELES.index(nivel) + 1:-1]:
+            indices = self.padres[NIVELES[NIVELES.index(superior) - 1]][indices]
+            resultado[superior] = self.nombres[superior][indices]
+        return resultado
+
+    def tabla(self, nivel: str = 'Estado', filtro: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+        """Tabla numérica de avances de ``nivel``, con columnas de sus ancestros.
+
+        ``filtro`` restringe por ancestro, p. ej. ``{'Estado': 'Jalisco'}``.
+        """
+        valores = self.valores[nivel]
+        df = calcular_avances(self.nombres[nivel], *valores.T, columna=nivel)
+        for posicion, (superior, nombres) in enumerate(reversed(self.ancestros(nivel).items())):
+            df.insert(posicion, superior, nombres)
+        for superior, nombre in (filtro or {}).items():
+            df = df[df[superior] == nombre]
+        return df.reset_index(drop=True)
+
+    def totales(self) -> pd.Series:
+        """Fila nacional de ``tabla('Nacional')``."""
+        return self.tabla('Nacional').iloc[0]
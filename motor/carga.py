@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+"""
+Carga de series reales de afiliación y recaudación.
+
+Los archivos se leen por bloques (CSV y Parquet) o mediante mapeo en memoria
+(Arrow IPC/Feather) y cada bloque se reduce de inmediato a sumas por
+``(fecha, estado, sector)``. Así la memoria depende del tamaño de bloque y del
+número de combinaciones fecha/estado/sector, no del número de filas (por
+ejemplo, de registros patronales). Las tablas que usan las secciones
+(``df_sectores``, datos de ``df_reportes`` y ``df_deteccion``) se derivan de ese
+agregado.
+
+Columnas esperadas: ``fecha``, ``estado``, ``sector``, ``afiliados`` y
+``recaudacion``; opcionalmente ``informales``, ``meta_afiliacion`` y
+``meta_recaudacion``. Parquet y Arrow requieren ``pyarrow``.
+"""
+
+import hashlib
+import io
+import os
+from dataclasses import dataclass
+from typing import BinaryIO, Dict, Iterator, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from motor.cubo import Cubo
+
+Fuente = Union[str, os.PathLike, bytes, BinaryIO]
+
+DIMENSIONES: List[str] = ["fecha", "estado", "sector"]
+MEDIDAS: List[str] = ["afiliados", "recaudacion"]
+MEDIDAS_OPCIONALES: List[str] = ["informales", "meta_afiliacion", "meta_recaudacion"]
+CATEGORICAS: List[str] = ["estado", "sector"]
+
+TAMAÑO_BLOQUE: int = 500000
+TAMAÑO_LECTURA_HASH: int = 1 << 20
+
+# Medida de la serie diaria según el tipo de datos de Detección Anomalías
+MEDIDAS_DETECCION: Dict[str, str] = {
+    "Afiliaciones Diarias": "afiliados",
+    "Recaudación Diaria": "recaudacion",
+}
+
+
+def hash_contenido(fuente: Fuente) -> str:
+    """Huella SHA-256 del contenido, leída en bloques para no duplicar el archivo."""
+    huella = hashlib.sha256()
+    if isinstance(fuente, (bytes, bytearray, memoryview)):
+        huella.update(fuente)
+        return huella.hexdigest()
+    if isinstance(fuente, (str, os.PathLike)):
+        with open(fuente, "rb") as archivo:
+            for bloque in iter(lambda: archivo.read(TAMAÑO_LECTURA_HASH), b""):
+                huella.update(bloque)
+        return huella.hexdigest()
+    posicion = fuente.tell()
+    for bloque in iter(lambda: fuente.read(TAMAÑO_LECTURA_HASH), b""):
+        huella.update(bloque)
+    fuente.seek(posicion)
+    return huella.hexdigest()
+
+
+def detectar_formato(nombre: str) -> str:
+    """Formato (``csv``, ``parquet`` o ``arrow``) a partir de la extensión."""
+    extension = os.path.splitext(nombre)[1].lower()
+    if extension in (".parquet", ".pq"):
+        return "parquet"
+    if extension in (".arrow", ".feather", ".ipc"):
+        return "arrow"
+    return "csv"
+
+
+def reducir_tipos(bloque: pd.DataFrame) -> pd.DataFrame:
+    """Convierte estado/sector a categóricos, las medidas a float32 si no pierden
+    precisión y la fecha a ``datetime64``."""
+    for columna in CATEGORICAS:
+        if columna in bloque and not isinstance(bloque[columna].dtype, pd.CategoricalDtype):
+            bloque[columna] = bloque[columna].astype("category")
+    for columna in MEDIDAS + MEDIDAS_OPCIONALES:
+        if columna in bloque:
+            bloque[columna] = pd.to_numeric(bloque[columna], downcast="float")
+    if "fecha" in bloque and bloque["fecha"].dtype.kind != "M":
+        # Solo se interpretan las fechas distintas y se expanden por código de categoría;
+        # las faltantes tienen código -1 y deben quedar como NaT, no como la última fecha
+        fechas = bloque["fecha"].astype("category")
+        bloque["fecha"] = pd.to_datetime(fechas.cat.categories).take(
+            fechas.cat.codes.to_numpy(), allow_fill=True, fill_value=pd.NaT
+        ).to_numpy()
+    return bloque
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as error:
+        raise ImportError("Se requiere pyarrow para leer archivos Parquet o Arrow") from error
+    return pyarrow
+
+
+def _como_archivo(fuente: Fuente):
+    if isinstance(fuente, (bytes, bytearray, memoryview)):
+        return io.BytesIO(fuente)
+    return fuente
+
+
+def leer_bloques(
+    fuente: Fuente, formato: str = "csv", tamaño_bloque: int = TAMAÑO_BLOQUE
+) -> Iterator[pd.DataFrame]:
+    """Itera sobre bloques de a lo más ``tamaño_bloque`` filas con tipos reducidos."""
+    fuente = _como_archivo(fuente)
+    if formato == "csv":
+        lector = pd.read_csv(
+            fuente,
+            chunksize=tamaño_bloque,
+            usecols=lambda columna: columna in DIMENSIONES + MEDIDAS + MEDIDAS_OPCIONALES,
+            dtype={columna: "category" for columna in CATEGORICAS + ["fecha"]},
+        )
+        for bloque in lector:
+            yield reducir_tipos(bloque)
+    elif formato == "parquet":
+        pa = _pyarrow()
+        archivo = pa.parquet.ParquetFile(fuente)
+        columnas = [c for c in archivo.schema_arrow.names if c in DIMENSIONES + MEDIDAS + MEDIDAS_OPCIONALES]
+        for lote in archivo.iter_batches(batch_size=tamaño_bloque, columns=columnas):
+            yield reducir_tipos(lote.to_pandas(strings_to_categorical=True))
+    elif formato == "arrow":
+        pa = _pyarrow()
+        if isinstance(fuente, (str, os.PathLike)):
+            origen = pa.memory_map(os.fspath(fuente), "r")
+        else:
+            origen = pa.BufferReader(fuente.read())
+        lector = pa.ipc.open_file(origen)
+        for i in range(lector.num_record_batches):
+            lote = lector.get_batch(i)
+            for inicio in range(0, lote.num_rows, tamaño_bloque):
+                yield reducir_tipos(
+                    lote.slice(inicio, tamaño_bloque).to_pandas(strings_to_categorical=True)
+                )
+    else:
+        raise ValueError(f"Formato no soportado: {formato}")
+
+
+@dataclass
+class SeriesAgregadas:
+    """Sumas diarias por estado y sector con las tablas que consume cada sección."""
+
+    agregado: pd.DataFrame
+    filas_leidas: int
+    huella: str = ""
+    # Filas leídas sin fecha: no se pueden ubicar en la serie y quedan fuera del agregado
+    filas_sin_fecha: int = 0
+
+    @property
+    def medidas(self) -> List[str]:
+        return [c for c in MEDIDAS + MEDIDAS_OPCIONALES if c in self.agregado]
+
+    def _fechas_extremas(self):
+        fechas = self.agregado["fecha"]
+        fin = fechas.max()
+        inicio = max(fechas.min(), fin - pd.Timedelta(days=365))
+        return inicio, fin
+
+    def _corte(self, fecha, por: str) -> pd.DataFrame:
+        """Suma de las medidas en ``fecha`` (la más cercana anterior) por dimensión."""
+        fechas = self.agregado["fecha"]
+        fecha = fechas[fechas <= fecha].max()
+        corte = self.agregado[fechas == fecha]
+        return corte.groupby(por, observed=True)[self.medidas].sum()
+
+    def sectores(self) -> pd.DataFrame:
+        """Equivalente a ``df_sectores``: afiliados, crecimiento anualizado e informalidad."""
+        inicio, fin = self._fechas_extremas()
+        final = self._corte(fin, "sector")
+        inicial = self._corte(inicio, "sector").reindex(final.index)
+        dias = max((fin - inicio).days, 1)
+        crecimiento = ((final["afiliados"] / inicial["afiliados"]) ** (365 / dias) - 1) * 100
+        if "informales" in final:
+            informalidad = final["informales"] / (final["afiliados"] + final["informales"]) * 100
+        else:
+            informalidad = pd.Series(np.nan, index=final.index)
+        return pd.DataFrame({
+            "Sector": final.index.astype(str),
+            "Afiliados": final["afiliados"].to_numpy(),
+            "Crecimiento Anual (%)": crecimiento.to_numpy(),
+            "Tasa Informalidad (%)": informalidad.to_numpy(),
+        })
+
+    def cubo(self) -> Cubo:
+        """Cubo sector × estado × mes de las medidas del archivo (saldos promediados por mes)."""
+        return Cubo.desde_registros(self.agregado, medidas=self.medidas)
+
+    def indicadores(self) -> pd.DataFrame:
+        """Indicadores por celda estado × sector para las matrices de correlación.
+
+        Incluye los que se pueden derivar de las columnas del archivo:
+        afiliados, crecimiento anualizado, recaudación del último año y por
+        afiliado e informalidad y avance de metas si vienen en el archivo.
+        """
+        inicio, fin = self._fechas_extremas()
+        celdas = ["estado", "sector"]
+        final = self._corte(fin, celdas)
+        inicial = self._corte(inicio, celdas).reindex(final.index)
+        dias = max((fin - inicio).days, 1)
+        del_año = self.agregado[self.agregado["fecha"] > fin - pd.Timedelta(days=365)]
+        recaudado = del_año.groupby(celdas, observed=True)["recaudacion"].sum().reindex(final.index)
+        df = pd.DataFrame({
+            "Afiliados": final["afiliados"],
+            "Crecimiento Anual (%)": ((final["afiliados"] / inicial["afiliados"]) ** (365 / dias) - 1) * 100,
+            "Recaudación Anual (MXN)": recaudado,
+            "Recaudación por Afiliado (MXN)": recaudado / final["afiliados"],
+        })
+        if "informales" in final:
+            df["Tasa Informalidad (%)"] = final["informales"] / (final["afiliados"] + final["informales"]) * 100
+        if "meta_afiliacion" in final:
+            df["Avance Meta Afiliación (%)"] = final["afiliados"] / final["meta_afiliacion"] * 100
+        df = df.reset_index().rename(columns={"estado": "Estado", "sector": "Sector"})
+        df[["Estado", "Sector"]] = df[["Estado", "Sector"]].astype(str)
+        return df[["Sector", "Estado"] + [c for c in df if c not in ("Sector", "Estado")]]
+
+    def reportes(self) -> Dict[str, np.ndarray]:
+        """Metas y avances por estado en el formato de ``generar_reportes`` (sin delegaciones).
+
+        El avance de afiliación es el stock de la última fecha; el de
+        recaudación, lo acumulado en el año de la última fecha. Las metas se
+        toman de la última fecha si el archivo las incluye.
+        """
+        _, fin = self._fechas_extremas()
+        final = self._corte(fin, "estado")
+        del_año = self.agregado[self.agregado["fecha"].dt.year == fin.year]
+        recaudado = del_año.groupby("estado", observed=True)["recaudacion"].sum().reindex(final.index)
+        sin_meta = np.full(len(final), np.nan)
+        return {
+            "estados": final.index.astype(str).to_numpy(),
+            "meta_afiliacion": final["meta_afiliacion"].to_numpy() if "meta_afiliacion" in final else sin_meta,
+            "avance_afiliacion": final["afiliados"].to_numpy(),
+            "meta_recaudacion": final["meta_recaudacion"].to_numpy() if "meta_recaudacion" in final else sin_meta,
+            "avance_recaudacion": recaudado.to_numpy(),
+        }
+
+    def matriz(self, medida: str = "afiliados", por: str = "estado") -> pd.DataFrame:
+        """Series diarias apiladas (una fila por ``estado`` o ``sector``) para ``detectar_lote``."""
+        return self.agregado.pivot_table(
+            index=por, columns="fecha", values=medida, aggfunc="sum", observed=True
+        )
+
+    def deteccion(
+        self,
+        medida: str = "afiliados",
+        num_dias: Optional[int] = None,
+        estado: Optional[str] = None,
+        sector: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """Equivalente a ``df_deteccion``: serie diaria (``Día``, ``Valor``) filtrable."""
+        datos = self.agregado
+        if estado is not None:
+            datos = datos[datos["estado"] == estado]
+        if sector is not None:
+            datos = datos[datos["sector"] == sector]
+        serie = datos.groupby("fecha")[medida].sum().sort_index()
+        if num_dias is not None:
+            serie = serie.iloc[-num_dias:]
+        return pd.DataFrame({
+            "Día": np.arange(1, len(serie) + 1),
+            "Fecha": serie.index,
+            "Valor": serie.to_numpy(dtype=float),
+        })
+
+
+def cargar_series(
+    fuente: Fuente,
+    formato: Optional[str] = None,
+    tamaño_bloque: int = TAMAÑO_BLOQUE,
+    huella: Optional[str] = None,
+) -> SeriesAgregadas:
+    """Lee un archivo por bloques y lo reduce a sumas por fecha, estado y sector.
+
+    Las sumas parciales de cada bloque se combinan al final, de modo que solo
+    un bloque de filas crudas está en memoria a la vez.
+    """
+    if formato is None:
+        nombre = os.fspath(fuente) if isinstance(fuente, (str, os.PathLike)) else getattr(fuente, "name", "")
+        formato = detectar_formato(nombre)
+    if huella is None:
+        huella = hash_contenido(fuente)
+
+    parciales = []
+    filas = sin_fecha = 0
+    for bloque in leer_bloques(fuente, formato, tamaño_bloque):
+        filas += len(bloque)
+        faltantes = bloque["fecha"].isna()
+        if faltantes.any():
+            sin_fecha += int(faltantes.sum())
+            bloque = bloque[~faltantes]
+        medidas = [c for c in MEDIDAS + MEDIDAS_OPCIONALES if c in bloque]
+        # Las medidas pasan a float64 antes de sumar: el bloque puede venir en float32
+        bloque = bloque.astype({c: "float64" for c in medidas})
+        parciales.append(bloque.groupby(DIMENSIONES, observed=True)[medidas].sum())
+
+    if not parciales:
+        raise ValueError("El archivo no contiene filas")
+    agregado = pd.concat(parciales).groupby(level=DIMENSIONES, observed=True).sum().reset_index()
+    agregado = reducir_tipos(agregado)
+    return SeriesAgregadas(agregado=agregado, filas_leidas=filas, huella=huella, filas_sin_fecha=sin_fecha)
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+Almacén de datos de referencia compartido entre sesiones.
+
+Los conjuntos pesados e inmutables (series generadas, archivos cargados,
+tablas de referencia) se guardan una sola vez por proceso y cada sesión
+conserva solo los parámetros con los que se obtienen. Los valores se
+devuelven sin copiar y se congelan al guardarse: los arreglos de NumPy
+quedan de solo lectura y los DataFrames se protegen con el copy-on-write de
+pandas (siempre activo desde pandas 3, la versión mínima de
+``requirements.txt``), así que una sesión no puede modificar lo que ven las
+demás.
+
+El almacén tiene un presupuesto de memoria en bytes con desalojo LRU y
+contadores de aciertos, fallos y desalojos. Es seguro entre hilos y cada
+clave se construye una sola vez aunque varias sesiones la pidan a la vez.
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import fields, is_dataclass
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+import numpy as np
+import pandas as pd
+
+PRESUPUESTO_BYTES: int = 512 * 2**20
+
+
+def tamaño_bytes(valor: Any) -> int:
+    """Memoria aproximada de ``valor`` incluyendo arreglos, DataFrames y contenedores."""
+    if isinstance(valor, np.ndarray):
+        return int(valor.nbytes)
+    if isinstance(valor, pd.DataFrame):
+        return int(valor.memory_usage(index=True, deep=True).sum())
+    if isinstance(valor, (pd.Series, pd.Index)):
+        return int(valor.memory_usage(deep=True))
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(tamaño_bytes(k) + tamaño_bytes(v) for k, v in valor.items())
+    if isinstance(valor, (list, tuple)):
+        return sys.getsizeof(valor) + sum(tamaño_bytes(v) for v in valor)
+    if is_dataclass(valor) and not isinstance(valor, type):
+        return sys.getsizeof(valor) + sum(tamaño_bytes(getattr(valor, f.name)) for f in fields(valor))
+    return sys.getsizeof(valor)
+
+
+def congelar(valor: Any) -> Any:
+    """Marca como de solo lectura los arreglos de ``valor`` (también dentro de dicts y dataclasses)."""
+    if isinstance(valor, np.ndarray):
+        valor.flags.writeable = False
+    elif isinstance(valor, dict):
+        for k, v in valor.items():
+            # Las listas se guardan como tuplas para que tampoco puedan modificarse
+            valor[k] = tuple(v) if isinstance(v, list) else congelar(v)
+    elif is_dataclass(valor) and not isinstance(valor, type):
+        for f in fields(valor):
+            congelar(getattr(valor, f.name))
+    return valor
+
+
+class AlmacenCompartido:
+    """Valores inmutables por clave con presupuesto de memoria y desalojo LRU.
+
+    Los valores devueltos se comparten entre sesiones y no deben modificarse.
+    Un valor más grande que el presupuesto se devuelve sin guardarse.
+    """
+
+    def __init__(self, presupuesto_bytes: int = PRESUPUESTO_BYTES):
+        self.presupuesto_bytes = presupuesto_bytes
+        self._entradas: "OrderedDict[Hashable, Tuple[Any, int]]" = OrderedDict()
+        self._en_construccion: Dict[Hashable, threading.Lock] = {}
+        self._cerrojo = threading.Lock()
+        self.bytes = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+        self.omitidos = 0
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def __contains__(self, clave: Hashable) -> bool:
+        return clave in self._entradas
+
+    def _buscar(self, clave: Hashable) -> Tuple[bool, Any]:
+        """Valor guardado en ``clave`` (lo marca como reciente); llamar con el cerrojo tomado."""
+        entrada = self._entradas.get(clave)
+        if entrada is None:
+            return False, None
+        self.aciertos += 1
+        self._entradas.move_to_end(clave)
+        return True, entrada[0]
+
+    def obtener(self, clave: Hashable, constructor: Callable[[], Any]) -> Any:
+        """Valor de ``clave``; si no está se construye con ``constructor()`` y se guarda."""
+        with self._cerrojo:
+            encontrado, valor = self._buscar(clave)
+            if encontrado:
+                return valor
+            cerrojo_clave = self._en_construccion.setdefault(clave, threading.Lock())
+
+        # Las sesiones que piden la misma clave esperan a la primera en lugar de repetir la construcción
+        with cerrojo_clave:
+            with self._cerrojo:
+                encontrado, valor = self._buscar(clave)
+                if encontrado:
+                    return valor
+                self.fallos += 1
+            try:
+                valor = congelar(constructor())
+                tamaño = tamaño_bytes(valor)
+            except BaseException:
+                with self._cerrojo:
+                    self._en_construccion.pop(clave, None)
+                raise
+            with self._cerrojo:
+                self._en_construccion.pop(clave, None)
+                if tamaño > self.presupuesto_bytes:
+                    self.omitidos += 1
+                    return valor
+                self._entradas[clave] = (valor, tamaño)
+                self.bytes += tamaño
+                while self.bytes > self.presupuesto_bytes:
+                    _, (_, liberados) = self._entradas.popitem(last=False)
+                    self.bytes -= liberados
+                    self.desalojos += 1
+            return valor
+
+    def limpiar(self) -> None:
+        """Descarta los valores guardados; los contadores se conservan."""
+        with self._cerrojo:
+            self._entradas.clear()
+            self.bytes = 0
+
+    def estadisticas(self) -> Dict[str, float]:
+        """Entradas, memoria ocupada y contadores de aciertos, fallos y desalojos."""
+        with self._cerrojo:
+            consultas = self.aciertos + self.fallos
+            return {
+                "entradas": len(self._entradas),
+                "bytes": self.bytes,
+                "presupuesto_bytes": self.presupuesto_bytes,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "desalojos": self.desalojos,
+                "omitidos": self.omitidos,
+                "tasa_aciertos": self.aciertos / consultas if consultas else float("nan"),
+            }
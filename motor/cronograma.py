@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Cronograma de implementación y flujo de recaudación por fases.
+
+La recaudación de cada reforma empieza al aprobarse y crece con una curva de
+arranque hasta el efecto pleno. El flujo mensual de todas las reformas y
+escenarios se calcula en un solo tensor mes × reforma × escenario:
+
+    flujo[m, r, s] = recaudación_base / 12 · impacto[r] / 100 · multiplicador[s]
+                     · curva((m − inicio[r] − retraso[s]) / rampa[r])
+
+de donde se obtienen la recaudación acumulada y el valor presente neto.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+from motor.reformas import MULTIPLICADORES_ESCENARIO, RECAUDACION_BASE, REFORMAS
+
+FASES: List[str] = ['Análisis', 'Discusión', 'Aprobación', 'Implementación', 'Evaluación']
+
+# Mes en que empieza a recaudar cada reforma (aprobación) y meses hasta el efecto pleno
+INICIO_RECAUDACION: List[float] = [9, 6, 12, 9, 12]
+DURACION_RAMPA: List[float] = [3, 3, 12, 6, 24]
+# La evaluación ocurre este número de meses después del efecto pleno
+MESES_EVALUACION: float = 6
+
+# Meses adicionales de retraso por escenario
+RETRASO_ESCENARIO: Dict[str, float] = {
+    "Conservador": 3,
+    "Base": 0,
+    "Optimista": 0,
+}
+
+TASA_DESCUENTO: float = 0.10
+
+
+def _lineal(x: np.ndarray) -> np.ndarray:
+    return np.clip(x, 0, 1)
+
+
+def _curva_s(x: np.ndarray) -> np.ndarray:
+    x = np.clip(x, 0, 1)
+    return x * x * (3 - 2 * x)
+
+
+def _escalon(x: np.ndarray) -> np.ndarray:
+    return (x >= 0).astype(float)
+
+
+# Fracción del efecto pleno según el avance relativo de la rampa
+CURVAS: Dict[str, Callable[[np.ndarray], np.ndarray]] = {
+    "Curva S": _curva_s,
+    "Lineal": _lineal,
+    "Inmediata": _escalon,
+}
+
+
+def hitos_fases(inicio: float, rampa: float) -> np.ndarray:
+    """Mes en que concluye cada fase de ``FASES`` para una reforma."""
+    return np.array([inicio / 3, 2 * inicio / 3, inicio, inicio + rampa, inicio + rampa + MESES_EVALUACION])
+
+
+@dataclass
+class FlujosReforma:
+    """Flujo mensual de recaudación (millones MXN) con forma ``(meses, reformas, escenarios)``."""
+
+    flujo: np.ndarray
+    avance: np.ndarray
+    reformas: List[str]
+    escenarios: List[str]
+
+    @property
+    def meses(self) -> np.ndarray:
+        return np.arange(1, self.flujo.shape[0] + 1)
+
+    def acumulado(self) -> np.ndarray:
+        """Recaudación acumulada al cierre de cada mes, misma forma que ``flujo``."""
+        return np.cumsum(self.flujo, axis=0)
+
+    def vpn(self, tasa_anual: float = TASA_DESCUENTO) -> np.ndarray:
+        """Valor presente neto por reforma y escenario ``(reformas, escenarios)``."""
+        descuento = (1 + tasa_anual) ** (-self.meses / 12)
+        return np.tensordot(descuento, self.flujo, axes=(0, 0))
+
+    def resumen(self, tasa_anual: float = TASA_DESCUENTO) -> pd.DataFrame:
+        """Tabla reforma × escenario con recaudación acumulada y VPN."""
+        acumulado = self.acumulado()[-1]
+        vpn = self.vpn(tasa_anual)
+        return pd.DataFrame({
+            "Reforma": np.repeat(self.reformas, len(self.escenarios)),
+            "Escenario": np.tile(self.escenarios, len(self.reformas)),
+            "Recaudación Acumulada (M$)": acumulado.ravel(),
+            "VPN (M$)": vpn.ravel(),
+        })
+
+
+def flujos_reformas(
+    impactos: Sequence[float],
+    horizonte_meses: int = 60,
+    curva: str = "Curva S",
+    recaudacion_base: float = RECAUDACION_BASE,
+    inicio: Sequence[float] = INICIO_RECAUDACION,
+    rampa: Sequence[float] = DURACION_RAMPA,
+    reformas: Sequence[str] = REFORMAS,
+) -> FlujosReforma:
+    """Tensor mes × reforma × escenario de recaudación con arranque gradual."""
+    meses = np.arange(1, horizonte_meses + 1, dtype=float)[:, None, None]
+    impactos = np.asarray(impactos, dtype=float)[None, :, None]
+    inicio = np.asarray(inicio, dtype=float)[None, :, None]
+    rampa = np.maximum(np.asarray(rampa, dtype=float), 1e-9)[None, :, None]
+    multiplicador = np.array(list(MULTIPLICADORES_ESCENARIO.values()))[None, None, :]
+    retraso = np.array([RETRASO_ESCENARIO[e] for e in MULTIPLICADORES_ESCENARIO])[None, None, :]
+
+    # Avance al cierre del mes: el mes ``inicio + 1`` es el primero con recaudación
+    avance = CURVAS[curva]((meses - inicio - retraso) / rampa)
+    avance = np.where(meses > inicio + retraso, avance, 0.0)
+    flujo = recaudacion_base / 12 * impactos / 100 * multiplicador * avance
+    return FlujosReforma(
+        flujo=flujo,
+        avance=avance,
+        reformas=list(reformas),
+        escenarios=list(MULTIPLICADORES_ESCENARIO),
+    )
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+Cubo dimensional sector × estado × mes en memoria.
+
+Cada medida es un arreglo denso ``(sectores, estados, meses)`` indexado por
+los códigos categóricos de cada dimensión, y al construir el cubo se
+precalculan sus agregados marginales (las sumas sobre cada subconjunto de
+ejes). Una consulta elige el marginal que ya suma las dimensiones que no se
+piden y lo indexa con los códigos de los filtros, así que su costo depende
+del tamaño del resultado y no del número de registros.
+
+Las medidas de saldo (afiliados, informales, metas de afiliación) guardan el
+promedio mensual; las de flujo (recaudación y su meta), la suma del mes.
+Sumar un saldo sobre meses no tiene sentido: para ellas la dimensión ``mes``
+debe fijarse o conservarse.
+"""
+
+import itertools
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+DIMENSIONES: Tuple[str, ...] = ("sector", "estado", "mes")
+SALDOS: Tuple[str, ...] = ("afiliados", "informales", "meta_afiliacion")
+
+Etiqueta = Union[str, int, pd.Period]
+
+
+@dataclass
+class Cubo:
+    """Medidas densas ``(sectores, estados, meses)`` con sus marginales precalculados.
+
+    ``etiquetas["mes"]`` es un ``pd.PeriodIndex`` mensual; las demás, arreglos de texto.
+    """
+
+    etiquetas: Dict[str, Union[np.ndarray, pd.PeriodIndex]]
+    valores: Dict[str, np.ndarray]
+    marginales: Dict[Tuple[str, Tuple[int, ...]], np.ndarray] = field(default_factory=dict, repr=False)
+
+    def __post_init__(self):
+        self._codigos = {dim: {e: i for i, e in enumerate(self.etiquetas[dim])} for dim in DIMENSIONES}
+        if not self.marginales:
+            for medida, arreglo in self.valores.items():
+                for r in range(len(DIMENSIONES) + 1):
+                    for ejes in itertools.combinations(range(len(DIMENSIONES)), r):
+                        self.marginales[(medida, ejes)] = arreglo.sum(axis=ejes) if ejes else arreglo
+
+    @classmethod
+    def desde_registros(
+        cls,
+        registros: pd.DataFrame,
+        medidas: Optional[Sequence[str]] = None,
+        saldos: Iterable[str] = SALDOS,
+        fecha: str = "fecha",
+    ) -> "Cubo":
+        """Construye el cubo desde registros con ``sector``, ``estado``, ``fecha`` y medidas.
+
+        Los registros pueden ser diarios: los saldos se promedian por mes y
+        los flujos se suman.
+        """
+        if medidas is None:
+            medidas = [c for c in registros.select_dtypes("number").columns]
+        meses = pd.PeriodIndex(pd.to_datetime(registros[fecha]), freq="M")
+        codigos, etiquetas = [], {}
+        for dim, columna in zip(DIMENSIONES, (registros["sector"], registros["estado"], meses)):
+            codigo, unicas = pd.factorize(columna, sort=True)
+            codigos.append(codigo)
+            etiquetas[dim] = unicas if dim == "mes" else np.asarray(unicas.astype(str))
+        forma = tuple(len(etiquetas[d]) for d in DIMENSIONES)
+        plano = np.ravel_multi_index(codigos, forma)
+
+        # Días distintos por mes y celda para promediar los saldos
+        dias = pd.to_datetime(registros[fecha]).dt.normalize().to_numpy()
+        _, primera = np.unique(np.c_[plano, dias.astype("int64")], axis=0, return_index=True)
+        num_dias = np.bincount(plano[primera], minlength=np.prod(forma)).reshape(forma)
+        saldos = set(saldos)
+
+        valores = {}
+        for medida in medidas:
+            suma = np.bincount(plano, registros[medida].to_numpy(dtype=float), minlength=np.prod(forma)).reshape(forma)
+            if medida in saldos:
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    suma = np.where(num_dias > 0, suma / np.maximum(num_dias, 1), 0.0)
+            valores[medida] = suma
+        return cls(etiquetas=etiquetas, valores=valores)
+
+    @property
+    def forma(self) -> Tuple[int, ...]:
+        return tuple(len(self.etiquetas[d]) for d in DIMENSIONES)
+
+    def codigo(self, dimension: str, etiqueta: Etiqueta) -> int:
+        """Código de ``etiqueta``; los meses aceptan también posiciones (``-1`` = último)."""
+        if dimension == "mes" and isinstance(etiqueta, (int, np.integer)):
+            return int(etiqueta) % len(self.etiquetas["mes"])
+        if dimension == "mes" and not isinstance(etiqueta, pd.Period):
+            etiqueta = pd.Period(etiqueta, freq="M")
+        try:
+            return self._codigos[dimension][etiqueta]
+        except KeyError:
+            raise KeyError(f"{dimension} desconocido: {etiqueta}") from None
+
+    def consulta(self, medida: str, por: Sequence[str] = (), **filtros) -> Union[float, np.ndarray]:
+        """Valores de ``medida`` con los ejes ``por`` (en ese orden), fijando ``filtros``.
+
+        Las dimensiones que no están en ``por`` ni en ``filtros`` se suman.
+        Por ejemplo, ``consulta("informales", por=("sector", "mes"),
+        estado="Chiapas")`` da un arreglo ``(sectores, meses)``.
+        """
+        por = tuple(por)
+        desconocidas = (set(por) | set(filtros)) - set(DIMENSIONES)
+        if desconocidas:
+            raise ValueError(f"Dimensiones no válidas: {sorted(desconocidas)}")
+        ejes_suma = tuple(i for i, d in enumerate(DIMENSIONES) if d not in por and d not in filtros)
+        marginal = self.marginales[(medida, ejes_suma)]
+        restantes = [d for d in DIMENSIONES if d in por or d in filtros]
+        indice = tuple(self.codigo(d, filtros[d]) if d in filtros else slice(None) for d in restantes)
+        resultado = marginal[indice]
+        if np.ndim(resultado) == 0:
+            return float(resultado)
+        conservados = [d for d in restantes if d not in filtros]
+        return np.transpose(resultado, [conservados.index(d) for d in por])
+
+    def razon(self, numerador: str, denominador: Sequence[str], por: Sequence[str] = (), **filtros):
+        """``numerador / suma(denominador)`` de las medidas consultadas (NaN si el denominador es 0)."""
+        arriba = np.asarray(self.consulta(numerador, por, **filtros), dtype=float)
+        abajo = sum(np.asarray(self.consulta(m, por, **filtros), dtype=float) for m in denominador)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            resultado = np.where(abajo != 0, arriba / np.where(abajo != 0, abajo, 1), np.nan)
+        return float(resultado) if resultado.ndim == 0 else resultado
+
+    def serie(self, medida: str, por: str, **filtros) -> pd.DataFrame:
+        """Tabla ``mes × por`` de una medida, lista para graficar."""
+        valores = self.consulta(medida, (por, "mes"), **filtros)
+        return pd.DataFrame(valores.T, index=self.etiquetas["mes"].astype(str), columns=self.etiquetas[por])
+
+    def sectores(self, estado: Optional[str] = None, mes: Etiqueta = -1, meses_crecimiento: int = 12) -> pd.DataFrame:
+        """Equivalente a ``df_sectores`` en ``mes``, para todo el país o un estado.
+
+        El crecimiento se anualiza desde ``meses_crecimiento`` meses antes (o
+        el primer mes disponible).
+        """
+        filtros = {} if estado is None else {"estado": estado}
+        fin = self.codigo("mes", mes)
+        inicio = max(fin - meses_crecimiento, 0)
+        final = self.consulta("afiliados", ("sector",), mes=fin, **filtros)
+        inicial = self.consulta("afiliados", ("sector",), mes=inicio, **filtros)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            crecimiento = ((final / inicial) ** (12 / max(fin - inicio, 1)) - 1) * 100
+        if "informales" in self.valores:
+            informalidad = self.razon("informales", ("afiliados", "informales"), ("sector",), mes=fin, **filtros) * 100
+        else:
+            informalidad = np.full(len(final), np.nan)
+        return pd.DataFrame({
+            "Sector": self.etiquetas["sector"],
+            "Afiliados": final,
+            "Crecimiento Anual (%)": crecimiento,
+            "Tasa Informalidad (%)": informalidad,
+        })
+
+    def avance(self, mes: Etiqueta = -1, **filtros) -> Tuple[float, float]:
+        """Porcentaje de avance de afiliación (saldo del mes) y de recaudación (acumulado del año).
+
+        Devuelve NaN si el cubo no tiene la meta correspondiente.
+        """
+        fin = self.codigo("mes", mes)
+        afiliacion = recaudacion = np.nan
+        if "meta_afiliacion" in self.valores:
+            afiliacion = self.razon("afiliados", ("meta_afiliacion",), mes=fin, **filtros) * 100
+        if "meta_recaudacion" in self.valores:
+            meses = self.etiquetas["mes"]
+            del_año = np.flatnonzero((meses.year == meses[fin].year) & (np.arange(len(meses)) <= fin))
+            recaudado = self.consulta("recaudacion", ("mes",), **filtros)[del_año].sum()
+            meta = self.consulta("meta_recaudacion", ("mes",), **filtros)[del_año].sum()
+            recaudacion = recaudado / meta * 100 if meta else np.nan
+        return float(afiliacion), float(recaudacion)
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+Generadores de datos sintéticos por sección.
+
+Cada generador recibe una semilla explícita y usa su propio
+``np.random.Generator``, por lo que el mismo ``(sección, semilla, parámetros)``
+produce siempre los mismos datos. Esto permite cachear los resultados por esa
+clave y regenerarlos solo cuando el usuario cambia la semilla.
+"""
+
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from motor.anomalias import PARAMETROS_SERIE
+from motor.avances import ESTADOS, MEDIDAS as MEDIDAS_AVANCE, catalogo_unidades
+from motor.metas import TENDENCIA_META, TIPOS_META
+
+MESES: List[str] = ['Ene', 'Feb', 'Mar', 'Abr', 'May', 'Jun', 'Jul', 'Ago', 'Sep', 'Oct', 'Nov', 'Dic']
+SECTORES: List[str] = ['Manufactura', 'Servicios', 'Comercio', 'Construcción', 'Agricultura', 'Salud', 'Educación']
+
+
+def generar_vista_previa(semilla: int) -> pd.DataFrame:
+    """Afiliados y recaudación mensuales de la pantalla de inicio."""
+    rng = np.random.default_rng(semilla)
+    return pd.DataFrame({
+        'Mes': MESES,
+        'Afiliados': rng.integers(18000000, 22000000, size=len(MESES)),
+        'Recaudación (MXN)': rng.integers(45000, 65000, size=len(MESES)) * 1000,
+    })
+
+
+# Media, escala y cargas en los factores (dinamismo, formalidad, tamaño) de cada indicador
+INDICADORES_LABORALES: Dict[str, tuple] = {
+    'Crecimiento Anual (%)': (3.0, 2.5, (0.8, 0.1, 0.1)),
+    'Tasa Informalidad (%)': (40.0, 12.0, (-0.2, -0.8, -0.2)),
+    'Salario Promedio (MXN)': (12000.0, 3000.0, (0.3, 0.6, 0.4)),
+    'Tasa Desocupación (%)': (3.5, 1.0, (-0.6, -0.1, 0.0)),
+    'Rotación Laboral (%)': (25.0, 8.0, (0.1, -0.5, -0.3)),
+    'Productividad Laboral': (100.0, 25.0, (0.4, 0.3, 0.6)),
+    'Participación Femenina (%)': (38.0, 10.0, (0.1, 0.2, 0.0)),
+    'Trabajadores Eventuales (%)': (15.0, 6.0, (0.2, -0.6, -0.1)),
+    'Tamaño Promedio de Empresa': (20.0, 8.0, (0.1, 0.3, 0.8)),
+    'Escolaridad Promedio (años)': (10.0, 1.5, (0.2, 0.5, 0.3)),
+    'Cobertura Seguridad Social (%)': (55.0, 12.0, (0.1, 0.85, 0.2)),
+    'Recaudación por Afiliado (MXN)': (4000.0, 900.0, (0.2, 0.5, 0.5)),
+    'Incapacidades por 1000': (30.0, 8.0, (0.0, 0.3, 0.2)),
+    'Riesgos de Trabajo por 1000': (12.0, 4.0, (0.1, -0.2, 0.1)),
+    'Morosidad Patronal (%)': (8.0, 3.0, (-0.4, -0.4, -0.2)),
+    'Jornada Semanal (h)': (46.0, 3.0, (0.1, -0.4, -0.1)),
+}
+
+
+def generar_indicadores(semilla: int) -> pd.DataFrame:
+    """Indicadores laborales por celda sector × estado con estructura de factores comunes."""
+    rng = np.random.default_rng(semilla)
+    sectores = np.repeat(SECTORES, len(ESTADOS))
+    estados = np.tile(ESTADOS, len(SECTORES))
+    # Factores latentes: efecto de sector + efecto de estado + ruido de la celda
+    factores = (np.repeat(rng.normal(0, 0.7, (len(SECTORES), 3)), len(ESTADOS), axis=0)
+                + np.tile(rng.normal(0, 0.5, (len(ESTADOS), 3)), (len(SECTORES), 1))
+                + rng.normal(0, 0.5, (len(sectores), 3)))
+    media, escala, cargas = (np.array(v, dtype=float) for v in zip(*INDICADORES_LABORALES.values()))
+    propio = np.sqrt(np.maximum(1 - (cargas ** 2).sum(axis=1), 0.1))
+    valores = media + escala * (factores @ cargas.T + propio * rng.normal(size=(len(sectores), len(media))))
+    # Solo el crecimiento (primera columna) puede ser negativo
+    valores[:, 1:] = np.maximum(valores[:, 1:], 0)
+    df = pd.DataFrame(valores.round(2), columns=list(INDICADORES_LABORALES))
+    df.insert(0, 'Estado', estados)
+    df.insert(0, 'Sector', sectores)
+    return df
+
+
+def generar_panel(semilla: int, num_meses: int = 36) -> pd.DataFrame:
+    """Panel mensual sector × estado de afiliados, informales, recaudación y sus metas."""
+    rng = np.random.default_rng(semilla)
+    meses = pd.period_range(end='2025-12', periods=num_meses, freq='M')
+    s, e, m = len(SECTORES), len(ESTADOS), num_meses
+    t = np.arange(m) / 12
+
+    base = rng.lognormal(np.log(40000), 0.8, size=(s, e, 1))
+    crecimiento = rng.normal(0.03, 0.02, size=(s, 1, 1)) + rng.normal(0, 0.015, size=(1, e, 1))
+    estacional = 1 + 0.01 * np.sin(2 * np.pi * np.arange(m) / 12)
+    afiliados = base * np.exp(crecimiento * t) * estacional * rng.normal(1, 0.01, size=(s, e, m))
+    tasa_informal = np.clip(rng.normal(0.4, 0.1, size=(s, 1, 1)) + rng.normal(0, 0.08, size=(1, e, 1))
+                            - 0.01 * t + rng.normal(0, 0.01, size=(s, e, m)), 0.05, 0.9)
+    informales = afiliados * tasa_informal / (1 - tasa_informal)
+    salario = rng.uniform(8000, 20000, size=(s, 1, 1)) * rng.uniform(0.8, 1.2, size=(1, e, 1))
+    recaudacion = afiliados * salario * 0.1 * rng.normal(1, 0.05, size=(s, e, m))
+    # Metas: crecimiento planeado sobre el primer mes de cada año
+    inicio_año = (np.arange(m) // 12) * 12
+    meta_afiliacion = afiliados[:, :, inicio_año] * (1 + 0.05 * ((np.arange(m) % 12) + 1) / 12)
+    meta_recaudacion = recaudacion[:, :, inicio_año] * 1.06
+
+    indice = pd.MultiIndex.from_product([SECTORES, ESTADOS, meses.to_timestamp()],
+                                        names=['sector', 'estado', 'fecha'])
+    return pd.DataFrame({
+        'afiliados': afiliados.ravel().round(),
+        'informales': informales.ravel().round(),
+        'recaudacion': recaudacion.ravel().round(),
+        'meta_afiliacion': meta_afiliacion.ravel().round(),
+        'meta_recaudacion': meta_recaudacion.ravel().round(),
+    }, index=indice).reset_index()
+
+
+def generar_reportes(semilla: int) -> Dict[str, np.ndarray]:
+    """Metas y avances de afiliación y recaudación por subdelegación de los 32 estados."""
+    rng = np.random.default_rng(semilla)
+    catalogo = catalogo_unidades()
+    n = len(catalogo)
+    meta_afiliacion = rng.integers(8000, 60000, size=n)
+    meta_recaudacion = rng.integers(200, 1600, size=n) * 1000
+    return {
+        'estados': catalogo['Estado'].to_numpy(),
+        'delegaciones': catalogo['Delegación'].to_numpy(),
+        'subdelegaciones': catalogo['Subdelegación'].to_numpy(),
+        'meta_afiliacion': meta_afiliacion,
+        'avance_afiliacion': (meta_afiliacion * rng.uniform(0.6, 1.2, size=n)).astype(int),
+        'meta_recaudacion': meta_recaudacion,
+        'avance_recaudacion': (meta_recaudacion * rng.uniform(0.7, 1.3, size=n)).astype(int),
+    }
+
+
+def generar_deltas_avance(semilla: int, num_subdelegaciones: int, proporcion: float = 0.6):
+    """Incrementos diarios de avance para una fracción de las subdelegaciones.
+
+    Devuelve ``(indices, deltas)`` con ``deltas`` de forma ``(k, 4)`` en el
+    orden de ``motor.avances.MEDIDAS``; las metas no cambian.
+    """
+    rng = np.random.default_rng(semilla)
+    indices = np.flatnonzero(rng.random(num_subdelegaciones) < proporcion)
+    deltas = np.zeros((len(indices), len(MEDIDAS_AVANCE)))
+    deltas[:, 1] = np.round(rng.normal(40, 120, size=len(indices)))
+    deltas[:, 3] = np.round(rng.gamma(2.0, 2500, size=len(indices)))
+    return indices, deltas
+
+
+def generar_unidades_metas(semilla: int) -> pd.DataFrame:
+    """Valor base y mejora anual esperada de cada subdelegación por tipo de meta."""
+    rng = np.random.default_rng(semilla)
+    catalogo = catalogo_unidades()
+    n = len(catalogo)
+    bases = {
+        'Afiliación': rng.integers(8000, 60000, size=n).astype(float),
+        'Recaudación': rng.integers(200, 1600, size=n) * 1000.0,
+        'Eficiencia Operativa': np.round(rng.uniform(5, 20, size=n), 1),
+    }
+    return pd.concat([
+        catalogo.assign(**{
+            'Tipo': tipo,
+            'Base': bases[tipo],
+            'Tendencia (%)': np.clip(rng.normal(TENDENCIA_META[tipo] * 100, 4, size=n), 0, 60),
+        })
+        for tipo in TIPOS_META
+    ], ignore_index=True)
+
+
+def generar_serie_anomalias(semilla: int, tipo_datos: str, num_dias: int) -> Dict:
+    """Serie diaria con entre 2 y 4 anomalías alternadas (alta/baja)."""
+    rng = np.random.default_rng(semilla)
+    parametros = PARAMETROS_SERIE[tipo_datos]
+
+    datos = rng.normal(parametros['base_value'], parametros['std_dev'], num_dias)
+
+    num_anomalias = rng.integers(2, 5)
+    posiciones = rng.choice(num_dias, num_anomalias, replace=False)
+    # Posiciones pares: anomalía alta; impares: anomalía baja
+    extremos = np.where(np.arange(num_anomalias) % 2 == 0,
+                        parametros['anomalia_alta'], parametros['anomalia_baja'])
+    datos[posiciones] = extremos * rng.uniform(0.8, 1.2, size=num_anomalias)
+
+    return {
+        'dias': list(range(1, num_dias + 1)),
+        'datos': datos,
+        'tipo_datos': tipo_datos,
+        'base_value': parametros['base_value'],
+    }
+
+
+GENERADORES: Dict[str, Callable] = {
+    'Inicio': generar_vista_previa,
+    'Estudios Investigación': generar_panel,
+    'Indicadores Laborales': generar_indicadores,
+    'Reportes Avances': generar_reportes,
+    'Metas Desempeño': generar_unidades_metas,
+    'Detección Anomalías': generar_serie_anomalias,
+}
+
+
+def generar_datos(seccion: str, semilla: int, **parametros):
+    """Genera los datos de ``seccion`` con la semilla y parámetros indicados."""
+    return GENERADORES[seccion](semilla, **parametros)
+
+
+def nueva_semilla() -> int:
+    """Semilla aleatoria para cuando el usuario pide regenerar los datos."""
+    return int(np.random.SeedSequence().generate_state(1)[0])
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+"""
+Registro de detectores de anomalías intercambiables.
+
+Todos los detectores reciben una matriz serie × día (o una sola serie) y
+devuelven un ``ResultadoDeteccion`` con la máscara de anomalías, los límites
+por punto y el tiempo de cómputo, de modo que puedan compararse costo y
+calidad sobre los mismos datos. Para agregar un detector basta decorarlo con
+``registrar_detector``.
+"""
+
+import math
+import time
+import warnings
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from motor.anomalias import limites_por_metodo
+
+# Factor que hace a la MAD un estimador consistente de la desviación estándar normal
+FACTOR_MAD: float = 1.4826
+# Vecindad (días) de la mediana contra la que se mide el residuo local en isolation forest;
+# con 5 días un pico aislado no mueve la mediana de sus vecinos
+VECINDAD_RESIDUO: int = 5
+
+
+@dataclass
+class ResultadoDeteccion:
+    """Máscara ``(series, días)`` de anomalías con límites y metadatos de tiempo.
+
+    Los límites tienen la misma forma que la máscara; valen ``NaN`` cuando el
+    detector no define un umbral en la escala original (isolation forest).
+    """
+
+    detector: str
+    mascara: np.ndarray
+    limite_inferior: np.ndarray
+    limite_superior: np.ndarray
+    segundos: float = 0.0
+    puntaje: Optional[np.ndarray] = None
+    parametros: Dict = field(default_factory=dict)
+
+    @property
+    def puntos(self) -> int:
+        return int(self.mascara.size)
+
+    @property
+    def puntos_por_segundo(self) -> float:
+        return self.puntos / self.segundos if self.segundos else math.inf
+
+    @property
+    def limites_constantes(self) -> bool:
+        """``True`` si cada serie tiene un solo par de límites (no varían por día)."""
+        return bool(
+            np.all(self.limite_inferior == self.limite_inferior[:, :1])
+            and np.all(self.limite_superior == self.limite_superior[:, :1])
+        )
+
+
+DETECTORES: Dict[str, Callable[..., Tuple]] = {}
+
+
+def registrar_detector(nombre: str):
+    """Decorador que registra un detector con la firma ``f(matriz, **parametros)``.
+
+    El detector devuelve ``(limite_inferior, limite_superior)`` o
+    ``(limite_inferior, limite_superior, mascara, puntaje)``; el registro se
+    encarga de la forma de los arreglos, la máscara por defecto y el tiempo.
+    """
+    def decorador(funcion):
+        DETECTORES[nombre] = funcion
+        return funcion
+    return decorador
+
+
+def detectar(nombre: str, datos: np.ndarray, **parametros) -> ResultadoDeteccion:
+    """Ejecuta el detector ``nombre`` sobre una serie o una matriz serie × día."""
+    matriz = np.atleast_2d(np.asarray(datos, dtype=float))
+    inicio = time.perf_counter()
+    salida = DETECTORES[nombre](matriz, **parametros)
+    inferior, superior = (np.broadcast_to(l, matriz.shape) for l in salida[:2])
+    if len(salida) > 2:
+        mascara, puntaje = salida[2], salida[3]
+    else:
+        mascara, puntaje = (matriz < inferior) | (matriz > superior), None
+    return ResultadoDeteccion(
+        detector=nombre,
+        mascara=mascara,
+        limite_inferior=inferior,
+        limite_superior=superior,
+        segundos=time.perf_counter() - inicio,
+        puntaje=puntaje,
+        parametros=parametros,
+    )
+
+
+def comparar_detectores(
+    datos: np.ndarray, parametros: Optional[Dict[str, Dict]] = None
+) -> List[ResultadoDeteccion]:
+    """Ejecuta todos los detectores registrados sobre los mismos datos."""
+    parametros = parametros or {}
+    return [detectar(nombre, datos, **parametros.get(nombre, {})) for nombre in DETECTORES]
+
+
+def _limites_clasicos(matriz, sensibilidad_iqr=1.5, sensibilidad_std=3.0, percentil_inf=5, percentil_sup=95):
+    return limites_por_metodo(matriz, sensibilidad_iqr, sensibilidad_std, percentil_inf, percentil_sup)
+
+
+@registrar_detector("IQR (Recomendado)")
+def _iqr(matriz, sensibilidad=1.5):
+    inferior, superior = _limites_clasicos(matriz, sensibilidad_iqr=sensibilidad)["IQR (Recomendado)"]
+    return inferior[:, None], superior[:, None]
+
+
+@registrar_detector("Desviación Estándar")
+def _desviacion(matriz, sensibilidad=3.0):
+    inferior, superior = _limites_clasicos(matriz, sensibilidad_std=sensibilidad)["Desviación Estándar"]
+    return inferior[:, None], superior[:, None]
+
+
+@registrar_detector("Percentiles")
+def _percentiles(matriz, percentil_inf=5, percentil_sup=95):
+    limites = _limites_clasicos(matriz, percentil_inf=percentil_inf, percentil_sup=percentil_sup)
+    inferior, superior = limites["Percentiles"]
+    return inferior[:, None], superior[:, None]
+
+
+def _mediana_mad(matriz):
+    mediana = np.nanmedian(matriz, axis=1, keepdims=True)
+    mad = np.nanmedian(np.abs(matriz - mediana), axis=1, keepdims=True) * FACTOR_MAD
+    return mediana, mad
+
+
+@registrar_detector("Mediana/MAD")
+def _mad(matriz, sensibilidad=3.5):
+    mediana, mad = _mediana_mad(matriz)
+    return mediana - sensibilidad * mad, mediana + sensibilidad * mad
+
+
+def _media_movil_centrada(matriz, ventana):
+    """Media móvil centrada por fila; en los bordes se usa la ventana disponible.
+
+    Los ``NaN`` (relleno de ``apilar_series``) no cuentan: cada media se
+    divide entre los valores finitos de su ventana.
+    """
+    finitos = np.isfinite(matriz)
+    acumulado = np.cumsum(np.pad(np.where(finitos, matriz, 0.0), ((0, 0), (1, 0))), axis=1)
+    cuenta = np.cumsum(np.pad(finitos, ((0, 0), (1, 0))), axis=1)
+    n = matriz.shape[1]
+    mitad = ventana // 2
+    inicio = np.clip(np.arange(n) - mitad, 0, n)
+    fin = np.clip(np.arange(n) + ventana - mitad, 0, n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (acumulado[:, fin] - acumulado[:, inicio]) / (cuenta[:, fin] - cuenta[:, inicio])
+
+
+@registrar_detector("Estacional (descomposición)")
+def _estacional(matriz, sensibilidad=3.5, periodo=7, fin_de_mes=None):
+    """Tendencia por media móvil, estacionalidad por fase del periodo y umbral MAD sobre el residuo.
+
+    ``fin_de_mes`` es una máscara opcional por día que recibe su propio efecto
+    estacional para no marcar como atípicos los cierres de mes.
+    """
+    n = matriz.shape[1]
+    tendencia = _media_movil_centrada(matriz, periodo)
+    sin_tendencia = matriz - tendencia
+
+    # Efecto promedio por fase (día de la semana) con una suma por grupos vectorizada
+    fase = np.arange(n) % periodo
+    grupos = fase if fin_de_mes is None else np.where(np.asarray(fin_de_mes, dtype=bool), periodo, fase)
+    num_grupos = periodo + 1
+    indicadora = np.zeros((n, num_grupos))
+    indicadora[np.arange(n), grupos] = 1
+    # Los días de relleno (NaN) no entran ni en la suma ni en el conteo de su fase
+    finitos = np.isfinite(sin_tendencia)
+    efecto = (np.where(finitos, sin_tendencia, 0.0) @ indicadora) / np.maximum(finitos @ indicadora, 1)
+    estacional = efecto[:, grupos]
+
+    ajuste = tendencia + estacional
+    mediana, mad = _mediana_mad(matriz - ajuste)
+    return ajuste + mediana - sensibilidad * mad, ajuste + mediana + sensibilidad * mad
+
+
+def _mediana_movil_centrada(matriz, ventana):
+    """Mediana móvil centrada por fila ignorando ``NaN``; en los bordes se usa la ventana disponible."""
+    mitad = ventana // 2
+    extendida = np.pad(matriz, ((0, 0), (mitad, ventana - 1 - mitad)), constant_values=np.nan)
+    ventanas = np.lib.stride_tricks.sliding_window_view(extendida, ventana, axis=1)
+    # Las ventanas del relleno son todas NaN: su mediana es NaN y el aviso sobra
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return np.nanmedian(ventanas, axis=2)
+
+
+def _c(n):
+    """Longitud promedio de una búsqueda fallida en un árbol binario de ``n`` nodos."""
+    n = np.asarray(n, dtype=float)
+    return np.where(n > 2, 2 * (np.log(np.maximum(n - 1, 1)) + np.euler_gamma) - 2 * (n - 1) / np.maximum(n, 1),
+                    np.where(n == 2, 1.0, 0.0))
+
+
+def _construir_arbol(muestra, rng, profundidad_max):
+    """Árbol de aislamiento como arreglos planos (variable, corte, hijos, tamaño)."""
+    variable, corte, izquierdo, derecho, tamaño = [], [], [], [], []
+    pendientes = [(np.arange(len(muestra)), 0, -1, False)]
+    while pendientes:
+        indices, profundidad, padre, es_derecho = pendientes.pop()
+        nodo = len(variable)
+        if padre >= 0:
+            (derecho if es_derecho else izquierdo)[padre] = nodo
+        variable.append(-1)
+        corte.append(0.0)
+        izquierdo.append(-1)
+        derecho.append(-1)
+        tamaño.append(len(indices))
+        if len(indices) <= 1 or profundidad >= profundidad_max:
+            continue
+        datos = muestra[indices]
+        minimos, maximos = datos.min(axis=0), datos.max(axis=0)
+        candidatas = np.flatnonzero(maximos > minimos)
+        if candidatas.size == 0:
+            continue
+        v = rng.choice(candidatas)
+        c = rng.uniform(minimos[v], maximos[v])
+        variable[nodo], corte[nodo] = v, c
+        a_la_izquierda = datos[:, v] < c
+        pendientes.append((indices[~a_la_izquierda], profundidad + 1, nodo, True))
+        pendientes.append((indices[a_la_izquierda], profundidad + 1, nodo, False))
+    return tuple(np.array(a) for a in (variable, corte, izquierdo, derecho, tamaño))
+
+
+def _longitud_camino(arbol, puntos, profundidad_max):
+    """Longitud de camino de todos los puntos a la vez, nivel por nivel."""
+    variable, corte, izquierdo, derecho, tamaño = arbol
+    nodos = np.zeros(len(puntos), dtype=np.int64)
+    profundidad = np.zeros(len(puntos))
+    for _ in range(profundidad_max):
+        activos = variable[nodos] >= 0
+        if not activos.any():
+            break
+        v = np.where(activos, variable[nodos], 0)
+        va_izquierda = puntos[np.arange(len(puntos)), v] < corte[nodos]
+        siguiente = np.where(va_izquierda, izquierdo[nodos], derecho[nodos])
+        nodos = np.where(activos, siguiente, nodos)
+        profundidad += activos
+    return profundidad + _c(tamaño[nodos])
+
+
+@registrar_detector("Isolation Forest")
+def _isolation_forest(matriz, umbral=0.6, num_arboles=100, tamaño_muestra=256, semilla=0):
+    """Isolation forest sobre características robustas de cada punto.
+
+    Cada punto se describe por su valor y su residuo contra la mediana de su
+    vecindad centrada, estandarizados por serie con mediana/MAD, de modo que
+    un solo bosque evalúa todas las series del lote. Se marcan los puntos con
+    puntaje mayor que ``umbral``. Los puntos no finitos (el relleno de
+    ``apilar_series``) no entran al bosque: su puntaje es ``NaN`` y no se marcan.
+    """
+    rng = np.random.default_rng(semilla)
+    mediana, mad = _mediana_mad(matriz)
+    valor = (matriz - mediana) / np.where(mad > 0, mad, 1)
+    residuo = matriz - _mediana_movil_centrada(matriz, VECINDAD_RESIDUO)
+    mediana_residuo, mad_residuo = _mediana_mad(residuo)
+    residuo = (residuo - mediana_residuo) / np.where(mad_residuo > 0, mad_residuo, 1)
+    finitos = np.isfinite(valor) & np.isfinite(residuo)
+    puntos = np.column_stack([valor[finitos], residuo[finitos]])
+    sin_limite = np.full(matriz.shape, np.nan)
+    if len(puntos) == 0:
+        return sin_limite, sin_limite, np.zeros(matriz.shape, dtype=bool), sin_limite
+
+    tamaño_muestra = min(tamaño_muestra, len(puntos))
+    profundidad_max = int(math.ceil(math.log2(max(tamaño_muestra, 2))))
+    longitud = np.zeros(len(puntos))
+    for _ in range(num_arboles):
+        muestra = puntos[rng.choice(len(puntos), tamaño_muestra, replace=False)]
+        arbol = _construir_arbol(muestra, rng, profundidad_max)
+        longitud += _longitud_camino(arbol, puntos, profundidad_max)
+
+    puntaje = np.full(matriz.shape, np.nan)
+    puntaje[finitos] = 2 ** (-(longitud / num_arboles) / _c(tamaño_muestra))
+    return sin_limite, sin_limite, np.nan_to_num(puntaje) > umbral, puntaje
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Cálculos de la sección Estudios Investigación: correlaciones sectoriales.
+
+Las matrices de correlación y de correlación parcial de todos los indicadores
+se acompañan de intervalos de confianza bootstrap (percentiles). Los
+remuestreos se procesan en lotes: cada lote es un arreglo
+``(remuestreos, observaciones, indicadores)`` y sus matrices se obtienen con
+productos matriciales por lote (``matmul``) y una pseudoinversa por lote, sin
+un ciclo de Python por remuestreo. Una correlación es significativa si su
+intervalo no incluye el cero.
+"""
+
+from dataclasses import dataclass
+from typing import List, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from motor.instrumentacion import etapa
+
+NUM_REMUESTREOS: int = 1000
+NIVEL_CONFIANZA: float = 95
+# Elementos (remuestreos × observaciones × indicadores) por lote
+TAMAÑO_LOTE: int = 4_000_000
+
+
+def correlacion_sectores(
+    df_sectores: pd.DataFrame,
+    x: str = "Crecimiento Anual (%)",
+    y: str = "Tasa Informalidad (%)",
+) -> float:
+    """Coeficiente de correlación de Pearson entre dos columnas sectoriales."""
+    return float(np.corrcoef(df_sectores[x], df_sectores[y])[0, 1])
+
+
+def clasificar_correlacion(correlacion: float, inferior: float, superior: float) -> str:
+    """Clasifica la correlación por su intervalo de confianza.
+
+    Devuelve ``"negativa"`` o ``"positiva"`` si el intervalo excluye el cero y
+    ``"nula"`` si lo incluye.
+    """
+    if superior < 0:
+        return "negativa"
+    if inferior > 0:
+        return "positiva"
+    return "nula"
+
+
+def _correlaciones_lote(muestras: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Correlación y correlación parcial de cada muestra ``(B, n, K)`` → ``(B, K, K)``."""
+    centradas = muestras - muestras.mean(axis=1, keepdims=True)
+    covarianza = np.matmul(centradas.transpose(0, 2, 1), centradas)
+    desviacion = np.sqrt(np.einsum("bkk->bk", covarianza))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        correlacion = covarianza / (desviacion[:, :, None] * desviacion[:, None, :])
+        # Parcial: −P_ij / sqrt(P_ii P_jj) con P la (pseudo)inversa de la correlación
+        precision = np.linalg.pinv(np.nan_to_num(correlacion), hermitian=True)
+        diagonal = np.sqrt(np.einsum("bkk->bk", precision))
+        parcial = -precision / (diagonal[:, :, None] * diagonal[:, None, :])
+    indices = np.arange(muestras.shape[2])
+    parcial[:, indices, indices] = 1.0
+    return correlacion, parcial
+
+
+@dataclass
+class MatrizCorrelaciones:
+    """Correlaciones (``K × K``) con intervalos bootstrap al ``nivel`` (%) indicado."""
+
+    indicadores: List[str]
+    correlacion: np.ndarray
+    inferior: np.ndarray
+    superior: np.ndarray
+    parcial: np.ndarray
+    parcial_inferior: np.ndarray
+    parcial_superior: np.ndarray
+    num_observaciones: int
+    num_remuestreos: int
+    nivel: float
+
+    def significativa(self, parcial: bool = False) -> np.ndarray:
+        """Pares cuyo intervalo excluye el cero (la diagonal no cuenta)."""
+        inferior, superior = (self.parcial_inferior, self.parcial_superior) if parcial else (self.inferior, self.superior)
+        resultado = (inferior > 0) | (superior < 0)
+        np.fill_diagonal(resultado, False)
+        return resultado
+
+    def tabla(self, parcial: bool = False) -> pd.DataFrame:
+        """Un renglón por par de indicadores, de mayor a menor correlación absoluta."""
+        i, j = np.triu_indices(len(self.indicadores), k=1)
+        valores = self.parcial if parcial else self.correlacion
+        inferior, superior = (self.parcial_inferior, self.parcial_superior) if parcial else (self.inferior, self.superior)
+        df = pd.DataFrame({
+            "Indicador A": np.asarray(self.indicadores)[i],
+            "Indicador B": np.asarray(self.indicadores)[j],
+            "Correlación": valores[i, j],
+            "IC Inferior": inferior[i, j],
+            "IC Superior": superior[i, j],
+            "Significativa": self.significativa(parcial)[i, j],
+        })
+        return df.reindex(df["Correlación"].abs().sort_values(ascending=False).index).reset_index(drop=True)
+
+
+def correlaciones_bootstrap(
+    datos: Union[pd.DataFrame, np.ndarray],
+    num_remuestreos: int = NUM_REMUESTREOS,
+    nivel: float = NIVEL_CONFIANZA,
+    semilla: int = 2024,
+    tamaño_lote: int = TAMAÑO_LOTE,
+) -> MatrizCorrelaciones:
+    """Matrices de correlación y correlación parcial con intervalos bootstrap.
+
+    Usa las columnas numéricas de ``datos`` (observaciones × indicadores) y
+    descarta las filas con faltantes. Cada lote de remuestreos recibe su
+    semilla derivada con ``np.random.SeedSequence``.
+    """
+    if isinstance(datos, pd.DataFrame):
+        numericas = datos.select_dtypes("number").dropna()
+        indicadores = list(numericas.columns)
+        valores = numericas.to_numpy(dtype=float)
+    else:
+        valores = np.asarray(datos, dtype=float)
+        valores = valores[~np.isnan(valores).any(axis=1)]
+        indicadores = [f"X{k + 1}" for k in range(valores.shape[1])]
+    n, k = valores.shape
+    if n < 3:
+        raise ValueError("Se requieren al menos 3 observaciones completas")
+
+    correlacion, parcial = (m[0] for m in _correlaciones_lote(valores[None]))
+
+    por_lote = max(tamaño_lote // (n * k), 1)
+    tamaños = [min(por_lote, num_remuestreos - inicio) for inicio in range(0, num_remuestreos, por_lote)]
+    semillas = np.random.SeedSequence(semilla).spawn(len(tamaños))
+    remuestreo_corr = np.empty((num_remuestreos, k, k))
+    remuestreo_parcial = np.empty((num_remuestreos, k, k))
+    inicio = 0
+    for tamaño, semilla_lote in zip(tamaños, semillas):
+        indices = np.random.default_rng(semilla_lote).integers(0, n, size=(tamaño, n))
+        lote = slice(inicio, inicio + tamaño)
+        remuestreo_corr[lote], remuestreo_parcial[lote] = _correlaciones_lote(valores[indices])
+        inicio += tamaño
+
+    alfa = (100 - nivel) / 2
+    with etapa("percentiles"):
+        inferior, superior = np.nanpercentile(remuestreo_corr, [alfa, 100 - alfa], axis=0)
+        parcial_inferior, parcial_superior = np.nanpercentile(remuestreo_parcial, [alfa, 100 - alfa], axis=0)
+    return MatrizCorrelaciones(
+        indicadores=indicadores,
+        correlacion=correlacion,
+        inferior=inferior,
+        superior=superior,
+        parcial=parcial,
+        parcial_inferior=parcial_inferior,
+        parcial_superior=parcial_superior,
+        num_observaciones=n,
+        num_remuestreos=num_remuestreos,
+        nivel=nivel,
+    )
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""
+Detección de anomalías en línea para series que llegan punto por punto.
+
+``DetectorEnLinea`` aplica los mismos métodos que la sección Detección
+Anomalías (IQR, desviación estándar y percentiles) sobre estadísticos
+incrementales, de modo que cada dato nuevo se evalúa sin reprocesar la
+historia:
+
+- Ventana móvil: media y varianza con el algoritmo de Welford (altas y bajas
+  en O(1)) y cuantiles sobre una lista de saltos indexable con la ventana
+  ordenada (altas, bajas y consulta por posición en O(log w) esperado).
+- Ponderación exponencial: media y varianza exponenciales y cuantiles por
+  aproximación estocástica, ambos en O(1) por punto.
+"""
+
+import math
+import random
+from collections import deque
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from motor.anomalias import METODOS
+
+
+class _Nodo:
+    __slots__ = ("valor", "siguientes", "anchos")
+
+    def __init__(self, valor: float, niveles: int):
+        self.valor = valor
+        self.siguientes = [None] * niveles
+        # Número de posiciones que avanza cada enlace (para buscar por índice)
+        self.anchos = [1] * niveles
+
+
+class _ListaSaltos:
+    """Lista de saltos indexable: valores ordenados con alta, baja y acceso por posición en O(log n)."""
+
+    def __init__(self, capacidad: int):
+        self.niveles = max(int(math.log2(max(capacidad, 2))) + 1, 1)
+        self.cabeza = _Nodo(-math.inf, self.niveles)
+        # Semilla fija: la altura de los nodos no debe hacer variar los resultados entre corridas
+        self._azar = random.Random(0)
+        self.n = 0
+
+    def _altura(self) -> int:
+        altura = 1
+        while altura < self.niveles and self._azar.random() < 0.5:
+            altura += 1
+        return altura
+
+    def __len__(self) -> int:
+        return self.n
+
+    def __getitem__(self, indice: int) -> float:
+        nodo = self.cabeza
+        restantes = indice + 1
+        for nivel in reversed(range(self.niveles)):
+            while nodo.siguientes[nivel] is not None and nodo.anchos[nivel] <= restantes:
+                restantes -= nodo.anchos[nivel]
+                nodo = nodo.siguientes[nivel]
+        return nodo.valor
+
+    def insertar(self, valor: float) -> None:
+        previos = [None] * self.niveles
+        pasos = [0] * self.niveles
+        nodo = self.cabeza
+        for nivel in reversed(range(self.niveles)):
+            while nodo.siguientes[nivel] is not None and nodo.siguientes[nivel].valor <= valor:
+                pasos[nivel] += nodo.anchos[nivel]
+                nodo = nodo.siguientes[nivel]
+            previos[nivel] = nodo
+        altura = self._altura()
+        nuevo = _Nodo(valor, altura)
+        avance = 0
+        for nivel in range(altura):
+            previo = previos[nivel]
+            nuevo.siguientes[nivel] = previo.siguientes[nivel]
+            previo.siguientes[nivel] = nuevo
+            nuevo.anchos[nivel] = previo.anchos[nivel] - avance
+            previo.anchos[nivel] = avance + 1
+            avance += pasos[nivel]
+        for nivel in range(altura, self.niveles):
+            previos[nivel].anchos[nivel] += 1
+        self.n += 1
+
+    def quitar(self, valor: float) -> None:
+        previos = [None] * self.niveles
+        nodo = self.cabeza
+        for nivel in reversed(range(self.niveles)):
+            while nodo.siguientes[nivel] is not None and nodo.siguientes[nivel].valor < valor:
+                nodo = nodo.siguientes[nivel]
+            previos[nivel] = nodo
+        objetivo = previos[0].siguientes[0]
+        if objetivo is None or objetivo.valor != valor:
+            raise KeyError(valor)
+        for nivel in range(len(objetivo.siguientes)):
+            previo = previos[nivel]
+            previo.anchos[nivel] += objetivo.anchos[nivel] - 1
+            previo.siguientes[nivel] = objetivo.siguientes[nivel]
+        for nivel in range(len(objetivo.siguientes), self.niveles):
+            previos[nivel].anchos[nivel] -= 1
+        self.n -= 1
+
+
+class _VentanaMovil:
+    """Momentos de Welford y ventana ordenada de los últimos ``tamaño`` valores."""
+
+    def __init__(self, tamaño: int):
+        self.tamaño = tamaño
+        self.valores = deque()
+        self.ordenados = _ListaSaltos(tamaño)
+        self.media = 0.0
+        self.m2 = 0.0
+
+    def agregar(self, valor: float) -> None:
+        if len(self.valores) == self.tamaño:
+            self._quitar(self.valores.popleft())
+        self.valores.append(valor)
+        self.ordenados.insertar(valor)
+        n = len(self.valores)
+        delta = valor - self.media
+        self.media += delta / n
+        self.m2 += delta * (valor - self.media)
+
+    def _quitar(self, valor: float) -> None:
+        # ``valor`` ya salió de ``self.valores``; ``n`` es el tamaño sin él
+        self.ordenados.quitar(valor)
+        n = len(self.valores)
+        if n == 0:
+            self.media, self.m2 = 0.0, 0.0
+            return
+        media_anterior = self.media
+        self.media = (media_anterior * (n + 1) - valor) / n
+        self.m2 = max(self.m2 - (valor - media_anterior) * (valor - self.media), 0.0)
+
+    @property
+    def n(self) -> int:
+        return len(self.valores)
+
+    @property
+    def desviacion(self) -> float:
+        return math.sqrt(self.m2 / self.n) if self.n else 0.0
+
+    def cuantil(self, percentil: float) -> float:
+        """Cuantil con interpolación lineal, igual que ``np.percentile``."""
+        posicion = percentil / 100 * (self.n - 1)
+        inferior = int(math.floor(posicion))
+        superior = min(inferior + 1, self.n - 1)
+        fraccion = posicion - inferior
+        return self.ordenados[inferior] * (1 - fraccion) + self.ordenados[superior] * fraccion
+
+
+class _Exponencial:
+    """Media, varianza y cuantiles con ponderación exponencial (factor ``alfa``)."""
+
+    def __init__(self, alfa: float, percentiles: Sequence[float]):
+        self.alfa = alfa
+        self.n = 0
+        self.media = 0.0
+        self.varianza = 0.0
+        self.cuantiles: Dict[float, float] = {p: 0.0 for p in percentiles}
+
+    def agregar(self, valor: float) -> None:
+        self.n += 1
+        if self.n == 1:
+            self.media = valor
+            self.cuantiles = {p: valor for p in self.cuantiles}
+            return
+        delta = valor - self.media
+        incremento = self.alfa * delta
+        self.media += incremento
+        self.varianza = (1 - self.alfa) * (self.varianza + delta * incremento)
+        # Paso proporcional a la dispersión para que el cuantil siga la escala de la serie
+        paso = self.alfa * max(self.desviacion, 1e-12) * 2
+        for p in self.cuantiles:
+            objetivo = p / 100
+            self.cuantiles[p] += paso * (objetivo - (valor < self.cuantiles[p]))
+
+    @property
+    def desviacion(self) -> float:
+        return math.sqrt(self.varianza)
+
+    def cuantil(self, percentil: float) -> float:
+        return self.cuantiles[percentil]
+
+
+class DetectorEnLinea:
+    """Detector incremental con los métodos y parámetros de la sección.
+
+    Se usa ventana móvil de ``ventana`` puntos o, si se indica ``alfa``,
+    ponderación exponencial. ``sensibilidad`` es el multiplicador IQR o el
+    número de desviaciones estándar, como en ``calcular_limites``. Cada punto
+    se evalúa contra los límites vigentes antes de incorporarlo; durante los
+    primeros ``calentamiento`` puntos no se marca ninguna anomalía.
+    """
+
+    def __init__(
+        self,
+        metodo: str,
+        sensibilidad: Optional[float] = None,
+        percentil_inf: float = 5,
+        percentil_sup: float = 95,
+        ventana: int = 30,
+        alfa: Optional[float] = None,
+        calentamiento: int = 7,
+    ):
+        if metodo not in METODOS:
+            raise ValueError(f"Método no soportado: {metodo}")
+        self.metodo = metodo
+        self.sensibilidad = sensibilidad
+        self.percentiles = {
+            "IQR (Recomendado)": (25, 75),
+            "Percentiles": (percentil_inf, percentil_sup),
+        }.get(metodo, ())
+        self.calentamiento = calentamiento
+        if alfa is not None:
+            self.estadisticos = _Exponencial(alfa, self.percentiles)
+        else:
+            self.estadisticos = _VentanaMovil(ventana)
+
+    def limites(self) -> Tuple[float, float]:
+        """Límites ``(inferior, superior)`` con los estadísticos actuales."""
+        e = self.estadisticos
+        if e.n == 0:
+            return -math.inf, math.inf
+        if self.metodo == "Desviación Estándar":
+            return e.media - self.sensibilidad * e.desviacion, e.media + self.sensibilidad * e.desviacion
+        inferior, superior = (e.cuantil(p) for p in self.percentiles)
+        if self.metodo == "Percentiles":
+            return inferior, superior
+        iqr = superior - inferior
+        return inferior - self.sensibilidad * iqr, superior + self.sensibilidad * iqr
+
+    def actualizar(self, valor: float) -> Tuple[bool, float, float]:
+        """Evalúa ``valor`` contra los límites vigentes y lo incorpora.
+
+        Devuelve ``(es_anomalia, limite_inferior, limite_superior)``.
+        """
+        inferior, superior = self.limites()
+        es_anomalia = self.estadisticos.n >= self.calentamiento and not inferior <= valor <= superior
+        self.estadisticos.agregar(float(valor))
+        return es_anomalia, inferior, superior
+
+    def procesar(self, valores: Sequence[float]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Procesa una secuencia y devuelve máscara de anomalías y límites por punto."""
+        n = len(valores)
+        anomalias = np.zeros(n, dtype=bool)
+        inferiores = np.empty(n)
+        superiores = np.empty(n)
+        for i, valor in enumerate(valores):
+            anomalias[i], inferiores[i], superiores[i] = self.actualizar(valor)
+        return anomalias, inferiores, superiores
@@ -0,0 +1,450 @@
+# -*- coding: utf-8 -*-
+"""
+Constructores de figuras Plotly con caché y reducción de puntos.
+
+Las figuras se guardan en un ``CacheFiguras`` (LRU) cuya clave es la huella de
+los datos de entrada y los parámetros, de modo que una figura solo se
+reconstruye cuando cambia lo que muestra. Las series largas se reducen con
+LTTB o mín/máx antes de enviarse al navegador, conservando siempre los puntos
+marcados (por ejemplo, anomalías); las nubes de puntos grandes usan
+``Scattergl`` y los histogramas y diagramas de caja se agregan en el servidor.
+"""
+
+import hashlib
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from motor.instrumentacion import etapa
+
+# Por encima de este número de puntos una serie se reduce antes de graficarse
+MAX_PUNTOS: int = 2000
+# Por encima de este número de puntos la caja muestra solo valores atípicos
+MAX_PUNTOS_CAJA: int = 5000
+
+
+def huella_datos(*datos, **parametros) -> str:
+    """Huella BLAKE2 de arreglos, DataFrames y parámetros para usar como clave."""
+    huella = hashlib.blake2b(digest_size=16)
+    for dato in datos:
+        if isinstance(dato, (pd.DataFrame, pd.Series)):
+            huella.update(pd.util.hash_pandas_object(dato, index=True).to_numpy().tobytes())
+            etiquetas = dato.columns if isinstance(dato, pd.DataFrame) else [dato.name]
+            huella.update(repr(list(etiquetas)).encode())
+        elif isinstance(dato, np.ndarray):
+            huella.update(str((dato.dtype, dato.shape)).encode())
+            huella.update(np.ascontiguousarray(dato).tobytes())
+        else:
+            huella.update(pickle.dumps(dato))
+    huella.update(pickle.dumps(sorted(parametros.items())))
+    return huella.hexdigest()
+
+
+class CacheFiguras:
+    """Caché LRU de figuras con contadores de aciertos y fallos.
+
+    Las figuras devueltas se comparten entre llamadas y no deben modificarse.
+    Es segura entre hilos: la app la comparte entre todas las sesiones.
+    """
+
+    def __init__(self, max_entradas: int = 128):
+        self.max_entradas = max_entradas
+        self.figuras: "OrderedDict[str, go.Figure]" = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+        self._cerrojo = threading.Lock()
+
+    def obtener(self, clave: str, constructor: Callable[[], go.Figure]) -> go.Figure:
+        with self._cerrojo:
+            figura = self.figuras.get(clave)
+            if figura is not None:
+                self.aciertos += 1
+                self.figuras.move_to_end(clave)
+                return figura
+            self.fallos += 1
+        # La figura se construye fuera del cerrojo para no bloquear a las demás sesiones
+        figura = constructor()
+        with self._cerrojo:
+            self.figuras[clave] = figura
+            self.figuras.move_to_end(clave)
+            while len(self.figuras) > self.max_entradas:
+                self.figuras.popitem(last=False)
+        return figura
+
+    def figura(self, nombre: str, constructor: Callable[..., go.Figure], *datos, **parametros) -> go.Figure:
+        """Obtiene ``constructor(*datos, **parametros)`` usando su huella como clave."""
+        clave = huella_datos(nombre, *datos, **parametros)
+        return self.obtener(clave, lambda: constructor(*datos, **parametros))
+
+
+def lttb(x: np.ndarray, y: np.ndarray, num_puntos: int) -> np.ndarray:
+    """Índices seleccionados por Largest-Triangle-Three-Buckets.
+
+    Conserva el primer y el último punto; de cada cubeta intermedia elige el
+    punto que forma el triángulo de mayor área con el punto elegido antes y el
+    promedio de la cubeta siguiente.
+    """
+    n = len(y)
+    if num_puntos >= n or num_puntos < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    bordes = np.linspace(1, n - 1, num_puntos - 1).astype(int)
+    seleccion = np.empty(num_puntos, dtype=np.int64)
+    seleccion[0], seleccion[-1] = 0, n - 1
+    anterior = 0
+    for i in range(num_puntos - 2):
+        inicio, fin = bordes[i], bordes[i + 1]
+        siguiente_fin = bordes[i + 2] if i + 2 < len(bordes) else n
+        promedio_x = x[fin:siguiente_fin].mean() if siguiente_fin > fin else x[-1]
+        promedio_y = y[fin:siguiente_fin].mean() if siguiente_fin > fin else y[-1]
+        areas = np.abs(
+            (x[anterior] - promedio_x) * (y[inicio:fin] - y[anterior])
+            - (x[anterior] - x[inicio:fin]) * (promedio_y - y[anterior])
+        )
+        anterior = inicio + int(np.argmax(areas))
+        seleccion[i + 1] = anterior
+    return seleccion
+
+
+def minmax(y: np.ndarray, num_puntos: int) -> np.ndarray:
+    """Índices del mínimo y máximo de cada cubeta (``num_puntos // 2`` cubetas)."""
+    n = len(y)
+    if num_puntos >= n:
+        return np.arange(n)
+    num_cubetas = max(num_puntos // 2, 1)
+    tamaño = int(np.ceil(n / num_cubetas))
+    relleno = np.pad(np.asarray(y, dtype=float), (0, num_cubetas * tamaño - n), constant_values=np.nan)
+    cubetas = relleno.reshape(num_cubetas, tamaño)
+    desplazamiento = np.arange(num_cubetas) * tamaño
+    minimos = np.nanargmin(cubetas, axis=1) + desplazamiento
+    maximos = np.nanargmax(cubetas, axis=1) + desplazamiento
+    return np.unique(np.concatenate([minimos, maximos]))
+
+
+def reducir_serie(
+    x: np.ndarray,
+    y: np.ndarray,
+    max_puntos: int = MAX_PUNTOS,
+    conservar: Optional[np.ndarray] = None,
+    metodo: str = "lttb",
+) -> np.ndarray:
+    """Índices ordenados a graficar; siempre incluye los marcados en ``conservar``."""
+    if len(y) <= max_puntos:
+        indices = np.arange(len(y))
+    elif metodo == "minmax":
+        indices = minmax(y, max_puntos)
+    else:
+        indices = lttb(x, y, max_puntos)
+    if conservar is not None:
+        indices = np.union1d(indices, np.flatnonzero(conservar))
+    return indices
+
+
+def traza_serie(
+    x, y, max_puntos: int = MAX_PUNTOS, conservar: Optional[np.ndarray] = None, **estilo
+) -> go.Scatter:
+    """Traza de línea reducida a ``max_puntos`` (más los puntos a conservar)."""
+    x = np.asarray(x)
+    y = np.asarray(y)
+    indices = reducir_serie(x, y, max_puntos, conservar)
+    return go.Scatter(x=x[indices], y=y[indices], **estilo)
+
+
+def traza_puntos(x, y, max_puntos: int = MAX_PUNTOS, **estilo):
+    """Nube de puntos completa; con muchos puntos se dibuja con WebGL."""
+    clase = go.Scattergl if len(y) > max_puntos else go.Scatter
+    return clase(x=x, y=y, **estilo)
+
+
+def figura_deteccion(
+    dias: np.ndarray,
+    valores: np.ndarray,
+    mascara: np.ndarray,
+    limites_inferiores: np.ndarray,
+    limites_superiores: np.ndarray,
+    base_value: float,
+    tipo_datos: str,
+    limites_variables: bool,
+) -> go.Figure:
+    """Serie con comportamiento normal, anomalías, límites y promedio."""
+    dias = np.asarray(dias)
+    valores = np.asarray(valores, dtype=float)
+    mascara = np.asarray(mascara, dtype=bool)
+    muchos = len(valores) > MAX_PUNTOS
+
+    fig = go.Figure()
+    # Datos normales (reducidos si la serie es larga)
+    fig.add_trace(traza_serie(
+        dias[~mascara], valores[~mascara],
+        mode='lines' if muchos else 'lines+markers',
+        name='Comportamiento Normal',
+        line=dict(color='blue', width=2),
+        marker=dict(size=6)
+    ))
+
+    # Anomalías: nunca se reducen
+    if mascara.any():
+        fig.add_trace(traza_puntos(
+            dias[mascara], valores[mascara],
+            mode='markers',
+            name='Comportamiento Atípico',
+            marker=dict(color='red', size=12, symbol='x', line=dict(width=2))
+        ))
+
+    # Límites
+    if limites_variables:
+        for nombre, limites in [('Lím. Sup.', limites_superiores), ('Lím. Inf.', limites_inferiores)]:
+            if not np.isnan(limites).all():
+                fig.add_trace(traza_serie(
+                    dias, limites, mode='lines', name=nombre, line=dict(color='orange', dash='dash')
+                ))
+    else:
+        limite_superior = float(limites_superiores[0])
+        limite_inferior = float(limites_inferiores[0])
+        fig.add_hline(
+            y=limite_superior,
+            line_dash="dash",
+            line_color="orange",
+            annotation_text=f"Lím. Sup: {limite_superior:,.0f}",
+            annotation_position="bottom right"
+        )
+        fig.add_hline(
+            y=limite_inferior,
+            line_dash="dash",
+            line_color="orange",
+            annotation_text=f"Lím. Inf: {limite_inferior:,.0f}",
+            annotation_position="top right"
+        )
+
+    # Línea de promedio
+    fig.add_hline(
+        y=base_value,
+        line_dash="dot",
+        line_color="green",
+        annotation_text=f"Promedio: {base_value:,.0f}",
+        annotation_position="top left"
+    )
+
+    fig.update_layout(
+        title=f'Detección de Anomalías - {tipo_datos}',
+        xaxis_title='Día',
+        yaxis_title=tipo_datos,
+        hovermode='closest',
+        height=500
+    )
+    return fig
+
+
+def figura_histograma(
+    valores: np.ndarray, limites: Optional[Sequence[float]], base_value: float, num_bins: int = 20
+) -> go.Figure:
+    """Histograma agregado en el servidor: solo se envían los conteos por bin."""
+    valores = np.asarray(valores, dtype=float)
+    conteos, bordes = np.histogram(valores[~np.isnan(valores)], bins=num_bins)
+    fig = go.Figure(go.Bar(
+        x=(bordes[:-1] + bordes[1:]) / 2,
+        y=conteos,
+        width=np.diff(bordes),
+        marker_color='lightblue',
+        name='Frecuencia'
+    ))
+    fig.update_layout(title='Distribución de Frecuencia', xaxis_title='Valor',
+                      yaxis_title='count', bargap=0)
+
+    # Añadir líneas de límites
+    if limites is not None:
+        for limite in limites:
+            fig.add_vline(x=limite, line_dash="dash", line_color="red")
+    fig.add_vline(x=base_value, line_dash="dot", line_color="green")
+    return fig
+
+
+def figura_caja(valores: np.ndarray, mascara: np.ndarray) -> go.Figure:
+    """Diagrama de caja; con muchos puntos se envían solo cuartiles y atípicos."""
+    valores = np.asarray(valores, dtype=float)
+    mascara = np.asarray(mascara, dtype=bool)
+    if len(valores) <= MAX_PUNTOS_CAJA:
+        caja = go.Box(y=valores, boxpoints='all')
+    else:
+        with etapa("percentiles"):
+            q1, mediana, q3 = np.nanpercentile(valores, [25, 50, 75])
+        iqr = q3 - q1
+        dentro = valores[(valores >= q1 - 1.5 * iqr) & (valores <= q3 + 1.5 * iqr)]
+        caja = go.Box(q1=[q1], median=[mediana], q3=[q3],
+                      lowerfence=[dentro.min()], upperfence=[dentro.max()], x=[' '])
+    caja.update(name='', x0=' ', showlegend=False, marker_color='#636efa')
+    fig = go.Figure(caja)
+    fig.update_layout(title='Diagrama de Caja - Detección de Outliers', yaxis_title='Valor')
+
+    # Resaltar anomalías
+    if mascara.any():
+        fig.add_trace(traza_puntos(
+            np.zeros(int(mascara.sum())),
+            valores[mascara],
+            mode='markers',
+            marker=dict(color='red', size=8, symbol='x'),
+            name='Anomalías Detectadas'
+        ))
+    return fig
+
+
+def figura_escenarios(
+    escenarios: Sequence[str],
+    impactos: Sequence[float],
+    recaudaciones: Sequence[float],
+    reforma: str,
+    bandas: Optional[pd.DataFrame] = None,
+) -> go.Figure:
+    """Barras de impacto y línea de recaudación por escenario de una reforma."""
+    fig = go.Figure()
+
+    fig.add_trace(go.Bar(
+        name='Impacto (%)',
+        x=list(escenarios),
+        y=list(impactos),
+        yaxis='y',
+        offsetgroup=1,
+        marker_color=['#FF6B6B', '#4ECDC4', '#45B7D1']
+    ))
+
+    fig.add_trace(go.Scatter(
+        name='Recaudación (M$)',
+        x=list(escenarios),
+        y=list(recaudaciones),
+        yaxis='y2',
+        mode='lines+markers',
+        line=dict(color='#FFE66D', width=3),
+        marker=dict(size=8)
+    ))
+
+    # Bandas Monte Carlo sobre la sensibilidad de los supuestos
+    if bandas is not None:
+        p5, p50, p95 = bandas['Impacto (%)']
+        fig.add_trace(go.Bar(
+            name='Monte Carlo P50 (P5-P95)',
+            x=['Monte Carlo'],
+            y=[p50],
+            yaxis='y',
+            offsetgroup=1,
+            marker_color='#74BEE0',
+            error_y=dict(type='data', symmetric=False, array=[p95 - p50], arrayminus=[p50 - p5])
+        ))
+
+    fig.update_layout(
+        title=f'Comparación de Escenarios - {reforma}',
+        xaxis=dict(title='Escenarios'),
+        yaxis=dict(title='Impacto (%)', side='left'),
+        yaxis2=dict(title='Recaudación Anual (Millones MXN)', side='right', overlaying='y'),
+        showlegend=True
+    )
+    return fig
+
+
+def figura_cronograma(
+    meses: np.ndarray,
+    avance: np.ndarray,
+    escenarios: Sequence[str],
+    fases: Sequence[str],
+    hitos: np.ndarray,
+    reforma: str,
+) -> go.Figure:
+    """Avance hacia el efecto pleno (%) por escenario, con el fin de cada fase marcado."""
+    fig = go.Figure()
+    for s, escenario in enumerate(escenarios):
+        fig.add_trace(go.Scatter(x=meses, y=avance[:, s] * 100, mode='lines', name=escenario))
+
+    # Fases sobre la curva del escenario base, como una sola traza con texto
+    base = list(escenarios).index('Base') if 'Base' in escenarios else 0
+    fig.add_trace(go.Scatter(
+        x=hitos,
+        y=np.interp(hitos, meses, avance[:, base] * 100, left=0),
+        mode='markers+text',
+        text=list(fases),
+        textposition='top left',
+        marker=dict(size=10, color='lightblue', line=dict(width=1, color='gray')),
+        name='Fases'
+    ))
+    fig.update_layout(
+        title=f'Cronograma para: {reforma}',
+        xaxis_title="Meses desde inicio",
+        yaxis_title="% del efecto pleno",
+        yaxis_range=[0, 110]
+    )
+    return fig
+
+
+def figura_acumulado(meses: np.ndarray, acumulado: np.ndarray, escenarios: Sequence[str], reforma: str) -> go.Figure:
+    """Recaudación acumulada (millones MXN) por escenario."""
+    fig = go.Figure()
+    for s, escenario in enumerate(escenarios):
+        fig.add_trace(go.Scatter(x=meses, y=acumulado[:, s], mode='lines', name=escenario))
+    fig.update_layout(
+        title=f'Recaudación Acumulada - {reforma}',
+        xaxis_title="Meses desde inicio",
+        yaxis_title="Millones MXN"
+    )
+    return fig
+
+
+def figura_tornado(df_tornado: pd.DataFrame, reforma: str) -> go.Figure:
+    """Barras horizontales del impacto con cada supuesto en sus extremos."""
+    df = df_tornado[df_tornado['Reforma'] == reforma].iloc[::-1]
+    base = float(df['Impacto Base (%)'].iloc[0])
+    bajo, alto = df.columns[3], df.columns[4]
+    fig = go.Figure()
+    for columna, color in [(bajo, '#FF6B6B'), (alto, '#4ECDC4')]:
+        fig.add_trace(go.Bar(
+            name=columna.replace(' (%)', '').replace('Impacto ', 'Supuesto '),
+            y=df['Supuesto'],
+            x=df[columna] - base,
+            base=base,
+            orientation='h',
+            marker_color=color
+        ))
+    fig.add_vline(x=base, line_dash="dot", line_color="gray")
+    fig.update_layout(
+        title=f'Tornado de Sensibilidad - {reforma}',
+        xaxis_title='Impacto (%)',
+        barmode='overlay',
+        height=350
+    )
+    return fig
+
+
+def _medidor(valor: float, x: Sequence[float], titulo: str, color: str) -> go.Indicator:
+    return go.Indicator(
+        mode="gauge+number+delta",
+        value=valor,
+        domain={'x': list(x), 'y': [0, 1]},
+        title={'text': titulo},
+        delta={'reference': 100},
+        gauge={
+            'axis': {'range': [None, 100]},
+            'bar': {'color': color},
+            'steps': [
+                {'range': [0, 70], 'color': "lightgray"},
+                {'range': [70, 90], 'color': "gray"}],
+            'threshold': {
+                'line': {'color': "red", 'width': 4},
+                'thickness': 0.75,
+                'value': 90}})
+
+
+def figura_medidores(afiliacion: float, recaudacion: float, unidad: str) -> go.Figure:
+    """Medidores de avance (%) de afiliación y recaudación con umbral en 90%."""
+    fig = go.Figure()
+    fig.add_trace(_medidor(afiliacion, [0, 0.5], "Avance Afiliación", "darkblue"))
+    fig.add_trace(_medidor(recaudacion, [0.5, 1], "Avance Recaudación", "darkgreen"))
+    fig.update_layout(title=f'Avance de Metas - {unidad}')
+    return fig
+
+
+def estadisticas_cache(cache: CacheFiguras) -> Dict[str, int]:
+    """Entradas, aciertos y fallos de la caché de figuras."""
+    return {"entradas": len(cache.figuras), "aciertos": cache.aciertos, "fallos": cache.fallos}
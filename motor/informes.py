@@ -0,0 +1,408 @@
+# -*- coding: utf-8 -*-
+"""
+Generación masiva de reportes ejecutivos de avance (HTML, XLSX y PDF).
+
+Se genera un reporte por estado o delegación con sus métricas, medidores y la
+tabla de sus unidades. Todos los reportes comparten una plantilla
+(``string.Template``) y una hoja de estilos, y los medidores SVG se memoizan
+por valor dentro de cada proceso, de modo que los reportes con el mismo avance
+que se renderizan en el mismo proceso reutilizan la misma imagen. Con
+``procesos`` > 1 los reportes se reparten en un ``ProcessPoolExecutor`` (pensado
+para la línea de comandos; desde un servidor con hilos conviene renderizar en
+serie) y las ejecuciones son incrementales: un manifiesto guarda la huella del
+contenido de cada archivo y solo se regeneran los que cambiaron.
+
+XLSX requiere ``openpyxl`` o ``xlsxwriter``; PDF requiere ``weasyprint``.
+
+Uso desde la línea de comandos::
+
+    python -m motor.informes --nivel Estado --salida reportes --formatos html xlsx --procesos 4
+"""
+
+import argparse
+import hashlib
+import html
+import io
+import json
+import math
+import os
+import re
+import string
+import time
+import unicodedata
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from motor.avances import NIVELES, AlmacenAvances
+
+# Cambia la versión al modificar plantilla o estilos para regenerar todos los reportes
+VERSION_PLANTILLA: str = "1"
+FORMATOS: List[str] = ["html", "xlsx", "pdf"]
+MANIFIESTO: str = "manifiesto.json"
+ESTILOS: str = "estilos.css"
+
+CSS = """body { font-family: Arial, Helvetica, sans-serif; margin: 2em; color: #222; }
+h1 { color: #1f4e79; border-bottom: 2px solid #1f4e79; }
+.metricas { display: flex; gap: 2em; margin: 1em 0; }
+.metrica { background: #f3f6f9; padding: 0.8em 1.2em; border-radius: 6px; }
+.metrica span { display: block; font-size: 0.8em; color: #666; }
+.metrica b { font-size: 1.4em; }
+.medidores { display: flex; gap: 2em; }
+table { border-collapse: collapse; width: 100%; margin-top: 1em; font-size: 0.9em; }
+th, td { border: 1px solid #ccc; padding: 4px 8px; text-align: right; }
+th { background: #1f4e79; color: white; }
+td:first-child, th:first-child { text-align: left; }
+.pie { margin-top: 2em; font-size: 0.8em; color: #888; }
+"""
+
+PLANTILLA = string.Template("""<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>Reporte de Avances - $nombre</title>
+<link rel="stylesheet" href="$estilos">
+</head>
+<body>
+<h1>Reporte de Avances - $nombre</h1>
+<p>$nivel</p>
+<div class="metricas">
+<div class="metrica"><span>Meta Afiliación</span><b>$meta_afiliacion</b></div>
+<div class="metrica"><span>Avance Afiliación</span><b>$avance_afiliacion</b></div>
+<div class="metrica"><span>Meta Recaudación</span><b>$meta_recaudacion</b></div>
+<div class="metrica"><span>Avance Recaudación</span><b>$avance_recaudacion</b></div>
+</div>
+<div class="medidores">
+$medidor_afiliacion
+$medidor_recaudacion
+</div>
+<h2>Avance por $nivel_hijos</h2>
+$tabla
+<p class="pie">Subdivisión de Política Fiscal</p>
+</body>
+</html>
+""")
+
+PLANTILLA_INDICE = string.Template("""<!DOCTYPE html>
+<html lang="es">
+<head><meta charset="utf-8"><title>Reportes de Avances</title>
+<link rel="stylesheet" href="$estilos"></head>
+<body>
+<h1>Reportes de Avances por $nivel</h1>
+<ul>
+$enlaces
+</ul>
+</body>
+</html>
+""")
+
+
+def _punto(porcentaje: float, radio: float) -> Tuple[float, float]:
+    """Coordenadas sobre el semicírculo del medidor (0% a la izquierda, 100% a la derecha)."""
+    angulo = math.pi * (1 - min(max(porcentaje, 0), 100) / 100)
+    return 100 + radio * math.cos(angulo), 100 - radio * math.sin(angulo)
+
+
+def _arco(desde: float, hasta: float, color: str, grosor: float = 18) -> str:
+    (x0, y0), (x1, y1) = _punto(desde, 80), _punto(hasta, 80)
+    return (f'<path d="M {x0:.2f},{y0:.2f} A 80 80 0 0 1 {x1:.2f},{y1:.2f}" '
+            f'stroke="{color}" stroke-width="{grosor}" fill="none"/>')
+
+
+@lru_cache(maxsize=4096)
+def medidor_svg(porcentaje: float, titulo: str, color: str) -> str:
+    """Medidor semicircular SVG con los rangos de la sección (70, 90 y umbral en 90%).
+
+    Se memoiza por valor, así que ``porcentaje`` debe redondearse antes. La
+    memoria es de cada proceso: los trabajadores del pool no la comparten.
+    """
+    sin_dato = math.isnan(porcentaje)
+    barra = _arco(0, porcentaje, color, 10) if not sin_dato and porcentaje > 0 else ""
+    (x0, y0), (x1, y1) = _punto(90, 68), _punto(90, 92)
+    return (
+        '<svg xmlns="http://www.w3.org/2000/svg" width="220" height="140" viewBox="0 0 200 130">'
+        f'<text x="100" y="14" text-anchor="middle" font-size="12">{html.escape(titulo)}</text>'
+        f'{_arco(0, 70, "lightgray")}{_arco(70, 90, "gray")}{_arco(90, 100, "lightgray")}{barra}'
+        f'<line x1="{x0:.2f}" y1="{y0:.2f}" x2="{x1:.2f}" y2="{y1:.2f}" stroke="red" stroke-width="3"/>'
+        f'<text x="100" y="100" text-anchor="middle" font-size="22" font-weight="bold">'
+        f'{"—" if sin_dato else f"{porcentaje:.1f}%"}</text>'
+        '</svg>'
+    )
+
+
+def nombre_archivo(nombre: str) -> str:
+    """Nombre de archivo ASCII a partir del nombre de la unidad."""
+    ascii_ = unicodedata.normalize("NFKD", nombre).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]+", "-", ascii_.lower()).strip("-")
+
+
+def contenidos(almacen: AlmacenAvances, nivel: str = "Estado") -> List[Dict]:
+    """Datos de cada reporte de ``nivel``: su fila y la tabla de unidades del nivel inferior."""
+    inferior = NIVELES[NIVELES.index(nivel) - 1]
+    tabla = almacen.tabla(nivel)
+    hijos = almacen.tabla(inferior)
+    resultado = []
+    for fila in tabla.to_dict("records"):
+        nombre = fila[nivel]
+        detalle = hijos[hijos[nivel] == nombre].drop(columns=[c for c in NIVELES if c in hijos and c != inferior])
+        resultado.append({
+            "nombre": nombre,
+            "nivel": nivel,
+            "nivel_hijos": inferior,
+            "fila": fila,
+            "hijos": detalle.to_dict("records"),
+        })
+    return resultado
+
+
+def huella_contenido(contenido: Dict, formato: str) -> str:
+    """Huella del contenido, el formato y la versión de la plantilla."""
+    texto = json.dumps(contenido, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(f"{VERSION_PLANTILLA}|{formato}|{texto}".encode()).hexdigest()
+
+
+def _cifra(valor: float, prefijo: str = "") -> str:
+    return "—" if pd.isna(valor) else f"{prefijo}{valor:,.0f}"
+
+
+def _tabla_html(registros: Sequence[Dict]) -> str:
+    if not registros:
+        return "<p>Sin unidades.</p>"
+    columnas = list(registros[0])
+    encabezado = "".join(f"<th>{html.escape(c)}</th>" for c in columnas)
+    filas = []
+    for registro in registros:
+        celdas = []
+        for columna in columnas:
+            valor = registro[columna]
+            if isinstance(valor, str):
+                texto = html.escape(valor)
+            elif columna.startswith("%"):
+                texto = "—" if pd.isna(valor) else f"{valor:.1f}%"
+            else:
+                texto = _cifra(valor, "$" if "MXN" in columna else "")
+            celdas.append(f"<td>{texto}</td>")
+        filas.append(f"<tr>{''.join(celdas)}</tr>")
+    return f"<table><tr>{encabezado}</tr>{''.join(filas)}</table>"
+
+
+def _porcentaje(valor: float) -> float:
+    return float("nan") if pd.isna(valor) else round(float(valor), 1)
+
+
+def documento_html(contenido: Dict, estilos: str = ESTILOS) -> str:
+    """Reporte HTML con la plantilla compartida."""
+    fila = contenido["fila"]
+    return PLANTILLA.substitute(
+        nombre=html.escape(contenido["nombre"]),
+        nivel=html.escape(contenido["nivel"]),
+        nivel_hijos=html.escape(contenido["nivel_hijos"].lower()),
+        estilos=estilos,
+        meta_afiliacion=_cifra(fila["Meta Afiliación"]),
+        avance_afiliacion=_cifra(fila["Avance Afiliación"]),
+        meta_recaudacion=_cifra(fila["Meta Recaudación (MXN)"], "$"),
+        avance_recaudacion=_cifra(fila["Avance Recaudación (MXN)"], "$"),
+        medidor_afiliacion=medidor_svg(_porcentaje(fila["% Avance Afiliación"]), "Avance Afiliación", "darkblue"),
+        medidor_recaudacion=medidor_svg(_porcentaje(fila["% Avance Recaudación"]), "Avance Recaudación", "darkgreen"),
+        tabla=_tabla_html(contenido["hijos"]),
+    )
+
+
+def _motor_excel() -> str:
+    for motor_excel in ("openpyxl", "xlsxwriter"):
+        try:
+            __import__(motor_excel)
+            return motor_excel
+        except ImportError:
+            continue
+    raise ImportError("Se requiere openpyxl o xlsxwriter para generar reportes XLSX")
+
+
+def _weasyprint():
+    try:
+        import weasyprint
+    except ImportError as error:
+        raise ImportError("Se requiere weasyprint para generar reportes PDF") from error
+    return weasyprint
+
+
+_VERIFICADORES = {"html": lambda: None, "xlsx": _motor_excel, "pdf": _weasyprint}
+
+
+def formatos_disponibles() -> List[str]:
+    """Formatos cuyas dependencias opcionales están instaladas."""
+    disponibles = []
+    for formato, verificar in _VERIFICADORES.items():
+        try:
+            verificar()
+            disponibles.append(formato)
+        except ImportError:
+            pass
+    return disponibles
+
+
+def _renderizar(tarea) -> str:
+    """Escribe un reporte; se ejecuta en los procesos del pool."""
+    contenido, formato, ruta = tarea
+    if formato == "html":
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            archivo.write(documento_html(contenido))
+    elif formato == "xlsx":
+        with pd.ExcelWriter(ruta, engine=_motor_excel()) as escritor:
+            pd.DataFrame([contenido["fila"]]).to_excel(escritor, sheet_name="Resumen", index=False)
+            pd.DataFrame(contenido["hijos"]).to_excel(escritor, sheet_name=contenido["nivel_hijos"][:31], index=False)
+    elif formato == "pdf":
+        # Estilos incrustados: el PDF no depende del archivo CSS
+        documento = documento_html(contenido).replace(
+            f'<link rel="stylesheet" href="{ESTILOS}">', f"<style>{CSS}</style>"
+        )
+        _weasyprint().HTML(string=documento).write_pdf(ruta)
+    else:
+        raise ValueError(f"Formato no soportado: {formato}")
+    return ruta
+
+
+@dataclass
+class ResumenInformes:
+    """Resultado de una ejecución: archivos regenerados, omitidos y tiempo."""
+
+    carpeta: str
+    generados: List[str] = field(default_factory=list)
+    omitidos: List[str] = field(default_factory=list)
+    segundos: float = 0.0
+
+    @property
+    def archivos(self) -> List[str]:
+        """Rutas de todos los reportes vigentes de la ejecución."""
+        return sorted(os.path.join(self.carpeta, a) for a in self.generados + self.omitidos)
+
+
+def _escribir_si_cambia(ruta: str, texto: str) -> None:
+    if os.path.exists(ruta):
+        with open(ruta, encoding="utf-8") as archivo:
+            if archivo.read() == texto:
+                return
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        archivo.write(texto)
+
+
+def generar_informes(
+    almacen: AlmacenAvances,
+    salida: str,
+    nivel: str = "Estado",
+    formatos: Sequence[str] = ("html",),
+    procesos: Optional[int] = None,
+    forzar: bool = False,
+) -> ResumenInformes:
+    """Genera un reporte por unidad de ``nivel`` en cada formato, solo si cambió.
+
+    Con ``procesos`` > 1 los reportes se reparten en un ``ProcessPoolExecutor``.
+    Los archivos quedan en ``salida/<nivel>/`` con su manifiesto y estilos;
+    ``forzar`` ignora el manifiesto y regenera todo.
+    """
+    inicio = time.perf_counter()
+    for formato in formatos:
+        if formato not in _VERIFICADORES:
+            raise ValueError(f"Formato no soportado: {formato}")
+        _VERIFICADORES[formato]()  # falla antes de generar nada si falta la dependencia
+    salida = os.path.join(salida, nombre_archivo(nivel))
+    os.makedirs(salida, exist_ok=True)
+    ruta_manifiesto = os.path.join(salida, MANIFIESTO)
+    manifiesto: Dict[str, str] = {}
+    if os.path.exists(ruta_manifiesto) and not forzar:
+        with open(ruta_manifiesto, encoding="utf-8") as archivo:
+            manifiesto = json.load(archivo)
+
+    resumen = ResumenInformes(salida)
+    tareas, huellas = [], {}
+    datos = contenidos(almacen, nivel)
+    for formato in formatos:
+        for contenido in datos:
+            archivo = f"{nombre_archivo(contenido['nombre'])}.{formato}"
+            huella = huella_contenido(contenido, formato)
+            huellas[archivo] = huella
+            if manifiesto.get(archivo) == huella and os.path.exists(os.path.join(salida, archivo)):
+                resumen.omitidos.append(archivo)
+            else:
+                tareas.append((contenido, formato, os.path.join(salida, archivo)))
+
+    # Recursos compartidos: una sola hoja de estilos y un índice
+    _escribir_si_cambia(os.path.join(salida, ESTILOS), CSS)
+    enlaces = "\n".join(
+        f'<li><a href="{nombre_archivo(c["nombre"])}.html">{html.escape(c["nombre"])}</a></li>' for c in datos
+    )
+    if "html" in formatos:
+        _escribir_si_cambia(os.path.join(salida, "index.html"),
+                            PLANTILLA_INDICE.substitute(estilos=ESTILOS, nivel=html.escape(nivel), enlaces=enlaces))
+
+    if procesos and procesos > 1 and len(tareas) > 1:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            rutas = list(pool.map(_renderizar, tareas, chunksize=max(len(tareas) // (procesos * 4), 1)))
+    else:
+        rutas = [_renderizar(tarea) for tarea in tareas]
+    resumen.generados = [os.path.basename(ruta) for ruta in rutas]
+
+    # Se escribe a un temporal y se reemplaza para no dejar un manifiesto a medias
+    temporal = ruta_manifiesto + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as archivo:
+        json.dump({**manifiesto, **huellas}, archivo, indent=1, sort_keys=True)
+    os.replace(temporal, ruta_manifiesto)
+
+    resumen.segundos = time.perf_counter() - inicio
+    return resumen
+
+
+def empaquetar(resumen: ResumenInformes) -> bytes:
+    """ZIP en memoria con los reportes de la ejecución y sus recursos compartidos."""
+    extras = [os.path.join(resumen.carpeta, a) for a in (ESTILOS, "index.html")]
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archivo_zip:
+        for ruta in resumen.archivos + [r for r in extras if os.path.exists(r)]:
+            archivo_zip.write(ruta, os.path.basename(ruta))
+    return buffer.getvalue()
+
+
+def _almacen_cli(datos: Optional[str], semilla: int) -> AlmacenAvances:
+    if datos:
+        from motor.carga import cargar_series
+        registros = cargar_series(datos).reportes()
+    else:
+        from motor.datos import generar_reportes
+        registros = generar_reportes(semilla)
+    return AlmacenAvances.desde_registros(
+        registros["estados"],
+        registros["meta_afiliacion"],
+        registros["avance_afiliacion"],
+        registros["meta_recaudacion"],
+        registros["avance_recaudacion"],
+        registros.get("delegaciones"),
+        registros.get("subdelegaciones"),
+    )
+
+
+def main(argumentos: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Genera reportes de avance por estado o delegación.")
+    parser.add_argument("--nivel", choices=["Estado", "Delegación"], default="Estado")
+    parser.add_argument("--salida", default="reportes", help="Carpeta de salida (se reutiliza entre ejecuciones)")
+    parser.add_argument("--formatos", nargs="+", choices=FORMATOS, default=["html"])
+    parser.add_argument("--procesos", type=int, default=os.cpu_count())
+    parser.add_argument("--datos", help="Archivo CSV/Parquet/Arrow con datos reales (ver motor.carga)")
+    parser.add_argument("--semilla", type=int, default=2024, help="Semilla de los datos sintéticos")
+    parser.add_argument("--forzar", action="store_true", help="Regenera todos los reportes")
+    args = parser.parse_args(argumentos)
+
+    almacen = _almacen_cli(args.datos, args.semilla)
+    try:
+        resumen = generar_informes(almacen, args.salida, args.nivel, args.formatos, args.procesos, args.forzar)
+    except ImportError as error:
+        parser.error(str(error))
+    print(f"{len(resumen.generados)} reportes generados, {len(resumen.omitidos)} sin cambios "
+          f"en {resumen.segundos:.2f} s -> {os.path.abspath(resumen.carpeta)}")
+
+
+if __name__ == "__main__":
+    main()
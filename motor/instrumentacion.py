@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""
+Instrumentación de tiempos por sección y etapa.
+
+Cada medición se guarda con su sesión, sección y etapa en una ventana móvil
+(las últimas ``VENTANA`` muestras) de la que se obtienen p50 y p95, además de
+contadores acumulados de número y suma para exportar en formato Prometheus.
+La sección y la sesión vigentes se guardan en variables de contexto, de modo
+que el código de ``motor`` puede marcar sus etapas con ``etapa("...")`` sin
+recibirlas como parámetro. El registro es del proceso y seguro entre hilos.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Deque, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+VENTANA: int = 500
+MAX_SESIONES: int = 200
+SECCION_GENERAL: str = "General"
+
+_seccion: ContextVar[str] = ContextVar("seccion", default=SECCION_GENERAL)
+_sesion: ContextVar[str] = ContextVar("sesion", default="-")
+
+Clave = Tuple[str, str, str]  # (sesión, sección, etapa)
+
+
+class _Serie:
+    """Ventana móvil de una medida con contadores acumulados."""
+
+    __slots__ = ("ventana", "cuenta", "suma")
+
+    def __init__(self, tamaño: int):
+        self.ventana: Deque[float] = deque(maxlen=tamaño)
+        self.cuenta = 0
+        self.suma = 0.0
+
+    def agregar(self, valor: float) -> None:
+        self.ventana.append(valor)
+        self.cuenta += 1
+        self.suma += valor
+
+
+class Instrumentacion:
+    """Tiempos (segundos) y tamaños (bytes) por sesión, sección y etapa."""
+
+    def __init__(self, ventana: int = VENTANA, max_sesiones: int = MAX_SESIONES):
+        self.ventana = ventana
+        self.max_sesiones = max_sesiones
+        self._tiempos: Dict[Clave, _Serie] = {}
+        self._bytes: Dict[Clave, _Serie] = {}
+        self._sesiones: "OrderedDict[str, None]" = OrderedDict()
+        self._cerrojo = threading.Lock()
+
+    def _clave(self, etapa: str) -> Clave:
+        return _sesion.get(), _seccion.get(), etapa
+
+    def _agregar(self, destino: Dict[Clave, _Serie], clave: Clave, valor: float) -> None:
+        with self._cerrojo:
+            sesion = clave[0]
+            self._sesiones[sesion] = None
+            self._sesiones.move_to_end(sesion)
+            # Se descartan las sesiones más antiguas para acotar la memoria
+            while len(self._sesiones) > self.max_sesiones:
+                vieja, _ = self._sesiones.popitem(last=False)
+                for registro in (self._tiempos, self._bytes):
+                    for k in [k for k in registro if k[0] == vieja]:
+                        del registro[k]
+            serie = destino.get(clave)
+            if serie is None:
+                serie = destino[clave] = _Serie(self.ventana)
+            serie.agregar(valor)
+
+    def registrar(self, etapa: str, segundos: float) -> None:
+        self._agregar(self._tiempos, self._clave(etapa), segundos)
+
+    def registrar_bytes(self, etapa: str, num_bytes: int) -> None:
+        self._agregar(self._bytes, self._clave(etapa), float(num_bytes))
+
+    @contextmanager
+    def etapa(self, nombre: str) -> Iterator[None]:
+        """Mide el bloque como la etapa ``nombre`` de la sección vigente."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar(nombre, time.perf_counter() - inicio)
+
+    @contextmanager
+    def seccion(self, nombre: str, sesion: Optional[str] = None) -> Iterator[None]:
+        """Fija la sección (y sesión) vigentes y mide el bloque como su etapa ``total``."""
+        token_seccion = _seccion.set(nombre)
+        token_sesion = _sesion.set(sesion) if sesion is not None else None
+        try:
+            with self.etapa("total"):
+                yield
+        finally:
+            _seccion.reset(token_seccion)
+            if token_sesion is not None:
+                _sesion.reset(token_sesion)
+
+    def resumen(self, sesion: Optional[str] = None) -> pd.DataFrame:
+        """p50/p95 (ms) y tamaño mediano por sección y etapa; todas las sesiones si ``sesion`` es ``None``."""
+        with self._cerrojo:
+            tiempos = {k: list(s.ventana) for k, s in self._tiempos.items() if sesion is None or k[0] == sesion}
+            tamaños = {k: list(s.ventana) for k, s in self._bytes.items() if sesion is None or k[0] == sesion}
+        agrupados: Dict[Tuple[str, str], Dict[str, list]] = {}
+        for origen, datos in (("tiempos", tiempos), ("bytes", tamaños)):
+            for (_, seccion, etapa), valores in datos.items():
+                agrupados.setdefault((seccion, etapa), {"tiempos": [], "bytes": []})[origen].extend(valores)
+
+        filas = []
+        for (seccion, etapa), valores in sorted(agrupados.items()):
+            t = np.asarray(valores["tiempos"]) * 1000
+            b = np.asarray(valores["bytes"])
+            filas.append({
+                "Sección": seccion,
+                "Etapa": etapa,
+                "Muestras": len(t),
+                "p50 (ms)": float(np.percentile(t, 50)) if len(t) else np.nan,
+                "p95 (ms)": float(np.percentile(t, 95)) if len(t) else np.nan,
+                "Bytes (p50)": float(np.median(b)) if len(b) else np.nan,
+            })
+        columnas = ["Sección", "Etapa", "Muestras", "p50 (ms)", "p95 (ms)", "Bytes (p50)"]
+        return pd.DataFrame(filas, columns=columnas)
+
+    def a_json(self) -> str:
+        """Ventanas y contadores de todas las claves."""
+        with self._cerrojo:
+            def volcar(registro):
+                return [
+                    {"sesion": k[0], "seccion": k[1], "etapa": k[2], "cuenta": s.cuenta,
+                     "suma": s.suma, "ventana": list(s.ventana)}
+                    for k, s in registro.items()
+                ]
+            contenido = {"generado": time.time(), "tiempos": volcar(self._tiempos), "bytes": volcar(self._bytes)}
+        return json.dumps(contenido, ensure_ascii=False)
+
+    def a_prometheus(self) -> str:
+        """Formato de texto de Prometheus, agregado sobre sesiones (p50/p95 de la ventana)."""
+        resumen = self.resumen()
+        with self._cerrojo:
+            acumulados: Dict[Tuple[str, str], list] = {}
+            for (_, seccion, etapa), s in self._tiempos.items():
+                total = acumulados.setdefault((seccion, etapa), [0, 0.0])
+                total[0] += s.cuenta
+                total[1] += s.suma
+
+        def etiquetas(seccion: str, etapa: str, extra: str = "") -> str:
+            limpio = [v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for v in (seccion, etapa)]
+            return f'{{seccion="{limpio[0]}",etapa="{limpio[1]}"{extra}}}'
+
+        lineas = [
+            "# HELP simulador_etapa_segundos Duración por sección y etapa (cuantiles de la ventana móvil).",
+            "# TYPE simulador_etapa_segundos summary",
+        ]
+        for fila in resumen.to_dict("records"):
+            seccion, nombre = fila["Sección"], fila["Etapa"]
+            if not fila["Muestras"]:
+                continue
+            for cuantil, columna in (("0.5", "p50 (ms)"), ("0.95", "p95 (ms)")):
+                extra = f',quantile="{cuantil}"'
+                lineas.append(f"simulador_etapa_segundos{etiquetas(seccion, nombre, extra)} {fila[columna] / 1000:.9f}")
+            cuenta, suma = acumulados[(seccion, nombre)]
+            lineas.append(f"simulador_etapa_segundos_sum{etiquetas(seccion, nombre)} {suma:.9f}")
+            lineas.append(f"simulador_etapa_segundos_count{etiquetas(seccion, nombre)} {cuenta}")
+        lineas += [
+            "# HELP simulador_grafica_bytes Tamaño mediano de la figura serializada.",
+            "# TYPE simulador_grafica_bytes gauge",
+        ]
+        for fila in resumen.dropna(subset=["Bytes (p50)"]).to_dict("records"):
+            lineas.append(f"simulador_grafica_bytes{etiquetas(fila['Sección'], fila['Etapa'])} {fila['Bytes (p50)']:.0f}")
+        return "\n".join(lineas) + "\n"
+
+    def exportar(self, carpeta: str) -> Tuple[str, str]:
+        """Escribe ``metricas.json`` y ``metricas.prom`` en ``carpeta``; devuelve sus rutas."""
+        os.makedirs(carpeta, exist_ok=True)
+        rutas = []
+        for nombre, contenido in (("metricas.json", self.a_json()), ("metricas.prom", self.a_prometheus())):
+            ruta = os.path.join(carpeta, nombre)
+            temporal = ruta + ".tmp"
+            with open(temporal, "w", encoding="utf-8") as archivo:
+                archivo.write(contenido)
+            os.replace(temporal, ruta)
+            rutas.append(ruta)
+        return rutas[0], rutas[1]
+
+    def limpiar(self) -> None:
+        with self._cerrojo:
+            self._tiempos.clear()
+            self._bytes.clear()
+            self._sesiones.clear()
+
+
+# Registro compartido por todo el proceso
+INSTRUMENTACION = Instrumentacion()
+
+
+def etapa(nombre: str):
+    """Atajo de ``INSTRUMENTACION.etapa`` para marcar etapas dentro de ``motor``."""
+    return INSTRUMENTACION.etapa(nombre)
+
+
+def medir(nombre: str):
+    """Decorador que mide cada llamada como la etapa ``nombre``."""
+    def decorador(funcion):
+        @wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with INSTRUMENTACION.etapa(nombre):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
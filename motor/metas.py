@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+Cálculos de la sección Metas Desempeño: meta propuesta y riesgo trimestral.
+
+El cumplimiento se simula por trayectorias estocásticas en espacio
+logarítmico. Cada trimestre la unidad mejora (crece en afiliación o
+recaudación, reduce tiempos en eficiencia) una fracción aleatoria
+``N(μ, σ)``; la meta trimestral sigue la ruta geométrica de la base a la meta
+final, de modo que
+
+    cumplimiento[q] = 100 · exp(Σ_{k≤q} mejora[k] − τ · q)
+
+con ``τ`` la mejora trimestral que exige la meta. Todas las unidades y
+trayectorias se simulan en arreglos ``(unidades, trayectorias, trimestres)``
+por lotes de tamaño acotado.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from motor.instrumentacion import etapa
+
+TIPOS_META: List[str] = ["Afiliación", "Recaudación", "Eficiencia Operativa"]
+TRIMESTRES: List[str] = ["Q1", "Q2", "Q3", "Q4"]
+NUM_TRIMESTRES: int = len(TRIMESTRES)
+UMBRAL_RIESGO: float = 90
+PERCENTILES: Tuple[float, ...] = (5, 50, 95)
+
+# Mejora anual esperada (fracción) y volatilidad trimestral de la mejora en log por tipo
+TENDENCIA_META: Dict[str, float] = {
+    "Afiliación": 0.12,
+    "Recaudación": 0.10,
+    "Eficiencia Operativa": 0.15,
+}
+VOLATILIDAD_META: Dict[str, float] = {
+    "Afiliación": 0.04,
+    "Recaudación": 0.06,
+    "Eficiencia Operativa": 0.08,
+}
+
+# Elementos (unidades × trayectorias × trimestres) por lote
+TAMAÑO_LOTE: int = 8_000_000
+
+
+def calcular_meta(tipo_meta: str, meta_base: float, porcentaje: float) -> float:
+    """Calcula la meta final a partir de la base y el porcentaje del slider.
+
+    Para afiliación y recaudación el porcentaje es crecimiento; para eficiencia
+    operativa es la reducción esperada del tiempo promedio. Acepta arreglos.
+    """
+    if tipo_meta == "Eficiencia Operativa":
+        return meta_base * (1 - porcentaje / 100)
+    return meta_base * (1 + porcentaje / 100)
+
+
+def trimestres_en_riesgo(cumplimiento: Sequence[float], umbral: float = UMBRAL_RIESGO) -> Union[int, np.ndarray]:
+    """Cuenta los trimestres con cumplimiento (%) por debajo del umbral.
+
+    Con un arreglo de varias dimensiones cuenta sobre el último eje.
+    """
+    conteo = np.count_nonzero(np.asarray(cumplimiento) < umbral, axis=-1)
+    return int(conteo) if np.ndim(conteo) == 0 else conteo
+
+
+def mejora_logaritmica(tipo_meta: Union[str, Sequence[str]], fraccion) -> np.ndarray:
+    """Mejora anual en log: ``log(1 + f)`` para crecimiento y ``−log(1 − f)`` para reducción."""
+    fraccion = np.asarray(fraccion, dtype=float)
+    reduccion = np.asarray(tipo_meta) == "Eficiencia Operativa"
+    return np.where(reduccion, -np.log1p(-np.minimum(fraccion, 0.999)), np.log1p(fraccion))
+
+
+@dataclass
+class ResultadoCumplimiento:
+    """Resumen por unidad de las trayectorias simuladas.
+
+    ``riesgo_trimestre`` es la probabilidad de quedar bajo el umbral en cada
+    trimestre y ``percentiles`` el cumplimiento (%) con forma
+    ``(unidades, len(PERCENTILES), trimestres)``.
+    """
+
+    probabilidad: np.ndarray
+    trimestres_riesgo: np.ndarray
+    riesgo_trimestre: np.ndarray
+    percentiles: np.ndarray
+    num_trayectorias: int
+
+
+def simular_cumplimiento(
+    tipo_meta: Union[str, Sequence[str]],
+    porcentaje,
+    num_trayectorias: int = 2000,
+    semilla: int = 2024,
+    tendencia=None,
+    volatilidad=None,
+    umbral: float = UMBRAL_RIESGO,
+    tamaño_lote: int = TAMAÑO_LOTE,
+) -> ResultadoCumplimiento:
+    """Probabilidad de alcanzar la meta final y trimestres en riesgo esperados por unidad.
+
+    ``tipo_meta``, ``porcentaje`` (%) y, opcionalmente, ``tendencia`` (mejora
+    anual, fracción) y ``volatilidad`` se difunden a la forma ``(unidades,)``;
+    sin ``tendencia``/``volatilidad`` se usan las del tipo de meta. Cada lote
+    de unidades recibe su semilla derivada con ``np.random.SeedSequence``.
+    """
+    tipos = np.asarray(tipo_meta)
+    porcentaje = np.asarray(porcentaje, dtype=float)
+    forma = np.broadcast_shapes(tipos.shape, porcentaje.shape,
+                                np.shape(tendencia) if tendencia is not None else (),
+                                np.shape(volatilidad) if volatilidad is not None else ())
+    tipos = np.broadcast_to(tipos, forma).ravel()
+
+    def por_unidad(valores, predeterminados: Dict[str, float]) -> np.ndarray:
+        if valores is None:
+            return pd.Series(tipos).map(predeterminados).to_numpy(dtype=float)
+        return np.broadcast_to(np.asarray(valores, dtype=float), forma).ravel()
+
+    exigida = mejora_logaritmica(tipos, np.broadcast_to(porcentaje, forma).ravel() / 100) / NUM_TRIMESTRES
+    media = mejora_logaritmica(tipos, por_unidad(tendencia, TENDENCIA_META)) / NUM_TRIMESTRES
+    sigma = por_unidad(volatilidad, VOLATILIDAD_META)
+    # La diferencia con la ruta exigida es lo único que importa: se simula ya centrada
+    deriva = (media - exigida).astype(np.float32)
+    sigma = sigma.astype(np.float32)
+
+    n = deriva.size
+    por_lote = max(tamaño_lote // (num_trayectorias * NUM_TRIMESTRES), 1)
+    inicios = range(0, n, por_lote)
+    semillas = np.random.SeedSequence(semilla).spawn(len(inicios))
+
+    probabilidad = np.empty(n)
+    riesgo_trimestre = np.empty((n, NUM_TRIMESTRES))
+    percentiles = np.empty((n, len(PERCENTILES), NUM_TRIMESTRES))
+    # Las comparaciones y percentiles se hacen en log: exp es monótona
+    log_umbral = np.float32(np.log(umbral / 100))
+    for inicio, semilla_lote in zip(inicios, semillas):
+        lote = slice(inicio, min(inicio + por_lote, n))
+        rng = np.random.default_rng(semilla_lote)
+        brecha = rng.standard_normal((lote.stop - lote.start, num_trayectorias, NUM_TRIMESTRES), dtype=np.float32)
+        brecha *= sigma[lote, None, None]
+        brecha += deriva[lote, None, None]
+        np.cumsum(brecha, axis=2, out=brecha)
+
+        probabilidad[lote] = np.count_nonzero(brecha[:, :, -1] >= 0, axis=1) / num_trayectorias
+        riesgo_trimestre[lote] = np.count_nonzero(brecha < log_umbral, axis=1) / num_trayectorias
+        with etapa("percentiles"):
+            percentiles[lote] = np.moveaxis(np.percentile(brecha, PERCENTILES, axis=1), 0, 1)
+
+    return ResultadoCumplimiento(
+        probabilidad=probabilidad.reshape(forma),
+        # Valor esperado de la suma = suma de las probabilidades por trimestre
+        trimestres_riesgo=riesgo_trimestre.sum(axis=1).reshape(forma),
+        riesgo_trimestre=riesgo_trimestre.reshape(forma + (NUM_TRIMESTRES,)),
+        percentiles=(100 * np.exp(percentiles)).reshape(forma + (len(PERCENTILES), NUM_TRIMESTRES)),
+        num_trayectorias=num_trayectorias,
+    )
+
+
+def metas_unidades(
+    unidades: pd.DataFrame,
+    porcentajes: Dict[str, float],
+    num_trayectorias: int = 2000,
+    semilla: int = 2024,
+    umbral: float = UMBRAL_RIESGO,
+) -> pd.DataFrame:
+    """Meta final, probabilidad de cumplirla y trimestres en riesgo de cada unidad.
+
+    ``unidades`` trae las columnas ``Tipo``, ``Base`` y ``Tendencia (%)``;
+    ``porcentajes`` es el crecimiento o reducción (%) propuesto por tipo.
+    """
+    tipos = unidades["Tipo"].to_numpy()
+    porcentaje = unidades["Tipo"].map(porcentajes).to_numpy(dtype=float)
+    base = unidades["Base"].to_numpy(dtype=float)
+    resultado = simular_cumplimiento(
+        tipos, porcentaje, num_trayectorias, semilla,
+        tendencia=unidades["Tendencia (%)"].to_numpy(dtype=float) / 100, umbral=umbral,
+    )
+    reduccion = tipos == "Eficiencia Operativa"
+    df = unidades.copy()
+    df["Meta Final"] = np.where(reduccion, base * (1 - porcentaje / 100), base * (1 + porcentaje / 100))
+    df["Probabilidad de Cumplir (%)"] = resultado.probabilidad * 100
+    df["Trimestres en Riesgo (esperados)"] = resultado.trimestres_riesgo
+    return df
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""
+Simulación Monte Carlo de proyecciones presupuestales y de impacto de reformas.
+
+Las trayectorias se generan en lotes vectorizados y cada lote se resume en un
+histograma acumulado por columna (año), por lo que la memoria depende del
+tamaño de lote y no del número total de trayectorias. Los lotes pueden
+repartirse en un ``ProcessPoolExecutor``; cada uno recibe su propia semilla
+derivada con ``np.random.SeedSequence`` para que el resultado sea reproducible
+sin importar el número de procesos.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from motor.instrumentacion import medir
+from motor.presupuesto import AÑO_INICIAL
+from motor.reformas import RECAUDACION_BASE
+
+PERCENTILES: Tuple[float, ...] = (5, 50, 95)
+
+TAMAÑO_LOTE: int = 20000
+NUM_BINS: int = 2048
+
+
+@dataclass(frozen=True)
+class Distribucion:
+    """Distribución de muestreo para un supuesto (en puntos porcentuales).
+
+    ``tipo`` puede ser ``"normal"`` (media, desviación), ``"uniforme"``
+    (mínimo, máximo), ``"triangular"`` (mínimo, moda, máximo) o ``"fija"``
+    (valor).
+    """
+
+    tipo: str
+    parametros: Tuple[float, ...]
+
+    def muestrear(self, rng: np.random.Generator, tamaño) -> np.ndarray:
+        if self.tipo == "normal":
+            return rng.normal(*self.parametros, size=tamaño)
+        if self.tipo == "uniforme":
+            return rng.uniform(*self.parametros, size=tamaño)
+        if self.tipo == "triangular":
+            return rng.triangular(*self.parametros, size=tamaño)
+        if self.tipo == "fija":
+            return np.full(tamaño, self.parametros[0], dtype=float)
+        raise ValueError(f"Tipo de distribución no soportado: {self.tipo}")
+
+
+class HistogramaAcumulado:
+    """Histograma por columna que acumula lotes para estimar percentiles.
+
+    Los valores fuera de ``[inferior, superior]`` se asignan al bin extremo, de
+    modo que los percentiles centrales (P5-P95) no se ven afectados.
+    """
+
+    def __init__(self, inferior: np.ndarray, superior: np.ndarray, num_bins: int = NUM_BINS):
+        self.inferior = np.asarray(inferior, dtype=float)
+        self.superior = np.asarray(superior, dtype=float)
+        self.num_bins = num_bins
+        self.conteos = np.zeros((self.inferior.size, num_bins), dtype=np.int64)
+
+    @classmethod
+    def desde_piloto(cls, piloto: np.ndarray, holgura: float = 0.5, num_bins: int = NUM_BINS):
+        """Define los rangos por columna a partir de un lote piloto ampliado."""
+        minimo = np.nanmin(piloto, axis=0)
+        maximo = np.nanmax(piloto, axis=0)
+        margen = np.maximum((maximo - minimo) * holgura, 1e-9)
+        return cls(minimo - margen, maximo + margen, num_bins)
+
+    def agregar(self, valores: np.ndarray) -> None:
+        """Acumula un lote ``(trayectorias, columnas)`` en una sola llamada a ``bincount``."""
+        self.conteos += self.contar(valores)
+
+    def contar(self, valores: np.ndarray) -> np.ndarray:
+        ancho = (self.superior - self.inferior) / self.num_bins
+        bins = np.floor((valores - self.inferior) / ancho).astype(np.int64)
+        np.clip(bins, 0, self.num_bins - 1, out=bins)
+        bins += np.arange(self.inferior.size) * self.num_bins
+        conteos = np.bincount(bins.ravel(), minlength=self.conteos.size)
+        return conteos.reshape(self.conteos.shape)
+
+    @property
+    def total(self) -> int:
+        return int(self.conteos[0].sum())
+
+    @medir("percentiles")
+    def percentiles(self, qs: Sequence[float] = PERCENTILES) -> np.ndarray:
+        """Percentiles ``(len(qs), columnas)`` interpolando dentro de cada bin."""
+        acumulado = np.cumsum(self.conteos, axis=1)
+        objetivo = np.asarray(qs, dtype=float)[:, None] / 100 * acumulado[:, -1]
+        resultado = np.empty((len(qs), self.inferior.size))
+        ancho = (self.superior - self.inferior) / self.num_bins
+        for j in range(self.inferior.size):
+            idx = np.searchsorted(acumulado[j], objetivo[:, j], side="left")
+            idx = np.minimum(idx, self.num_bins - 1)
+            previo = np.where(idx > 0, acumulado[j, idx - 1], 0)
+            en_bin = np.maximum(self.conteos[j, idx], 1)
+            fraccion = np.clip((objetivo[:, j] - previo) / en_bin, 0, 1)
+            resultado[:, j] = self.inferior[j] + (idx + fraccion) * ancho[j]
+        return resultado
+
+
+def _trayectorias_presupuesto(
+    rng: np.random.Generator,
+    n: int,
+    presupuesto_base: float,
+    horizonte: int,
+    crecimiento: Distribucion,
+    inflacion: Distribucion,
+    real: bool,
+) -> np.ndarray:
+    """Genera ``n`` trayectorias ``(n, horizonte)`` con tasas anuales independientes."""
+    tasas = crecimiento.muestrear(rng, (n, horizonte - 1)) / 100
+    factores = np.log1p(tasas)
+    if real:
+        factores -= np.log1p(inflacion.muestrear(rng, (n, horizonte - 1)) / 100)
+    trayectorias = np.empty((n, horizonte))
+    trayectorias[:, 0] = 0.0
+    np.cumsum(factores, axis=1, out=trayectorias[:, 1:])
+    np.exp(trayectorias, out=trayectorias)
+    trayectorias *= presupuesto_base
+    return trayectorias
+
+
+def _lote_presupuesto(args) -> np.ndarray:
+    semilla, n, histograma, parametros = args
+    rng = np.random.default_rng(semilla)
+    return histograma.contar(_trayectorias_presupuesto(rng, n, **parametros))
+
+
+def _impactos_reforma(
+    rng: np.random.Generator, n: int, impacto_base: float, sensibilidad: Distribucion
+) -> np.ndarray:
+    return (impacto_base * (1 + sensibilidad.muestrear(rng, n) / 100))[:, None]
+
+
+def _lote_reforma(args) -> np.ndarray:
+    semilla, n, histograma, parametros = args
+    rng = np.random.default_rng(semilla)
+    return histograma.contar(_impactos_reforma(rng, n, **parametros))
+
+
+def _tamaños_lote(num_trayectorias: int, tamaño_lote: int) -> List[int]:
+    completos, resto = divmod(num_trayectorias, tamaño_lote)
+    return [tamaño_lote] * completos + ([resto] if resto else [])
+
+
+def _simular(
+    generador,
+    trabajo,
+    parametros: Dict,
+    num_trayectorias: int,
+    tamaño_lote: int,
+    procesos: Optional[int],
+    semilla: Optional[int],
+    num_bins: int,
+) -> HistogramaAcumulado:
+    """Ejecuta los lotes (en serie o en un pool) y acumula su histograma."""
+    tamaños = _tamaños_lote(num_trayectorias, tamaño_lote)
+    semillas = np.random.SeedSequence(semilla).spawn(len(tamaños) + 1)
+
+    # El lote piloto fija los rangos del histograma y no forma parte del resultado
+    piloto = generador(np.random.default_rng(semillas[0]), min(tamaño_lote, 5000), **parametros)
+    histograma = HistogramaAcumulado.desde_piloto(piloto, num_bins=num_bins)
+
+    tareas = [(s, n, histograma, parametros) for s, n in zip(semillas[1:], tamaños)]
+    if procesos and procesos > 1 and len(tareas) > 1:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            for conteos in pool.map(trabajo, tareas):
+                histograma.conteos += conteos
+    else:
+        for tarea in tareas:
+            histograma.conteos += trabajo(tarea)
+    return histograma
+
+
+def simular_presupuesto(
+    presupuesto_base: float,
+    crecimiento: Distribucion,
+    inflacion: Distribucion,
+    horizonte: int = 4,
+    real: bool = False,
+    num_trayectorias: int = 100000,
+    tamaño_lote: int = TAMAÑO_LOTE,
+    procesos: Optional[int] = None,
+    semilla: Optional[int] = None,
+    percentiles: Sequence[float] = PERCENTILES,
+    año_inicial: int = AÑO_INICIAL,
+    num_bins: int = NUM_BINS,
+) -> pd.DataFrame:
+    """Bandas de percentiles por año para el presupuesto proyectado.
+
+    Devuelve un DataFrame con la columna ``Año`` y una columna ``P{q}`` por
+    percentil solicitado (millones MXN), listo para trazar un abanico.
+    """
+    parametros = dict(
+        presupuesto_base=presupuesto_base, horizonte=horizonte,
+        crecimiento=crecimiento, inflacion=inflacion, real=real,
+    )
+    histograma = _simular(
+        _trayectorias_presupuesto, _lote_presupuesto, parametros,
+        num_trayectorias, tamaño_lote, procesos, semilla, num_bins,
+    )
+    bandas = histograma.percentiles(percentiles)
+    # El año base es determinista
+    bandas[:, 0] = presupuesto_base
+    resultado = pd.DataFrame({f"P{q:g}": fila for q, fila in zip(percentiles, bandas)})
+    resultado.insert(0, "Año", año_inicial + np.arange(horizonte))
+    return resultado
+
+
+def simular_reforma(
+    impacto_base: float,
+    sensibilidad: Distribucion,
+    recaudacion_base: float = RECAUDACION_BASE,
+    num_trayectorias: int = 100000,
+    tamaño_lote: int = TAMAÑO_LOTE,
+    procesos: Optional[int] = None,
+    semilla: Optional[int] = None,
+    percentiles: Sequence[float] = PERCENTILES,
+    num_bins: int = NUM_BINS,
+) -> pd.DataFrame:
+    """Percentiles de impacto (%) y recaudación anual (millones MXN) de una reforma.
+
+    ``sensibilidad`` describe la variación porcentual de los supuestos clave,
+    la misma magnitud que controla el slider de sensibilidad.
+    """
+    parametros = dict(impacto_base=impacto_base, sensibilidad=sensibilidad)
+    histograma = _simular(
+        _impactos_reforma, _lote_reforma, parametros,
+        num_trayectorias, tamaño_lote, procesos, semilla, num_bins,
+    )
+    impactos = histograma.percentiles(percentiles)[:, 0]
+    return pd.DataFrame({
+        "Percentil": [f"P{q:g}" for q in percentiles],
+        "Impacto (%)": impactos,
+        "Recaudación (M$)": recaudacion_base * impactos / 100,
+    })
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+"""
+Búsqueda de combinaciones de reformas que alcanzan una meta recaudatoria con
+la mayor confianza posible.
+
+El impacto de una combinación se aproxima con los efectos individuales y las
+interacciones por pares medidos en la microsimulación:
+
+    impacto(l) = Σ_i l_i e_i + Σ_{i<j} l_i l_j I_ij
+
+donde ``l_i`` es el nivel de aplicación de la reforma ``i`` (0 = no se aplica,
+1 = completa). La confianza de la combinación es el producto de las
+confianzas de cada reforma, reducidas en proporción a su nivel:
+``Π_i (1 - l_i (1 - c_i))``.
+
+Con pocas reformas se enumeran todas las combinaciones de niveles en arreglos
+indexados por máscara de bits (o índice en base ``len(niveles)``); con muchas
+se usa ramificación y acotamiento.
+"""
+
+import itertools
+import math
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from motor.microsimulacion import REGLAS, Poblacion, componer_reglas, recaudacion_por_escenario
+
+NIVELES: Tuple[float, ...] = (0.0, 0.5, 1.0)
+# Combinaciones a partir de las cuales se usa ramificación y acotamiento
+MAX_ENUMERACION: int = 2_000_000
+
+
+@dataclass
+class TablaInteracciones:
+    """Efecto individual (impacto %, forma ``(R,)``) e interacciones por pares ``(R, R)``."""
+
+    reformas: List[str]
+    efectos: np.ndarray
+    interacciones: np.ndarray
+    confianza: np.ndarray
+
+    @property
+    def num_reformas(self) -> int:
+        return len(self.reformas)
+
+
+def tabla_interacciones(
+    poblacion: Poblacion, reformas: Sequence[str], confianza: Sequence[float]
+) -> TablaInteracciones:
+    """Mide en una sola pasada el impacto de cada reforma y de cada par compuesto.
+
+    La interacción de un par es su impacto conjunto menos la suma de los
+    individuales. ``confianza`` va en porcentaje.
+    """
+    reformas = list(reformas)
+    pares = list(itertools.combinations(range(len(reformas)), 2))
+    reglas = [REGLAS[r] for r in reformas]
+    reglas += [componer_reglas(REGLAS[reformas[i]], REGLAS[reformas[j]]) for i, j in pares]
+    totales = recaudacion_por_escenario(poblacion, reglas)[0]
+    impactos = (totales[1:] - totales[0]) / totales[0] * 100
+
+    efectos = impactos[:len(reformas)]
+    interacciones = np.zeros((len(reformas), len(reformas)))
+    for (i, j), conjunto in zip(pares, impactos[len(reformas):]):
+        interacciones[i, j] = interacciones[j, i] = conjunto - efectos[i] - efectos[j]
+    return TablaInteracciones(reformas, efectos, interacciones, np.asarray(confianza, dtype=float) / 100)
+
+
+def evaluar_niveles(tabla: TablaInteracciones, nivel: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Impacto (%) y confianza (%) de cada fila de niveles ``(N, R)``."""
+    nivel = np.atleast_2d(np.asarray(nivel, dtype=float))
+    impacto = nivel @ tabla.efectos + 0.5 * np.einsum("nr,rs,ns->n", nivel, tabla.interacciones, nivel)
+    confianza = np.prod(1 - nivel * (1 - tabla.confianza), axis=1) * 100
+    return impacto, confianza
+
+
+def matriz_niveles(num_reformas: int, niveles: Sequence[float] = NIVELES) -> np.ndarray:
+    """Todas las combinaciones de niveles; la fila ``k`` es ``k`` en base ``len(niveles)``.
+
+    Con ``niveles=(0, 1)`` la fila ``k`` es la máscara de bits ``k`` (bit ``i`` =
+    reforma ``i``).
+    """
+    base = len(niveles)
+    indices = np.arange(base ** num_reformas)
+    digitos = (indices[:, None] // base ** np.arange(num_reformas)) % base
+    return np.asarray(niveles, dtype=float)[digitos]
+
+
+def enumerar_combinaciones(
+    tabla: TablaInteracciones, niveles: Sequence[float] = NIVELES
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Niveles, impacto y confianza de todas las combinaciones, indexados por máscara."""
+    nivel = matriz_niveles(tabla.num_reformas, niveles)
+    impacto, confianza = evaluar_niveles(tabla, nivel)
+    return nivel, impacto, confianza
+
+
+def frente_pareto(impacto: np.ndarray, confianza: np.ndarray) -> np.ndarray:
+    """Índices no dominados (mayor impacto y mayor confianza), de menor a mayor impacto."""
+    orden = np.lexsort((-impacto, -confianza))  # confianza descendente, desempate por impacto
+    mejor_impacto = np.maximum.accumulate(impacto[orden])
+    nuevos = np.r_[True, mejor_impacto[1:] > mejor_impacto[:-1]]
+    return orden[nuevos]
+
+
+@dataclass
+class Combinacion:
+    """Combinación de niveles por reforma con su impacto y confianza."""
+
+    niveles: Dict[str, float]
+    impacto: float
+    confianza: float
+    nodos: int = 0
+
+    @property
+    def reformas(self) -> List[str]:
+        return [r for r, nivel in self.niveles.items() if nivel > 0]
+
+
+def _costo_minimo(faltante: float, ganancia: np.ndarray, costo: np.ndarray, nivel_max: float) -> float:
+    """Cota inferior del costo (−log confianza) para sumar ``faltante`` de impacto.
+
+    Mochila fraccionaria: cada reforma aporta a lo más ``l * ganancia`` con un
+    costo de al menos ``l * costo`` (−log(1 − l(1 − c)) ≥ l(1 − c)).
+    """
+    if faltante <= 0:
+        return 0.0
+    utiles = ganancia > 0
+    razon = costo[utiles] / ganancia[utiles]
+    orden = np.argsort(razon)
+    acumulado = np.cumsum(ganancia[utiles][orden] * nivel_max)
+    # La factibilidad se revisa sobre el mismo acumulado en el que se busca,
+    # para que el redondeo no deje ``k`` fuera del arreglo
+    if not len(acumulado) or acumulado[-1] < faltante:
+        return math.inf
+    k = int(np.searchsorted(acumulado, faltante))
+    previo = acumulado[k - 1] if k else 0.0
+    completos = (costo[utiles][orden][:k] * nivel_max).sum()
+    return completos + (faltante - previo) * razon[orden][k]
+
+
+def _ramificar_y_acotar(
+    tabla: TablaInteracciones, meta: float, niveles: Sequence[float]
+) -> Tuple[Optional[np.ndarray], int]:
+    """Máxima confianza con impacto ≥ ``meta`` por búsqueda en profundidad con cotas.
+
+    En cada nodo se acota el impacto que aún pueden aportar las reformas
+    pendientes (incluidas sus interacciones positivas) y, con una mochila
+    fraccionaria, la confianza mínima que costaría alcanzar la meta.
+    """
+    r = tabla.num_reformas
+    # Primero las reformas con más impacto por unidad de confianza perdida
+    orden = np.argsort(-tabla.efectos / np.maximum(1 - tabla.confianza, 1e-9))
+    e = tabla.efectos[orden]
+    inter = tabla.interacciones[np.ix_(orden, orden)]
+    niveles = np.asarray(sorted(niveles, reverse=True), dtype=float)
+    nivel_max = niveles.max()
+    costo = 1 - tabla.confianza[orden]
+    log_c = np.log(np.maximum(1 - np.outer(niveles, costo), 1e-300))  # (L, R)
+    positivas = np.maximum(inter, 0) * nivel_max
+
+    mejor = {"log_c": -math.inf, "nivel": None}
+    nodos = 0
+    asignado = np.zeros(r)
+
+    def explorar(d, impacto, log_conf, aporte):
+        nonlocal nodos
+        nodos += 1
+        if log_conf <= mejor["log_c"]:
+            return
+        if impacto >= meta:
+            # Dejar las pendientes en 0 no cambia la confianza: es lo mejor de este subárbol
+            mejor["log_c"], mejor["nivel"] = log_conf, asignado.copy()
+            mejor["nivel"][d:] = 0
+            return
+        if d == r:
+            return
+        ganancia = e[d:] + aporte[d:] + positivas[d:, d:].sum(axis=1)
+        if log_conf - _costo_minimo(meta - impacto, ganancia, costo[d:], nivel_max) <= mejor["log_c"]:
+            return
+        for k, nivel in enumerate(niveles):
+            asignado[d] = nivel
+            explorar(
+                d + 1,
+                impacto + nivel * (e[d] + aporte[d]),
+                log_conf + log_c[k, d],
+                aporte + nivel * inter[d],
+            )
+        asignado[d] = 0
+
+    explorar(0, 0.0, 0.0, np.zeros(r))
+    if mejor["nivel"] is None:
+        return None, nodos
+    resultado = np.empty(r)
+    resultado[orden] = mejor["nivel"]
+    return resultado, nodos
+
+
+def mejor_combinacion(
+    tabla: TablaInteracciones,
+    meta: float,
+    niveles: Sequence[float] = NIVELES,
+    max_enumeracion: int = MAX_ENUMERACION,
+) -> Optional[Combinacion]:
+    """Combinación de mayor confianza cuyo impacto alcanza ``meta`` (%), o ``None``.
+
+    Enumera todas las combinaciones si caben en ``max_enumeracion``; si no,
+    usa ramificación y acotamiento.
+    """
+    if len(niveles) ** tabla.num_reformas <= max_enumeracion:
+        nivel, impacto, confianza = enumerar_combinaciones(tabla, niveles)
+        factibles = np.flatnonzero(impacto >= meta)
+        if factibles.size == 0:
+            return None
+        elegida = nivel[factibles[np.argmax(confianza[factibles])]]
+        nodos = len(nivel)
+    else:
+        elegida, nodos = _ramificar_y_acotar(tabla, meta, niveles)
+        if elegida is None:
+            return None
+    impacto, confianza = evaluar_niveles(tabla, elegida)
+    return Combinacion(
+        niveles=dict(zip(tabla.reformas, elegida.tolist())),
+        impacto=float(impacto[0]),
+        confianza=float(confianza[0]),
+        nodos=nodos,
+    )
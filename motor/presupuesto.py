@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Cálculos de la sección Presupuesto: proyección de escenarios presupuestales.
+
+Las proyecciones se calculan como matrices escenario × año mediante
+broadcasting de NumPy, de modo que miles de escenarios con horizontes de
+décadas se resuelven en una sola operación vectorizada.
+"""
+
+from typing import Dict, Tuple
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+ArrayLike = npt.ArrayLike
+
+# Ajuste en puntos porcentuales que cada escenario aplica al crecimiento esperado
+ESCENARIOS: Dict[str, float] = {
+    "Conservador": -1.0,
+    "Moderado": 0.0,
+    "Optimista": 2.0,
+}
+
+AÑO_INICIAL: int = 2024
+
+
+def proyectar_matriz(
+    presupuesto_base: ArrayLike,
+    crecimiento: ArrayLike,
+    inflacion: ArrayLike = 0.0,
+    horizonte: ArrayLike = 4,
+    real: bool = False,
+) -> np.ndarray:
+    """Proyecta una matriz escenario × año de presupuestos (millones MXN).
+
+    ``presupuesto_base``, ``crecimiento`` (%), ``inflacion`` (%) y
+    ``horizonte`` (número de años, incluido el año base) se combinan por
+    broadcasting en un vector de escenarios. El crecimiento es nominal; con
+    ``real=True`` los montos se deflactan a pesos del año base con la
+    inflación de cada escenario. Las celdas posteriores al horizonte de un
+    escenario quedan en ``NaN``.
+    """
+    base, tasa, infl, años = np.broadcast_arrays(
+        np.asarray(presupuesto_base, dtype=float),
+        np.asarray(crecimiento, dtype=float) / 100,
+        np.asarray(inflacion, dtype=float) / 100,
+        np.asarray(horizonte, dtype=int),
+    )
+    base, tasa, infl, años = (a.reshape(-1) for a in (base, tasa, infl, años))
+
+    periodos = np.arange(años.max(initial=1))
+    # Un solo factor por escenario: (1+g) nominal, (1+g)/(1+π) en términos reales
+    factor = 1 + tasa
+    if real:
+        factor = factor / (1 + infl)
+    proyeccion = base[:, None] * factor[:, None] ** periodos
+    proyeccion[periodos >= años[:, None]] = np.nan
+    return proyeccion
+
+
+def rejilla_escenarios(
+    presupuesto_base: ArrayLike,
+    crecimientos: ArrayLike,
+    inflaciones: ArrayLike,
+    horizonte: int,
+    real: bool = False,
+) -> Tuple[pd.DataFrame, np.ndarray]:
+    """Proyecta el producto cartesiano de bases, crecimientos e inflaciones.
+
+    Devuelve un DataFrame con los parámetros de cada escenario y la matriz
+    escenario × año correspondiente.
+    """
+    base, tasa, infl = np.meshgrid(
+        np.atleast_1d(presupuesto_base),
+        np.atleast_1d(crecimientos),
+        np.atleast_1d(inflaciones),
+        indexing="ij",
+    )
+    parametros = pd.DataFrame({
+        "Presupuesto base": base.ravel(),
+        "Crecimiento (%)": tasa.ravel(),
+        "Inflación (%)": infl.ravel(),
+    })
+    matriz = proyectar_matriz(
+        parametros["Presupuesto base"].to_numpy(),
+        parametros["Crecimiento (%)"].to_numpy(),
+        parametros["Inflación (%)"].to_numpy(),
+        horizonte,
+        real=real,
+    )
+    return parametros, matriz
+
+
+def proyectar_escenarios(
+    presupuesto_base: float,
+    crecimiento: float,
+    inflacion: float = 0.0,
+    horizonte: int = 4,
+    real: bool = False,
+    año_inicial: int = AÑO_INICIAL,
+) -> pd.DataFrame:
+    """Proyecta el presupuesto base para cada escenario de ``ESCENARIOS``.
+
+    Devuelve un DataFrame numérico con la columna ``Año`` y una columna por
+    escenario (millones MXN). El formato de moneda se aplica en la vista.
+    """
+    ajustes = np.fromiter(ESCENARIOS.values(), dtype=float)
+    matriz = proyectar_matriz(
+        presupuesto_base, crecimiento + ajustes, inflacion, horizonte, real=real
+    )
+    proyeccion = pd.DataFrame(matriz.T, columns=list(ESCENARIOS))
+    proyeccion.insert(0, "Año", año_inicial + np.arange(horizonte))
+    return proyeccion
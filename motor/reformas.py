@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Cálculos de la sección Análisis Reformas: impacto recaudatorio y escenarios.
+"""
+
+from typing import Dict, List, Sequence
+
+REFORMAS: List[str] = [
+    "Incremento cuota patronal 1%",
+    "Reducción cuota trabajador 0.5%",
+    "Nuevo esquema para PyMEs",
+    "Ampliación base de cotización",
+    "Incorporación sector informal",
+]
+
+# Impacto recaudatorio esperado (%) y nivel de confianza (%) por reforma; el
+# impacto que usa la app se obtiene de ``motor.microsimulacion`` y este queda
+# como referencia de estudios previos
+IMPACTO_BASE: List[float] = [15.5, -8.2, 3.7, 12.8, 22.3]
+CONFIANZA: List[float] = [85, 78, 65, 82, 60]
+
+# Multiplicadores del impacto base para la simulación de escenarios
+MULTIPLICADORES_ESCENARIO: Dict[str, float] = {
+    "Conservador": 0.7,
+    "Base": 1.0,
+    "Optimista": 1.3,
+}
+
+# Recaudación base en millones MXN
+RECAUDACION_BASE: float = 100000
+
+
+def ajustar_impacto(impacto: float, sensibilidad: float) -> float:
+    """Aplica una variación porcentual de supuestos al impacto de una reforma."""
+    return impacto * (1 + sensibilidad / 100)
+
+
+def ajustar_confianza(confianza: float, sensibilidad: float) -> float:
+    """Reduce la confianza en proporción a la magnitud de la variación (0-100)."""
+    return max(0, min(100, confianza - abs(sensibilidad)))
+
+
+def impactos_actualizados(
+    impactos: Sequence[float], idx: int, sensibilidad: float
+) -> List[float]:
+    """Devuelve los impactos con la reforma ``idx`` ajustada por sensibilidad."""
+    actualizados = list(impactos)
+    actualizados[idx] = ajustar_impacto(impactos[idx], sensibilidad)
+    return actualizados
+
+
+def escenarios_reforma(
+    impacto: float, recaudacion_base: float = RECAUDACION_BASE
+) -> Dict[str, Dict[str, float]]:
+    """Calcula impacto (%) y recaudación anual (millones MXN) por escenario."""
+    escenarios = {}
+    for nombre, factor in MULTIPLICADORES_ESCENARIO.items():
+        impacto_escenario = impacto * factor
+        escenarios[nombre] = {
+            "impacto": impacto_escenario,
+            "recaudacion": recaudacion_base * (impacto_escenario / 100),
+        }
+    return escenarios
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+Registro persistente de configuraciones de metas en SQLite.
+
+Cada guardado agrega una versión nueva por ``(unidad, tipo, periodo)`` al
+historial (nunca se sobrescribe) y actualiza la tabla ``vigentes`` con la
+última versión, indexada por esa misma clave. La lectura masiva de metas
+vigentes se memoiza por filtro y se invalida con un contador de revisión que
+cada escritura incrementa en la misma transacción, así que otros procesos
+que comparten el archivo ven los cambios. Las conexiones se reutilizan desde
+un pool pequeño (SQLite en modo WAL admite lectores concurrentes).
+"""
+
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+COLUMNAS: List[str] = ["unidad", "tipo", "periodo", "version", "base", "porcentaje", "meta_final", "guardado"]
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS historial (
+    unidad TEXT NOT NULL,
+    tipo TEXT NOT NULL,
+    periodo TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    base REAL NOT NULL,
+    porcentaje REAL NOT NULL,
+    meta_final REAL NOT NULL,
+    guardado TEXT NOT NULL,
+    PRIMARY KEY (unidad, tipo, periodo, version)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS vigentes (
+    unidad TEXT NOT NULL,
+    tipo TEXT NOT NULL,
+    periodo TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    base REAL NOT NULL,
+    porcentaje REAL NOT NULL,
+    meta_final REAL NOT NULL,
+    guardado TEXT NOT NULL,
+    PRIMARY KEY (unidad, tipo, periodo)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS vigentes_tipo_periodo ON vigentes (tipo, periodo);
+CREATE TABLE IF NOT EXISTS control (revision INTEGER NOT NULL);
+INSERT INTO control SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM control);
+"""
+
+# La versión nueva es la vigente + 1; la vigente está indexada por la misma clave
+INSERTAR_HISTORIAL = f"""
+INSERT INTO historial ({", ".join(COLUMNAS)})
+SELECT ?, ?, ?, COALESCE((SELECT version FROM vigentes WHERE unidad = ? AND tipo = ? AND periodo = ?), 0) + 1,
+       ?, ?, ?, ?
+"""
+
+ACTUALIZAR_VIGENTES = f"""
+INSERT OR REPLACE INTO vigentes ({", ".join(COLUMNAS)})
+SELECT {", ".join(COLUMNAS)} FROM historial h
+WHERE h.unidad = ? AND h.tipo = ? AND h.periodo = ?
+ORDER BY h.version DESC LIMIT 1
+"""
+
+TAMAÑO_POOL: int = 4
+
+
+class RegistroMetas:
+    """Historial versionado y metas vigentes por unidad, tipo y periodo."""
+
+    def __init__(self, ruta: str, tamaño_pool: int = TAMAÑO_POOL):
+        self.ruta = ruta
+        self._pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._conexiones: List[sqlite3.Connection] = []
+        self._cerrojo = threading.Lock()
+        self._cache: Dict[Tuple[Optional[str], Optional[str]], pd.DataFrame] = {}
+        self._revision_cache = -1
+        for _ in range(tamaño_pool):
+            conexion = sqlite3.connect(ruta, check_same_thread=False, isolation_level=None, timeout=30)
+            conexion.execute("PRAGMA journal_mode=WAL")
+            conexion.execute("PRAGMA synchronous=NORMAL")
+            self._conexiones.append(conexion)
+            self._pool.put(conexion)
+        with self._conexion() as conexion:
+            conexion.executescript(ESQUEMA)
+
+    @contextmanager
+    def _conexion(self) -> Iterator[sqlite3.Connection]:
+        conexion = self._pool.get()
+        try:
+            yield conexion
+        finally:
+            self._pool.put(conexion)
+
+    def revision(self) -> int:
+        """Contador que aumenta con cada guardado (de cualquier proceso)."""
+        with self._conexion() as conexion:
+            return conexion.execute("SELECT revision FROM control").fetchone()[0]
+
+    def guardar(
+        self,
+        unidades: Sequence[str],
+        tipo,
+        base,
+        porcentaje,
+        meta_final,
+        periodo: str,
+    ) -> int:
+        """Agrega una versión por unidad en una sola transacción; devuelve la revisión nueva.
+
+        ``tipo``, ``base``, ``porcentaje`` y ``meta_final`` pueden ser escalares
+        o arreglos del largo de ``unidades``.
+        """
+        unidades = np.asarray(unidades, dtype=str)
+        n = len(unidades)
+        tipo = np.broadcast_to(np.asarray(tipo, dtype=str), n)
+        base, porcentaje, meta_final = (np.broadcast_to(np.asarray(v, dtype=float), n)
+                                        for v in (base, porcentaje, meta_final))
+        guardado = datetime.now().isoformat(timespec="seconds")
+        claves = list(zip(unidades.tolist(), tipo.tolist(), [periodo] * n))
+        filas = [
+            (*clave, *clave, b, p, m, guardado)
+            for clave, b, p, m in zip(claves, base.tolist(), porcentaje.tolist(), meta_final.tolist())
+        ]
+        with self._conexion() as conexion:
+            conexion.execute("BEGIN IMMEDIATE")
+            try:
+                conexion.executemany(INSERTAR_HISTORIAL, filas)
+                conexion.executemany(ACTUALIZAR_VIGENTES, claves)
+                conexion.execute("UPDATE control SET revision = revision + 1")
+                revision = conexion.execute("SELECT revision FROM control").fetchone()[0]
+                conexion.execute("COMMIT")
+            except BaseException:
+                conexion.execute("ROLLBACK")
+                raise
+        return revision
+
+    def vigentes(self, tipo: Optional[str] = None, periodo: Optional[str] = None) -> pd.DataFrame:
+        """Metas vigentes (última versión), opcionalmente filtradas; memoizadas por revisión."""
+        revision = self.revision()
+        with self._cerrojo:
+            if revision != self._revision_cache:
+                self._cache.clear()
+                self._revision_cache = revision
+            if (tipo, periodo) in self._cache:
+                return self._cache[(tipo, periodo)].copy()
+
+        condiciones, parametros = [], []
+        for columna, valor in (("tipo", tipo), ("periodo", periodo)):
+            if valor is not None:
+                condiciones.append(f"{columna} = ?")
+                parametros.append(valor)
+        consulta = f"SELECT {', '.join(COLUMNAS)} FROM vigentes"
+        if condiciones:
+            consulta += " WHERE " + " AND ".join(condiciones)
+        with self._conexion() as conexion:
+            filas = conexion.execute(consulta, parametros).fetchall()
+        df = pd.DataFrame.from_records(filas, columns=COLUMNAS)
+
+        with self._cerrojo:
+            if revision == self._revision_cache:
+                self._cache[(tipo, periodo)] = df
+        return df.copy()
+
+    def historial(self, unidad: str, tipo: Optional[str] = None, periodo: Optional[str] = None) -> pd.DataFrame:
+        """Todas las versiones de una unidad, de la más reciente a la más antigua."""
+        consulta = f"SELECT {', '.join(COLUMNAS)} FROM historial WHERE unidad = ?"
+        parametros: List = [unidad]
+        for columna, valor in (("tipo", tipo), ("periodo", periodo)):
+            if valor is not None:
+                consulta += f" AND {columna} = ?"
+                parametros.append(valor)
+        consulta += " ORDER BY tipo, periodo, version DESC"
+        with self._conexion() as conexion:
+            filas = conexion.execute(consulta, parametros).fetchall()
+        return pd.DataFrame.from_records(filas, columns=COLUMNAS)
+
+    def cerrar(self) -> None:
+        for conexion in self._conexiones:
+            conexion.close()
+        self._conexiones.clear()
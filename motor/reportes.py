@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+"""
+Cálculos de la sección Reportes Avances: porcentajes de avance por estado.
+"""
+
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+
+def calcular_avances(
+    estados: Sequence[str],
+    meta_afiliacion: Sequence[float],
+    avance_afiliacion: Sequence[float],
+    meta_recaudacion: Sequence[float],
+    avance_recaudacion: Sequence[float],
+    columna: str = "Estado",
+) -> pd.DataFrame:
+    """Construye la tabla de avances con columnas numéricas.
+
+    ``columna`` es el nombre de la columna de unidades (estado, delegación,
+    subdelegación). Los porcentajes se devuelven como números para poder ordenar y filtrar; el
+    formato de texto se aplica únicamente al mostrar la tabla.
+    """
+    meta_afiliacion = np.asarray(meta_afiliacion)
+    avance_afiliacion = np.asarray(avance_afiliacion)
+    meta_recaudacion = np.asarray(meta_recaudacion)
+    avance_recaudacion = np.asarray(avance_recaudacion)
+    return pd.DataFrame({
+        columna: list(estados),
+        "Meta Afiliación": meta_afiliacion,
+        "Avance Afiliación": avance_afiliacion,
+        "% Avance Afiliación": avance_afiliacion / meta_afiliacion * 100,
+        "Meta Recaudación (MXN)": meta_recaudacion,
+        "Avance Recaudación (MXN)": avance_recaudacion,
+        "% Avance Recaudación": avance_recaudacion / meta_recaudacion * 100,
+    })